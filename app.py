@@ -1,10 +1,13 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import argparse
 import configparser
+import sys
 from os.path import dirname, expanduser, join, realpath
 from sys import exit
 from modules import _utils, manage_checks
+from nodeping_api import watch
 from pprint import pprint
 from InquirerPy import prompt
 
@@ -53,18 +56,64 @@ def created_check(info):
     input("\nPress enter to continue")
 
 
+def watch_checks(token, customerid, args):
+    """ Print a line of JSON for each check that fails, recovers, is
+    disabled or is deleted, until interrupted
+    """
+
+    watcher = watch.Watcher(token, customerid or None,
+                            types=None if args.all_types else ("PUSH",),
+                            min_interval=args.min_interval,
+                            max_interval=args.max_interval)
+
+    def report(err):
+        print("Polling NodePing failed: {0}".format(err), file=sys.stderr)
+
+    try:
+        for event in watcher.events(on_error=report):
+            print(event.to_json(), flush=True)
+    except KeyboardInterrupt:
+        pass
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="NodePing PUSH check wizard. Without a command, the "
+                    "wizard prompts for what to do")
+    commands = parser.add_subparsers(dest="command")
+    watch_parser = commands.add_parser(
+        "watch", help="print check state changes as JSON lines")
+    watch_parser.add_argument("--subaccount",
+                              help="subaccount ID, instead of the one in "
+                                   "config.ini")
+    watch_parser.add_argument("--all-types", action="store_true",
+                              help="watch every check, not only PUSH checks")
+    watch_parser.add_argument("--min-interval", type=float,
+                              help="seconds between polls after a change")
+    watch_parser.add_argument("--max-interval", type=float,
+                              help="most seconds between polls")
+
+    return parser.parse_args()
+
+
 def main():
     """ Prompt the user for which action they want to take
 
     List, create, delete checks s well as set the user token and/or customerid
-    if desired.
+    if desired. With the watch command, print check state changes instead.
     """
 
+    args = parse_args()
+
     config = configparser.ConfigParser()
     config.read(CONFIGFILE)
 
     token, customerid = _utils.get_user_token(config, CONFIGFILE)
 
+    if args.command == "watch":
+        watch_checks(token, args.subaccount or customerid, args)
+        return
+
     interaction = True
 
     while interaction:
@@ -79,6 +128,7 @@ def main():
                 'message': 'Please select an action',
                 'choices': [
                     'List PUSH checks',
+                    'Show when PUSH checks last reported',
                     'Create a PUSH check',
                     'Delete PUSH checks',
                     'Exit'
@@ -91,6 +141,9 @@ def main():
         if answers['user_choice'] == "List PUSH checks":
             manage_checks.list_checks(token, customerid)
 
+        elif answers['user_choice'] == "Show when PUSH checks last reported":
+            manage_checks.last_reports(token, customerid)
+
         elif answers['user_choice'] == "Create a PUSH check":
             check_info = manage_checks.configure(token, customerid)
             created_check(check_info)
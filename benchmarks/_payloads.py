@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" NodePing API payloads for the benchmarks
+
+Benchmarks run against recorded responses when they are given, and
+otherwise against generated ones shaped like the /checks and /results
+responses described in the NodePing API documentation.
+"""
+
+import json
+import random
+import string
+
+CUSTOMER_ID = "201205050153W2Q4C"
+CHECK_TYPES = ("PUSH", "PUSH", "PUSH", "HTTP", "PING", "DNS", "SSL")
+
+
+def _token(rng, length=10):
+    return "".join(rng.choice(string.ascii_uppercase + string.digits)
+                   for _ in range(length))
+
+
+def check(rng, index):
+    """ Returns one (check_id, check) pair
+    """
+
+    check_id = "{0}-{1}".format(CUSTOMER_ID, _token(rng, 8))
+    check_type = rng.choice(CHECK_TYPES)
+    parameters = {"target": "https://host{0}.example.com/".format(index),
+                  "threshold": 5,
+                  "sens": 2}
+
+    if check_type == "PUSH":
+        parameters.update({
+            "checktoken": _token(rng, 20),
+            "oldresultfail": rng.random() < 0.5,
+            "fields": {
+                "load1min": {"name": "load1min", "min": 0, "max": 4},
+                "memavail": {"name": "memavail", "min": 100, "max": 64000},
+                "diskfree./": {"name": "diskfree./", "min": 10, "max": 100}}})
+
+    return check_id, {
+        "_id": check_id,
+        "customer_id": CUSTOMER_ID,
+        "label": "host{0}.example.com".format(index),
+        "interval": rng.choice((1, 3, 5, 15, 60)),
+        "notifications": [{"201205050153W2Q4C-BKPGH": {"delay": 0,
+                                                       "schedule": "All"}}],
+        "type": check_type,
+        "status": "assigned",
+        "modified": 1500000000000 + index * 1000,
+        "enable": "active" if rng.random() < 0.9 else "inactive",
+        "public": False,
+        "parameters": parameters,
+        "runlocations": False,
+        "homeloc": False,
+        "created": 1400000000000 + index,
+        "queue": "bINbMzQ3Ne",
+        "uuid": "{0}-{1}-{2}".format(_token(rng, 8), _token(rng, 4), _token(rng, 12)),
+        "state": 1 if rng.random() < 0.8 else 0,
+        "firstdown": 0,
+        "dep": False}
+
+
+def checks(count, seed=1):
+    """ Returns a /checks response with count checks
+    """
+
+    rng = random.Random(seed)
+
+    return dict(check(rng, index) for index in range(count))
+
+
+def results(count, seed=1):
+    """ Returns a /results response with count result records
+    """
+
+    rng = random.Random(seed)
+    start = 1500000000000
+    records = []
+
+    for index in range(count):
+        scheduled = start + index * 60000
+        runtime = rng.randint(10, 900)
+        success = rng.random() < 0.95
+
+        records.append({
+            "_id": "{0}-{1}-{2}".format(CUSTOMER_ID, _token(rng, 8), scheduled),
+            "ci": CUSTOMER_ID,
+            "t": "PUSH",
+            "tg": "https://host.example.com/",
+            "th": 5,
+            "i": 1,
+            "ra": scheduled,
+            "q": "bINbMzQ3Ne",
+            "s": scheduled + 12,
+            "sc": "200" if success else "500",
+            "m": "" if success else "Server returned 500",
+            "su": success,
+            "rt": runtime,
+            "e": scheduled + 12 + runtime,
+            "l": {str(scheduled + 12): "wa"}})
+
+    return records
+
+
+def load(paths):
+    """ Reads recorded JSON responses from files
+
+    :param paths: Paths of files holding a raw API response body
+    :return: List of (name, body bytes)
+    """
+
+    payloads = []
+
+    for path in paths:
+        with open(path, "rb") as handle:
+            payloads.append((path, handle.read()))
+
+    return payloads
+
+
+def generated():
+    """ Returns the default generated payloads as (name, body bytes)
+    """
+
+    return [
+        ("checks-10k", json.dumps(checks(10000)).encode("utf-8")),
+        ("results-50k", json.dumps(results(50000)).encode("utf-8"))]
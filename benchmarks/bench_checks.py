@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Compare holding checks as decoded dicts and as compact Check objects
+
+Builds the checks of a large account both ways and prints the memory
+they take and the time to list the PUSH checks, as the wizard does,
+with the best time of several runs. Pass a file holding a recorded
+/checks response body to benchmark that instead of generated checks.
+
+    $ python3 -m benchmarks.bench_checks [--count 50000] [recorded.json]
+"""
+
+import argparse
+import gc
+import timeit
+import tracemalloc
+from nodeping_api import _codec
+from nodeping_api.check import Check
+from . import _payloads
+
+
+def _measure(build):
+    """ Returns what build() returns and the bytes it allocated
+    """
+
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return result, size
+
+
+def _list_dicts(checks):
+    listed = []
+
+    for check in checks.values():
+        if check.get("type") != "PUSH":
+            continue
+
+        try:
+            label = check["label"]
+        except KeyError:
+            label = "(none)"
+
+        try:
+            checktoken = check["parameters"]["checktoken"]
+        except KeyError:
+            checktoken = None
+
+        listed.append((check["_id"], label, checktoken, check.get("state"),
+                       check.get("enable") == "active", check.get("interval")))
+
+    return listed
+
+
+def _list_checks(checks):
+    return [(check.id, check.label or "(none)", check.checktoken, check.state,
+             check.active, check.interval)
+            for check in checks.values() if check.type == "PUSH"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("payload", nargs="?",
+                        help="file with a recorded /checks response body")
+    parser.add_argument("--count", type=int, default=50000,
+                        help="number of generated checks")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.payload:
+        body = _payloads.load([args.payload])[0][1]
+    else:
+        body = _codec.dumps(_payloads.checks(args.count))
+
+    dicts, dict_size = _measure(lambda: _codec.loads(body))
+    checks, check_size = _measure(lambda: {
+        check_id: Check.from_dict(check_id, check)
+        for check_id, check in _codec.loads(body).items()})
+
+    def best(func):
+        return min(timeit.repeat(func, number=1, repeat=args.repeat))
+
+    dict_time = best(lambda: _list_dicts(dicts))
+    check_time = best(lambda: _list_checks(checks))
+
+    print("{0} checks ({1:.1f} MiB of JSON)".format(
+        len(checks), len(body) / 1048576))
+    print("  dicts   {0:8.1f} MiB  list PUSH {1:8.1f} ms".format(
+        dict_size / 1048576, dict_time * 1000))
+    print("  Check   {0:8.1f} MiB  list PUSH {1:8.1f} ms".format(
+        check_size / 1048576, check_time * 1000))
+    print("  {0:.1f}x less memory, {1:.1f}x faster".format(
+        dict_size / check_size, dict_time / check_time))
+
+
+if __name__ == "__main__":
+    main()
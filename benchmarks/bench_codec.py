@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Compare the JSON codecs available to nodeping_api
+
+Decodes and re-encodes NodePing responses with every installed codec
+and prints the best time of several runs. Pass files holding recorded
+API response bodies to benchmark those; otherwise generated /checks
+and /results payloads are used.
+
+    $ python3 -m benchmarks.bench_codec [recorded.json ...]
+"""
+
+import argparse
+import timeit
+from nodeping_api import _codec
+from . import _payloads
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("payloads", nargs="*",
+                        help="files with recorded API response bodies")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.payloads:
+        payloads = _payloads.load(args.payloads)
+    else:
+        payloads = _payloads.generated()
+
+    def best(func):
+        return min(timeit.repeat(func, number=1, repeat=args.repeat))
+
+    for name, body in payloads:
+        data = _codec.CODECS["json"].loads(body)
+        print("{0} ({1:.1f} MiB)".format(name, len(body) / 1048576))
+        baseline = None
+
+        for codec in _codec.CODECS.values():
+            decode = best(lambda: codec.loads(body))
+            encode = best(lambda: codec.dumps(data))
+
+            if baseline is None:
+                baseline = (decode, encode)
+
+            print("  {0:<7} loads {1:8.1f} ms (x{2:.1f})  "
+                  "dumps {3:8.1f} ms (x{4:.1f})".format(
+                      codec.name, decode * 1000, baseline[0] / decode,
+                      encode * 1000, baseline[1] / encode))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Offline benchmark of bulk operations against a cassette
+
+Times listing PUSH checks, deleting them one by one, and pulling
+results for them, with every request answered from a cassette, so
+the numbers are repeatable and no network or token is needed.
+
+Pass a cassette recorded with nodeping_api.cassette.record() that
+covers those calls, or let the benchmark build one from generated
+payloads. --realtime replays the recorded latencies; without it the
+benchmark measures the client side cost alone.
+
+    $ python3 -m benchmarks.bench_replay [--cassette FILE] [--realtime]
+"""
+
+import argparse
+import time
+from nodeping_api import (_query_nodeping_api, _utils, cassette, delete_checks,
+                          get_checks, results)
+from . import _payloads
+
+TOKEN = "TOKEN"
+
+
+def build_cassette(count, result_checks, latency):
+    """ Builds an in-memory cassette for count generated checks
+    """
+
+    recorded = cassette.Cassette()
+    checks = _payloads.checks(count)
+    push_ids = [check_id for check_id, check in checks.items()
+                if check["type"] == "PUSH"]
+
+    recorded.add("GET", _utils.create_url(TOKEN, get_checks.API_URL, None),
+                 checks, latency=latency)
+
+    for check_id in push_ids:
+        url = "{0}/{1}".format(delete_checks.API_URL, check_id)
+        recorded.add("DELETE", _utils.create_url(TOKEN, url, None),
+                     {"ok": True, "id": check_id}, latency=latency)
+
+    records = _payloads.results(300)
+
+    for check_id in push_ids[:result_checks]:
+        url = results._results_url({"token": TOKEN, "check_id": check_id,
+                                    "limit": 300, "clean": True})
+        recorded.add("GET", url, records, latency=latency)
+
+    return recorded
+
+
+def list_push_checks():
+    query = get_checks.GetChecks(TOKEN)
+
+    return dict(query.iter_checks(lambda check: check["type"] == "PUSH"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cassette", help="recorded cassette file")
+    parser.add_argument("--realtime", action="store_true",
+                        help="replay the recorded latencies")
+    parser.add_argument("--checks", type=int, default=5000,
+                        help="checks in the generated cassette")
+    parser.add_argument("--result-checks", type=int, default=50,
+                        help="checks to pull results for")
+    parser.add_argument("--latency", type=float, default=0.05,
+                        help="latency stored in the generated cassette")
+    args = parser.parse_args()
+
+    if args.cassette:
+        replayed = cassette.replay(args.cassette, realtime=args.realtime)
+    else:
+        replayed = build_cassette(args.checks, args.result_checks, args.latency)
+        replayed.realtime = args.realtime
+
+    # Offline, so the API request budget does not apply
+    _query_nodeping_api.configure_rate_limit(0)
+
+    with replayed:
+        timings = []
+
+        start = time.perf_counter()
+        push_checks = list_push_checks()
+        timings.append(("list PUSH checks", len(push_checks),
+                        time.perf_counter() - start))
+
+        start = time.perf_counter()
+        for check_id in push_checks:
+            delete_checks.remove(TOKEN, check_id)
+        timings.append(("delete PUSH checks", len(push_checks),
+                        time.perf_counter() - start))
+
+        start = time.perf_counter()
+        pulled = list(push_checks)[:args.result_checks]
+        for check_id in pulled:
+            results.get_results(TOKEN, check_id)
+        timings.append(("pull results", len(pulled),
+                        time.perf_counter() - start))
+
+    for name, count, elapsed in timings:
+        print("{0:<20} {1:>6} items {2:10.1f} ms".format(
+            name, count, elapsed * 1000))
+
+
+if __name__ == "__main__":
+    main()
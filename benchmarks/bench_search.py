@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Time check lookups with the search index
+
+Indexes the checks of a large account and prints the time to build
+the index and the best time of exact, prefix and fuzzy lookups, next
+to finding the checks by scanning every label and checktoken. Pass a
+file holding a recorded /checks response body to benchmark that
+instead of generated checks.
+
+    $ python3 -m benchmarks.bench_search [--count 100000] [recorded.json]
+"""
+
+import argparse
+import random
+import time
+import timeit
+from nodeping_api import _codec
+from nodeping_api.check import Check
+from nodeping_api.search import SearchIndex
+from . import _payloads
+
+
+def _scan(checks, text):
+    text = text.casefold()
+
+    return [check.id for check in checks
+            if text in (check.label or "").casefold()
+            or text in (check.checktoken or "").casefold()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("payload", nargs="?",
+                        help="file with a recorded /checks response body")
+    parser.add_argument("--count", type=int, default=100000,
+                        help="number of generated checks")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.payload:
+        body = _payloads.load([args.payload])[0][1]
+        data = _codec.loads(body)
+    else:
+        data = _payloads.checks(args.count)
+
+    checks = [Check.from_dict(check_id, check) for check_id, check in data.items()]
+    sample = random.Random(1).choice([check for check in checks if check.label])
+
+    started = time.perf_counter()
+    index = SearchIndex(checks)
+    built = time.perf_counter() - started
+
+    started = time.perf_counter()
+    index.fuzzy("")
+    grams = time.perf_counter() - started
+
+    label = sample.label
+    typo = label[:2] + label[3] + label[2] + label[4:]
+
+    lookups = [
+        ("exact label", lambda: index.exact(label)),
+        ("exact checktoken", lambda: index.exact(sample.checktoken or sample.id)),
+        ("prefix", lambda: index.prefix(label[:len(label) // 2], 20)),
+        ("fuzzy", lambda: index.fuzzy(typo, 20)),
+        ("search", lambda: index.search(typo, 20)),
+        ("scan", lambda: _scan(checks, label)),
+    ]
+
+    print("{0} checks, index built in {1:.2f} s, trigrams in {2:.2f} s".format(
+        len(checks), built, grams))
+
+    for name, lookup in lookups:
+        best = min(timeit.repeat(lookup, number=1, repeat=args.repeat))
+        print("  {0:<17} {1:10.1f} us".format(name, best * 1000000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Compare the nodeping_api transport backends
+
+Sends GETs through _query_nodeping_api.get() with each backend, first
+one after another and then from a pool of worker threads, and prints
+the wall time and requests per second. By default the requests go to
+a local stand-in server that answers like the /checks endpoint. The
+stdlib server only speaks HTTP/1.1, so to see HTTP/2 multiplexing
+point --url at an HTTP/2 capable stand-in (TLS with ALPN h2).
+
+    $ python3 -m benchmarks.bench_transports [--url URL] [--requests 1000]
+"""
+
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from nodeping_api import _query_nodeping_api, _transports
+from . import _payloads
+
+BODY = json.dumps(_payloads.checks(20)).encode("utf-8")
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """ Answers every GET with the same small /checks response
+    """
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this, Nagle and
+    # delayed ACKs add 40 ms to every keep-alive response
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    return server, "http://127.0.0.1:{0}/api/1/checks".format(server.server_port)
+
+
+def run(url, requests, workers):
+    """ Returns the seconds taken by requests GETs over workers threads
+    """
+
+    # Distinct URLs so the cache and request coalescing stay out of it
+    urls = ["{0}?token=TOKEN&n={1}".format(url, n) for n in range(requests)]
+
+    def fetch(target):
+        return _query_nodeping_api.get(target, cache=False)
+
+    start = time.perf_counter()
+
+    if workers == 1:
+        for target in urls:
+            fetch(target)
+    else:
+        with ThreadPoolExecutor(workers) as executor:
+            list(executor.map(fetch, urls))
+
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="stand-in server to query")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--backends", nargs="*",
+                        default=sorted(_transports.BACKENDS))
+    args = parser.parse_args()
+
+    server = None
+
+    if args.url:
+        url = args.url
+    else:
+        server, url = start_server()
+
+    _query_nodeping_api.configure_rate_limit(0)
+    _query_nodeping_api.configure_pool(pool_size=args.workers)
+
+    for name in args.backends:
+        try:
+            _query_nodeping_api.use_backend(name)
+        except RuntimeError as err:
+            print("{0:<8} skipped: {1}".format(name, err))
+            continue
+
+        for label, workers in (("sequential", 1), ("concurrent", args.workers)):
+            elapsed = run(url, args.requests, workers)
+            print("{0:<8} {1:<11} {2:5} GETs {3:8.2f} s {4:9.0f} req/s".format(
+                name, label, args.requests, elapsed, args.requests / elapsed))
+
+    _query_nodeping_api.use_backend("pooled")
+
+    if server is not None:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,15 @@
 # -*- coding: utf-8 -*-
 
 import copy
+import sqlite3
 import sys
+import time
 import os.path
-import urllib.error
 from os.path import abspath, dirname, isfile, join
 from InquirerPy import prompt
 from InquirerPy.validator import NumberValidator
-from nodeping_api import delete_checks, get_checks, create_check
+from nodeping_api import (account_tree, catalog, delete_checks, create_check,
+                          get_checks, store)
 from . import configure_metrics, configure_client, configure_contacts, _utils, _variables
 
 CLIENTS_URL = 'https://github.com/NodePing/PUSH_Clients/archive/master.zip'
@@ -49,17 +51,103 @@ def _strip_extra_data(fields):
     return new_fields
 
 
-def _fetch_checks(token, customerid=None):
+def _check_store():
+    """ Opens the local store of checks, or None if it can't be used
+    """
+
+    try:
+        return store.CheckStore()
+    except (OSError, sqlite3.Error):
+        return None
+
+
+def _choose_accounts(customerid, action):
+    """ Asks which accounts to work on
+
+    Returns the customerid to use, and whether to work on the account
+    and all of its subaccounts at once
+    """
+
+    message = "Do you want to %s checks from all subaccounts as well?" % action
+    everywhere = _utils.inquirer_confirm(message, default=False)
+
+    if everywhere:
+        return None, True
+
+    if customerid:
+        subacount_msg = "Do you want to %s checks from your subaccount?" % action
+        use_subaccount = _utils.inquirer_confirm(subacount_msg, default=False)
+
+        if not use_subaccount:
+            customerid = None
+
+    return customerid, False
+
+
+def _fetch_checks(token, customerid=None, everywhere=False):
     """ Fetches all NodePing checks of type PUSH
 
-    Fetches all NodePing checks for the account and returns only the
-    checks that are of type PUSH
+    Looks up the PUSH checks in the account's check catalog. The
+    checks saved by the last run are shown at once while they are
+    synced with NodePing in the background. With everywhere, the
+    checks of the account and every subaccount are fetched at once.
+    Returns the checks and the catalogs they came from
     """
 
-    query_nodeping = get_checks.GetChecks(token, customerid=customerid)
-    checks = query_nodeping.all_checks()
+    if not everywhere:
+        checks = catalog.shared(token, customerid, store=_check_store())
+
+        return checks.where(type="PUSH"), [checks]
+
+    tree = account_tree.AccountTree(token, store=_check_store())
+    push_checks = tree.where(type="PUSH")
+
+    for failed, error in tree.errors.items():
+        print("Unable to fetch checks of %s: %s" % (
+            failed or "the main account", error))
+
+    return push_checks, tree.catalogs()
+
 
-    return {key: value for key, value in checks.items() if value['type'] == "PUSH"}
+def _search(catalogs, text, limit, fuzzy):
+    found = {}
+
+    for checks in catalogs:
+        for check in checks.search(text, limit, fuzzy, type="PUSH"):
+            found.setdefault(check.id, check)
+
+    return found
+
+
+def _filter_checks(checks, catalogs):
+    """ Asks for a label, ID or checktoken and keeps the checks matching it
+
+    Matches are found with the search index each catalog keeps, exact
+    matches first, then checks starting with the text. Only when none
+    match, the labels most like the text are kept, for typos. Nothing
+    entered keeps every check
+    """
+
+    questions = [
+        {
+            'type': 'input',
+            'name': 'filter',
+            'message': 'Filter by label, ID or checktoken (Enter for all)'
+        }
+    ]
+
+    text = prompt(questions)['filter'].strip()
+
+    if not text:
+        return checks
+
+    found = _search(catalogs, text, None, fuzzy=False)
+
+    if not found:
+        found = _search(catalogs, text, 20, fuzzy=True)
+
+    return {check_id: checks[check_id] for check_id in found
+            if check_id in checks}
 
 
 def list_checks(token, customerid=None):
@@ -70,19 +158,20 @@ def list_checks(token, customerid=None):
     one-by-one or stop printing.
     """
 
-    if customerid:
-        subacount_msg = "Do you want to list checks from your subaccount?"
-        use_subaccount = _utils.inquirer_confirm(subacount_msg, default=False)
-
-        if not use_subaccount:
-            customerid = None
+    customerid, everywhere = _choose_accounts(customerid, "list")
 
-    push_checks = _fetch_checks(token, customerid)
+    push_checks, catalogs = _fetch_checks(token, customerid, everywhere)
 
     if not push_checks:
         print("\nNo push checks created for this account account")
         return
 
+    push_checks = _filter_checks(push_checks, catalogs)
+
+    if not push_checks:
+        print("\nNo PUSH checks match")
+        return
+
     message = 'Print all PUSH checks at once?'
     printall = _utils.inquirer_confirm(message, default=False)
 
@@ -92,41 +181,35 @@ def list_checks(token, customerid=None):
         next_check = None
 
     # Prints each check in a user-readable format
-    for _key, contents in push_checks.items():
-
-        # If no label, substitute for placeholder
-        try:
-            label = contents['label']
-        except KeyError:
-            label = "(none)"
+    for check in push_checks.values():
 
         # If no oldresultfail, it is False
-        try:
-            oldresultfail = str(contents['parameters']['oldresultfail'])
-        except KeyError:
-            oldresultfail = False
+        oldresultfail = str(check.parameters.get('oldresultfail', False))
 
         _utils.seperator()
-        print("Label: %s" % label)
-        print("ID: %s" % contents['_id'])
-        print("Checktoken: %s" % contents['parameters']['checktoken'])
+
+        if everywhere:
+            print("Subaccount: %s" % (check.customerid or "(main account)"))
+
+        print("Label: %s" % (check.label or "(none)"))
+        print("ID: %s" % check.id)
+        print("Checktoken: %s" % check.checktoken)
         print("Fail when results are old: %s" % oldresultfail)
 
         # If the check hasn't had a PASS/FAIL status, a - is put in its place
-        try:
-            if contents['state'] == 1:
-                print("Status: PASS")
-            else:
-                print("Status: FAIL")
-        except KeyError:
+        if check.state is None:
             print("Status: -")
+        elif check.state == 1:
+            print("Status: PASS")
+        else:
+            print("Status: FAIL")
 
-        if contents['enable'] == 'active':
+        if check.active:
             print("Enabled: Yes")
         else:
             print("Enabled: No")
 
-        print("Interval: %s\n" % contents['interval'])
+        print("Interval: %s\n" % check.interval)
 
         if next_check != 'A':
             next_check = input(
@@ -323,37 +406,85 @@ def configure(token, customerid=None):
     return check_results
 
 
-def delete(token, customerid=None):
-    """ Get a list of existing PUSH checks and let the user select and delete
+def last_reports(token, customerid=None):
+    """ Prints when every PUSH check last reported
 
-    Lists the existing PUSH checks on the user's account. The user checks the
-    checkboxes of checks they want to delete, then NodePing is queried and
-    requested to delete the selected checks
+    The last result of every PUSH check is fetched at once and printed
+    as a table, oldest report first so silent clients stand out
     """
 
     if customerid:
-        subacount_msg = "Do you want to delete checks from your subaccount?"
+        subacount_msg = "Do you want to list checks from your subaccount?"
         use_subaccount = _utils.inquirer_confirm(subacount_msg, default=False)
 
         if not use_subaccount:
             customerid = None
 
+    push_checks, _catalogs = _fetch_checks(token, customerid)
+
+    if not push_checks:
+        print("\nNo push checks created for this account account")
+        return
+
+    def report(done, total, _item):
+        print("\rFetched %s/%s" % (done, total), end="", flush=True)
+
+    query_nodeping = get_checks.GetChecks(token, customerid=customerid)
+    rows = query_nodeping.last_results(list(push_checks), progress=report)
+    rows.sort(key=lambda row: row.timestamp or 0)
+
+    print("\n")
+    print("%-26s %-20s %-6s %8s  %s" % ("ID", "Last report (UTC)", "Result",
+                                         "Runtime", "Label"))
+
+    for row in rows:
+        label = push_checks[row.check_id].label or '(none)'
+
+        if row.error is not None:
+            print("%-26s %-20s %-6s %8s  %s" % (row.check_id, "error", "-", "-",
+                                                 label))
+            continue
+
+        if row.timestamp:
+            reported = time.strftime("%Y-%m-%d %H:%M:%S",
+                                     time.gmtime(row.timestamp / 1000))
+        else:
+            reported = "never"
+
+        result = {True: "PASS", False: "FAIL"}.get(row.success, "-")
+        runtime = "-" if row.runtime is None else "%sms" % row.runtime
+
+        print("%-26s %-20s %-6s %8s  %s" % (row.check_id, reported, result,
+                                             runtime, label))
+
+    _utils.seperator()
+
+
+def delete(token, customerid=None):
+    """ Get a list of existing PUSH checks and let the user select and delete
+
+    Lists the existing PUSH checks on the user's account. The user checks the
+    checkboxes of checks they want to delete, then NodePing is queried and
+    requested to delete the selected checks
+    """
+
+    customerid, everywhere = _choose_accounts(customerid, "delete")
+
     # Fetches existing PUSH checks
-    checks = _fetch_checks(token, customerid=customerid)
+    checks = _filter_checks(*_fetch_checks(token, customerid, everywhere))
 
     checks_list = []
+    names = {}
 
-    for _key, value in checks.items():
-
+    for check in checks.values():
         # If no label exists, set label to (No Label)
-        try:
-            label = value['label']
-        except KeyError:
-            label = '(No Label)'
+        label = check.label or '(No Label)'
 
-        checktoken = value['parameters']['checktoken']
+        if everywhere and check.customerid:
+            label = "%s [%s]" % (label, check.customerid)
 
-        checks_list.append("%s - %s" % (label, checktoken))
+        names[check.id] = "%s - %s" % (label, check.checktoken)
+        checks_list.append({'name': names[check.id], 'value': check.id})
 
     questions = [
         {
@@ -369,8 +500,8 @@ def delete(token, customerid=None):
     _utils.seperator()
 
     # Prints the selected checks to console
-    for item in answers['remove_checks']:
-        print(item)
+    for check_id in answers['remove_checks']:
+        print(names[check_id])
 
     _utils.seperator()
 
@@ -380,18 +511,23 @@ def delete(token, customerid=None):
 
     # Deletes all selected checks
     if confirm:
-        for _key, value in checks.items():
-            checktoken = value['parameters']['checktoken']
-
-            for to_remove in answers['remove_checks']:
-                if checktoken in to_remove:
-                    checkid = value['_id']
-                    try:
-                        delete_checks.remove(token, checkid)
-                    except urllib.error.URLError:
-                        raise "Lost connection to NodePing"
-
-                    print("Deleted %s" % to_remove)
+        # The selected choices are the check IDs
+        selected = answers['remove_checks']
+
+        def report(_done, _total, item):
+            if item.ok:
+                print("Deleted %s" % names[item.key])
+            else:
+                print("Failed to delete %s: %s" % (names[item.key], item.error))
+
+        if everywhere:
+            # Each check is deleted on the subaccount it belongs to
+            tree = account_tree.AccountTree(token)
+            tree.delete([checks[check_id] for check_id in selected],
+                        progress=report)
+        else:
+            delete_checks.remove_many(
+                token, list(selected), customerid=customerid, progress=report)
 
     _utils.seperator()
     print("Done!\n")
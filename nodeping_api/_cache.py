@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" In-memory response cache for GET requests to the NodePing API
+
+Entries are keyed by the request URL with the token removed from it;
+a fingerprint of the token is kept beside it so accounts never share
+entries and the token itself is never stored. Each endpoint family
+(checks, contacts, schedules, ...) has its own time to live, and the
+least recently used entry is evicted once the cache is full.
+
+A POST, PUT or DELETE invalidates the cached responses of the
+families it can change, so reads stay correct after a mutation.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+# Families whose cached responses a mutation of the key family changes.
+# A change to accounts can affect anything on the account.
+INVALIDATES = {
+    "checks": ("checks", "results"),
+    "contacts": ("contacts", "contactgroups"),
+    "contactgroups": ("contactgroups",),
+    "schedules": ("schedules",),
+    "accounts": None,
+}
+
+
+def canonical(url):
+    """ Splits a URL into its token and a canonical form without it
+
+    Query parameters are sorted so that the same request built in a
+    different order maps to the same entry.
+
+    :type url: string
+    :param url: Full URL including the token
+    :return: (token, endpoint family, canonical URL without token)
+    :rtype: tuple
+    """
+
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    token = ""
+    kept = []
+
+    for key, value in query:
+        if key == "token":
+            token = value
+        else:
+            kept.append((key, value))
+
+    path = parts.path
+    marker = path.find("/api/1/")
+
+    if marker != -1:
+        family = path[marker + 7:].split("/", 1)[0]
+    else:
+        family = path.strip("/").split("/", 1)[0]
+
+    url = "{0}://{1}{2}".format(parts.scheme, parts.netloc, path)
+
+    if kept:
+        url = "{0}?{1}".format(url, urlencode(sorted(kept)))
+
+    return token, family, url
+
+
+def fingerprint(token):
+    """ Short one-way fingerprint of an API token
+    """
+
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:16]
+
+
+class ResponseCache:
+    """ Thread safe TTL and LRU cache of raw response bodies
+
+    :type maxsize: int
+    :param maxsize: Most entries kept before evicting the oldest used
+    :type ttl: dict
+    :param ttl: Seconds to keep entries per endpoint family. Families
+    that are missing, or set to 0, are not cached
+    :type max_body: int
+    :param max_body: Largest body in bytes that is cached
+    """
+
+    def __init__(self, maxsize=256, ttl=None, max_body=8 * 1024 * 1024):
+        self.maxsize = maxsize
+        self.ttl = dict(ttl or {})
+        self.max_body = max_body
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, url):
+        """ Returns the cache key for url, or None if it is not cached
+        """
+
+        token, family, url = canonical(url)
+
+        if not self.maxsize or not self.ttl.get(family):
+            return None
+
+        return fingerprint(token), family, url
+
+    def get(self, key):
+        """ Returns the cached body for key, or None
+        """
+
+        if key is None:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            if entry is not None:
+                del self._entries[key]
+
+            self.misses += 1
+
+        return None
+
+    def put(self, key, body):
+        """ Stores a response body for key
+        """
+
+        if key is None or len(body) > self.max_body:
+            return
+
+        expires = time.monotonic() + self.ttl[key[1]]
+
+        with self._lock:
+            self._entries[key] = (expires, body)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, url):
+        """ Drops the entries a mutation of url may have made stale
+        """
+
+        token, family, _url = canonical(url)
+        account = fingerprint(token)
+        families = INVALIDATES.get(family, (family,))
+
+        with self._lock:
+            stale = [key for key in self._entries
+                     if key[0] == account
+                     and (families is None or key[1] in families)]
+
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries),
+                    "hits": self.hits,
+                    "misses": self.misses}
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" JSON encoding and decoding for API request and response bodies
+
+Uses orjson or ujson when one of them is installed and falls back to
+the standard library json module otherwise. Every codec encodes to
+UTF-8 bytes and decodes straight from bytes, without building an
+intermediate str of the whole body.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+class Codec:
+    """ A named pair of dumps(obj) -> bytes and loads(bytes) -> obj
+    """
+
+    __slots__ = ("name", "dumps", "loads")
+
+    def __init__(self, name, dumps, loads):
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+
+    def __repr__(self):
+        return "Codec({0!r})".format(self.name)
+
+
+def _stdlib_dumps(obj):
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+CODECS = {"json": Codec("json", _stdlib_dumps, json.loads)}
+
+if ujson is not None:
+    CODECS["ujson"] = Codec(
+        "ujson",
+        lambda obj: ujson.dumps(obj, escape_forward_slashes=False).encode("utf-8"),
+        ujson.loads)
+
+if orjson is not None:
+    CODECS["orjson"] = Codec("orjson", orjson.dumps, orjson.loads)
+
+# Fastest available codec first
+PREFERENCE = ("orjson", "ujson", "json")
+
+_current = next(CODECS[name] for name in PREFERENCE if name in CODECS)
+
+
+def use(name=None):
+    """ Selects the codec used for API bodies
+
+    :type name: string
+    :param name: "orjson", "ujson" or "json". None picks the fastest
+    one that is installed
+    :return: The codec now in use
+    :rtype: Codec
+    """
+
+    global _current
+
+    if name is None:
+        name = next(codec for codec in PREFERENCE if codec in CODECS)
+
+    try:
+        _current = CODECS[name]
+    except KeyError:
+        raise ValueError("JSON codec {0!r} is not installed".format(name))
+
+    return _current
+
+
+def current():
+    """ Returns the codec in use
+    """
+
+    return _current
+
+
+def dumps(obj):
+    """ Encodes obj to JSON as UTF-8 bytes
+    """
+
+    return _current.dumps(obj)
+
+
+def loads(data):
+    """ Decodes JSON from UTF-8 bytes
+    """
+
+    return _current.loads(data)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" gzip/deflate transfer decoding for NodePing API responses
+
+Response bodies are decompressed chunk by chunk as they are read from
+the connection, and both the bytes received over the wire and the
+decoded bytes are counted so the saving can be measured.
+"""
+
+import threading
+import zlib
+
+ACCEPT_ENCODING = "gzip, deflate"
+CHUNK_SIZE = 64 * 1024
+
+
+class _DeflateDecoder:
+    """ Decoder for Content-Encoding: deflate
+
+    The standard says zlib wrapped data, but some servers send a raw
+    deflate stream, so fall back to that if the zlib header is wrong.
+    """
+
+    def __init__(self):
+        self._decoder = zlib.decompressobj()
+        self._first = True
+
+    def decompress(self, data):
+        if not self._first:
+            return self._decoder.decompress(data)
+
+        self._first = False
+
+        try:
+            return self._decoder.decompress(data)
+        except zlib.error:
+            self._decoder = zlib.decompressobj(-zlib.MAX_WBITS)
+            return self._decoder.decompress(data)
+
+    def flush(self):
+        return self._decoder.flush()
+
+
+def decoder(content_encoding):
+    """ Returns a decompressor for the Content-Encoding header
+
+    :type content_encoding: string
+    :param content_encoding: Value of the Content-Encoding header
+    :return: Object with decompress() and flush(), or None for identity
+    """
+
+    encoding = (content_encoding or "").strip().lower()
+
+    if encoding in ("gzip", "x-gzip"):
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if encoding == "deflate":
+        return _DeflateDecoder()
+
+    return None
+
+
+class Transfer:
+    """ Byte counts for one response body
+
+    wire_bytes is what was received, raw_bytes the decoded size.
+    """
+
+    __slots__ = ("encoding", "wire_bytes", "raw_bytes")
+
+    def __init__(self, encoding=None):
+        self.encoding = encoding
+        self.wire_bytes = 0
+        self.raw_bytes = 0
+
+    def __repr__(self):
+        return "Transfer(encoding={0!r}, wire_bytes={1}, raw_bytes={2})".format(
+            self.encoding, self.wire_bytes, self.raw_bytes)
+
+
+def iter_body(response, transfer, chunk_size=CHUNK_SIZE):
+    """ Yields the decoded body of response as it is read
+
+    :param response: Response with read() and getheader()
+    :type transfer: Transfer
+    :param transfer: Byte counts that are updated while reading
+    :return: Generator of decoded chunks of bytes
+    """
+
+    encoding = response.getheader("Content-Encoding")
+    transfer.encoding = encoding
+    decompressor = decoder(encoding)
+
+    while True:
+        chunk = response.read(chunk_size)
+
+        if not chunk:
+            break
+
+        transfer.wire_bytes += len(chunk)
+
+        if decompressor is not None:
+            chunk = decompressor.decompress(chunk)
+
+        if chunk:
+            transfer.raw_bytes += len(chunk)
+            yield chunk
+
+    if decompressor is not None:
+        tail = decompressor.flush()
+
+        if tail:
+            transfer.raw_bytes += len(tail)
+            yield tail
+
+
+class TransferStats:
+    """ Running totals of wire and decoded bytes across all responses
+
+    The most recent Transfer of each thread is kept as well.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.responses = 0
+            self.wire_bytes = 0
+            self.raw_bytes = 0
+
+    def add(self, transfer):
+        self._local.last = transfer
+
+        with self._lock:
+            self.responses += 1
+            self.wire_bytes += transfer.wire_bytes
+            self.raw_bytes += transfer.raw_bytes
+
+    def last(self):
+        """ Returns the Transfer of the calling thread's last response
+        """
+
+        return getattr(self._local, "last", None)
+
+    def as_dict(self):
+        with self._lock:
+            return {"responses": self.responses,
+                    "wire_bytes": self.wire_bytes,
+                    "raw_bytes": self.raw_bytes}
@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Keep-alive connection pool used when querying the NodePing API
+
+Connections are kept open per host after a response has been fully
+read and are handed to the next request for that host, so repeated
+calls skip the TCP and TLS handshake. The pool can be shared between
+threads; a connection is only ever used by one thread at a time.
+"""
+
+import select
+import threading
+import time
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+from urllib.parse import urlsplit
+
+# Methods that may be sent twice without changing the outcome
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "PUT", "DELETE", "OPTIONS"))
+
+
+class PooledResponse:
+    """ Response that returns its connection to the pool once closed
+
+    Reading the body to the end, or calling close(), releases the
+    connection. Connections the server asked to close, or whose body
+    was not fully read, are closed instead of being reused.
+    """
+
+    def __init__(self, pool, key, conn, response):
+        self._pool = pool
+        self._key = key
+        self._conn = conn
+        self._response = response
+        self.status = response.status
+        self.reason = response.reason
+        self.headers = response.headers
+
+    def getheader(self, name, default=None):
+        """ Returns the value of a response header
+        """
+
+        return self._response.getheader(name, default)
+
+    def read(self, amt=None):
+        """ Reads up to amt bytes of the body, or all of it if amt is None
+        """
+
+        if self._conn is None:
+            return b''
+
+        data = self._response.read(amt)
+
+        if amt is None or not data:
+            self.close()
+
+        return data
+
+    def close(self):
+        """ Hands the connection back to the pool, or closes it
+        """
+
+        conn, self._conn = self._conn, None
+
+        if conn is None:
+            return
+
+        if self._response.isclosed() and not self._response.will_close:
+            self._pool._release(self._key, conn)
+        else:
+            self._response.close()
+            conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _dropped(conn):
+    """ Whether the server closed an idle connection
+
+    An idle keep-alive connection has nothing to read until the next
+    request, so one that is readable was closed (or broken) by the
+    server.
+    """
+
+    if conn.sock is None:
+        return False
+
+    try:
+        readable, _writable, _failed = select.select([conn.sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+
+    return bool(readable)
+
+
+class ConnectionPool:
+    """ Thread safe pool of keep-alive HTTP(S) connections
+
+    :type maxsize: int
+    :param maxsize: Number of idle connections kept open per host
+    :type idle_timeout: float
+    :param idle_timeout: Seconds an idle connection may be reused for
+    """
+
+    def __init__(self, maxsize=10, idle_timeout=30):
+        self.maxsize = maxsize
+        self.idle_timeout = idle_timeout
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _split(url):
+        """ Splits a URL into the pool key and the request path
+        """
+
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        port = parts.port or (443 if scheme == "https" else 80)
+
+        path = parts.path or "/"
+
+        if parts.query:
+            path = "{0}?{1}".format(path, parts.query)
+
+        return (scheme, parts.hostname, port), path
+
+    @staticmethod
+    def _connect(key):
+        scheme, host, port = key
+
+        if scheme == "https":
+            return HTTPSConnection(host, port)
+
+        return HTTPConnection(host, port)
+
+    def _acquire(self, key):
+        """ Returns an idle connection for the host, or a new one
+
+        :return: The connection and whether it was reused
+        :rtype: tuple
+        """
+
+        now = time.monotonic()
+        stale = []
+
+        with self._lock:
+            idle = self._idle.get(key, [])
+            conn = None
+
+            while idle:
+                candidate, last_used = idle.pop()
+
+                if now - last_used < self.idle_timeout:
+                    conn = candidate
+                    break
+
+                stale.append(candidate)
+
+        for old in stale:
+            old.close()
+
+        if conn is not None:
+            return conn, True
+
+        return self._connect(key), False
+
+    def _release(self, key, conn):
+        """ Puts a connection back in the pool for later reuse
+        """
+
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+
+            if len(idle) < self.maxsize:
+                idle.append((conn, time.monotonic()))
+                return
+
+        conn.close()
+
+    def request(self, method, url, body=None, headers=None, timeout=None):
+        """ Sends a request over a pooled connection
+
+        A reused connection that the server already closed is retried
+        on a fresh connection. For methods that are not idempotent,
+        such as POST, that only happens when the request could not be
+        sent, since the server may have acted on one that was sent
+        before the connection dropped. Such requests are not sent on a
+        reused connection the server has already closed.
+
+        :type method: string
+        :param method: HTTP method
+        :type url: string
+        :param url: Full URL for the request
+        :type body: bytes
+        :param body: Optional request body
+        :type headers: dict
+        :param headers: Optional request headers
+        :type timeout: tuple
+        :param timeout: (connect, read) timeouts in seconds; None in
+        either place waits as long as needed
+        :return: Response for the request
+        :rtype: PooledResponse
+        """
+
+        key, path = self._split(url)
+        headers = headers or {}
+        connect_timeout, read_timeout = timeout or (None, None)
+
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        while True:
+            conn, reused = self._acquire(key)
+            sent = False
+
+            if reused and not idempotent and _dropped(conn):
+                conn.close()
+                continue
+
+            try:
+                if conn.sock is None:
+                    conn.timeout = connect_timeout
+                    conn.connect()
+
+                conn.sock.settimeout(read_timeout)
+                conn.request(method, path, body=body, headers=headers)
+                sent = True
+                response = conn.getresponse()
+            except (HTTPException, ConnectionError):
+                conn.close()
+
+                if reused and (idempotent or not sent):
+                    continue
+
+                raise
+            except Exception:
+                conn.close()
+                raise
+
+            return PooledResponse(self, key, conn, response)
+
+    def clear(self):
+        """ Closes every idle connection in the pool
+        """
+
+        with self._lock:
+            idle, self._idle = self._idle, {}
+
+        for connections in idle.values():
+            for conn, _last_used in connections:
+                conn.close()
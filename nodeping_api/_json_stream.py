@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Incremental parsing of large JSON documents
+
+Parses the members of a top level JSON object, or the elements of a
+top level JSON array, one at a time from an iterable of byte chunks.
+Only the member being parsed and the unread part of the current chunk
+are held in memory, no matter how large the whole document is.
+"""
+
+import codecs
+import json
+import re
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_NUMBER_CHARS = frozenset(('', '.', 'e', 'E', '+', '-') + tuple('0123456789'))
+
+
+class _Reader:
+    """ Text buffer over byte chunks that drops what was already parsed
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """ Appends the next chunk to the buffer
+
+        :return: False once there is nothing left to read
+        :rtype: bool
+        """
+
+        if self.eof:
+            return False
+
+        for chunk in self._chunks:
+            text = self._decoder.decode(chunk)
+
+            if text:
+                self.buf = self.buf[self.pos:] + text
+                self.pos = 0
+                return True
+
+        self.buf = self.buf[self.pos:] + self._decoder.decode(b'', final=True)
+        self.pos = 0
+        self.eof = True
+
+        return False
+
+    def peek(self):
+        """ Skips whitespace and returns the next character, '' at the end
+        """
+
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, chars):
+        char = self.peek()
+
+        if not char or char not in chars:
+            raise ValueError("Expected one of {0!r} at offset {1}, got {2!r}".format(
+                chars, self.pos, char))
+
+        self.pos += 1
+
+        return char
+
+    def value(self):
+        """ Parses the next complete JSON value
+        """
+
+        self.peek()
+
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._grow():
+                    raise
+                continue
+
+            # A number cut off by the end of the buffer ("12" of "12.5")
+            # parses fine, so make sure the number really ended
+            if (isinstance(obj, (int, float)) and not isinstance(obj, bool)
+                    and self.buf[end:end + 1] in _NUMBER_CHARS and self.fill()):
+                continue
+
+            self.pos = end
+
+            return obj
+
+    def _grow(self):
+        """ Reads until the unparsed part of the buffer has doubled
+
+        Growing geometrically keeps re-parsing a value that spans many
+        chunks linear in its size.
+        """
+
+        target = max(2 * (len(self.buf) - self.pos), 1)
+        grown = False
+
+        while len(self.buf) - self.pos < target and self.fill():
+            grown = True
+
+        return grown
+
+
+def iter_object(chunks):
+    """ Yields (key, value) pairs of a top level JSON object
+
+    :param chunks: Iterable of bytes making up the document
+    :return: Generator of (key, value) tuples in document order
+    """
+
+    reader = _Reader(chunks)
+    reader.expect('{')
+
+    if reader.peek() == '}':
+        reader.pos += 1
+        return
+
+    while True:
+        key = reader.value()
+        reader.expect(':')
+        yield key, reader.value()
+
+        if reader.expect(',}') == '}':
+            return
+
+
+def iter_array(chunks):
+    """ Yields the elements of a top level JSON array
+
+    An empty object is accepted as an empty array, which is what
+    NodePing returns for some list endpoints with nothing to list.
+
+    :param chunks: Iterable of bytes making up the document
+    :return: Generator of elements in document order
+    """
+
+    reader = _Reader(chunks)
+
+    if reader.expect('[{') == '{':
+        reader.expect('}')
+        return
+
+    if reader.peek() == ']':
+        reader.pos += 1
+        return
+
+    while True:
+        yield reader.value()
+
+        if reader.expect(',]') == ']':
+            return
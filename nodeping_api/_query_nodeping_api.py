@@ -1,16 +1,734 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-import json
-try:
-    from urllib.error import HTTPError as httperror
-    from urllib.request import Request, urlopen
-except ImportError:
-    from urllib2 import Request, urlopen
-    from urllib2 import HTTPError as httperror
+""" Send requests to the NodePing API and decode the JSON responses
+
+All requests go through the transport backend set in config.TRANSPORT,
+by default a shared keep-alive connection pool so that repeated calls
+reuse their HTTPS connection to the API, see _transports. Every request
+takes a token from the process wide rate limiter, and throttled or
+failed (5xx) responses are retried with backoff. POST requests are
+only retried when the caller asks for it, since a retried POST can
+create the same check twice.
+
+Responses are requested with gzip/deflate transfer encoding and are
+decompressed as they are read. The wire and decoded size of every
+response is recorded, see last_transfer() and transfer_stats().
+
+Large responses can be streamed with iter_object() and iter_array(),
+which parse one record at a time straight from the connection.
+
+Bodies are encoded and decoded with the fastest JSON codec installed
+(orjson, ujson or the standard library), see _codec.
+
+Successful GET responses are cached per endpoint for the time set in
+config.CACHE_TTL, and any POST, PUT or DELETE drops the cached
+responses it may have changed, see _cache. Identical GETs made at the
+same time by several threads are sent once and share the response,
+see coalesce_stats().
+
+Requests wait for one of config.MAX_CONCURRENT_REQUESTS slots, handed
+out by priority class (interactive, normal, bulk), see scheduler.
+
+Each request has the connect and read timeouts of config.CONNECT_TIMEOUT
+and config.READ_TIMEOUT, shortened to fit an operation deadline set
+with nodeping_api.deadline. Once the deadline passes, requests raise
+deadline.DeadlineExceeded instead of being sent.
+
+Connection errors, timeouts and 5xx responses count against a circuit
+breaker per endpoint family. While the circuit of a family is open,
+its requests fail at once with circuit_breaker.CircuitOpenError, see
+circuit_breaker.
+
+Every call ends with a RequestEvent passed to the hooks registered in
+nodeping_api.instrumentation.
+
+The connection pool, response cache and counters belong to a
+Session. Calls use the process wide default session unless
+another one is active in their context, see activate() and
+nodeping_api.client.NodePingClient.
+"""
+
+import contextlib
+import contextvars
+import threading
+from . import (_cache, _codec, _compression, _json_stream, _rate_limit,
+               _single_flight, _transports, circuit_breaker, config, deadline,
+               instrumentation, scheduler)
+
+
+# Requests per second budget shared by every session without a rate
+# limit of its own
+_LIMITER = _rate_limit.TokenBucket(config.RATE_LIMIT, config.RATE_LIMIT_BURST)
+
+
+class Session:
+    """ Connection pool, response cache, rate limit and counters
+
+    Requests share the session that is active in their context, see
+    activate(). Without one they use a process wide default session
+    built from config, so module level calls share their connections
+    and cache. The request slots, circuit breakers and, unless the
+    session is given a rate limit of its own, the rate limiter are
+    shared by every session in the process, since they protect the
+    API rather than one caller.
+
+    :type transport: string
+    :param transport: Backend name, defaults to config.TRANSPORT
+    :type pool_size: int
+    :param pool_size: Idle connections kept open per host
+    :type rate_limit: float
+    :param rate_limit: Requests per second for this session alone, 0
+    for no limit. With neither rate_limit nor burst the session takes
+    its requests from the process wide budget of config.RATE_LIMIT
+    :type cache_size: int
+    :param cache_size: Most responses cached, 0 disables the cache
+    :type cache_ttl: dict
+    :param cache_ttl: Seconds to cache responses for per endpoint
+    family, merged with config.CACHE_TTL
+    """
+
+    def __init__(self, transport=None, pool_size=None, idle_timeout=None,
+                 rate_limit=None, burst=None, cache_size=None, cache_ttl=None):
+        if pool_size is None:
+            pool_size = config.POOL_SIZE
+        if idle_timeout is None:
+            idle_timeout = config.POOL_IDLE_TIMEOUT
+        if cache_size is None:
+            cache_size = config.CACHE_SIZE
+
+        ttl = dict(config.CACHE_TTL)
+        ttl.update(cache_ttl or {})
+
+        self.pool = _transports.PooledTransport(pool_size, idle_timeout)
+        self.backend = self.pool
+        if rate_limit is None and burst is None:
+            self.limiter = _LIMITER
+        else:
+            self.limiter = _rate_limit.TokenBucket(
+                config.RATE_LIMIT if rate_limit is None else rate_limit,
+                config.RATE_LIMIT_BURST if burst is None else burst)
+        self.transfers = _compression.TransferStats()
+        self.cache = _cache.ResponseCache(cache_size, ttl)
+        self.flights = _single_flight.SingleFlight()
+        self._lock = threading.Lock()
+        self.reset_stats()
+        self.use_backend(transport or config.TRANSPORT)
+
+    def use_backend(self, name):
+        """ Switches the transport backend requests are sent through
+
+        :type name: string
+        :param name: "urllib", "pooled" or "http2", see _transports
+        """
+
+        if name == self.pool.name:
+            backend = self.pool
+        else:
+            backend = _transports.create(
+                name, self.pool.maxsize, self.pool.idle_timeout)
+
+        previous, self.backend = self.backend, backend
+
+        if previous is not self.pool and previous is not backend:
+            previous.close()
+
+    def record(self, event):
+        """ Adds a finished RequestEvent to the session counters
+        """
+
+        with self._lock:
+            self.requests += 1
+            self.errors += event.error is not None or (event.status or 0) >= 400
+            self.retries += event.retries
+            self.cached += event.cached
+            self.coalesced += event.coalesced
+            self.bytes_in += event.bytes_in
+            self.bytes_out += event.bytes_out
+
+    def reset_stats(self):
+        with self._lock:
+            self.requests = 0
+            self.errors = 0
+            self.retries = 0
+            self.cached = 0
+            self.coalesced = 0
+            self.bytes_in = 0
+            self.bytes_out = 0
+
+    def stats(self):
+        """ Counters for the calls made through the session
+
+        :return: Calls, errors, retries, calls answered from the cache
+        or shared with another caller, bytes sent and received, and the
+        cache, coalescing and transfer statistics
+        :rtype: dict
+        """
+
+        with self._lock:
+            counters = {"requests": self.requests, "errors": self.errors,
+                        "retries": self.retries, "cached": self.cached,
+                        "coalesced": self.coalesced,
+                        "bytes_in": self.bytes_in,
+                        "bytes_out": self.bytes_out}
+
+        counters["cache"] = self.cache.stats()
+        counters["coalesce"] = self.flights.stats()
+        counters["transfers"] = self.transfers.as_dict()
+
+        return counters
+
+    def close(self):
+        """ Closes the connections kept open by the session
+        """
+
+        if self.backend is not self.pool:
+            self.backend.close()
+
+        self.pool.clear()
+
+
+_DEFAULT_SESSION = Session()
+_SESSION = contextvars.ContextVar("nodeping_api_session", default=None)
+
+# Replaces the backend of every session while set, see set_transport()
+_TRANSPORT = None
+
+_SCHEDULER = scheduler.RequestScheduler(
+    config.MAX_CONCURRENT_REQUESTS, config.PRIORITY_WEIGHTS,
+    config.INTERACTIVE_RESERVED)
+_BREAKER = circuit_breaker.CircuitBreaker(
+    config.CIRCUIT_FAILURE_RATE, config.CIRCUIT_MIN_REQUESTS,
+    config.CIRCUIT_WINDOW, config.CIRCUIT_RESET_TIMEOUT, config.CIRCUIT_PROBES)
+
+
+class APIError(Exception):
+    """ Error response from NodePing for a streamed request
+
+    Streamed results cannot be handed back as an error dictionary the
+    way get() does, so the status and decoded body are raised instead.
+    Bulk requests keep it as the error of the item that failed.
+    """
+
+    def __init__(self, status, response):
+        super().__init__("NodePing API returned {0}: {1}".format(status, response))
+        self.status = status
+        self.response = response
+
+
+IDEMPOTENT_METHODS = frozenset(('GET', 'PUT', 'DELETE'))
+
+
+def current_session():
+    """ Returns the session requests in this context are made with
+    """
+
+    return _SESSION.get() or _DEFAULT_SESSION
+
+
+@contextlib.contextmanager
+def activate(session):
+    """ Makes requests in the block use the given session
+
+    Works per thread and per asyncio task, and is carried over to
+    the workers of nodeping_api.aio.
+
+    :type session: Session
+    :param session: Session to use, None for the default session
+    """
+
+    token = _SESSION.set(session)
+
+    try:
+        yield session
+    finally:
+        _SESSION.reset(token)
+
+
+def configure_pool(pool_size=None, idle_timeout=None):
+    """ Changes the size and idle timeout of the pooled backend
+
+    Idle connections already in the pool are closed so that the new
+    settings apply to every connection made afterwards.
+
+    :type pool_size: int
+    :param pool_size: Idle connections kept open per host
+    :type idle_timeout: float
+    :param idle_timeout: Seconds an idle connection may be reused for
+    """
+
+    pool = current_session().pool
+
+    if pool_size is not None:
+        pool.maxsize = pool_size
+    if idle_timeout is not None:
+        pool.idle_timeout = idle_timeout
+
+    pool.clear()
+
+
+def use_backend(name):
+    """ Switches the transport backend of the current session
+
+    :type name: string
+    :param name: "urllib", "pooled" or "http2", see _transports
+    """
+
+    current_session().use_backend(name)
+
+
+def backend():
+    """ Returns the transport backend of the current session
+    """
+
+    return current_session().backend
+
+
+def set_transport(transport):
+    """ Replaces what requests are sent through and returns the old one
+
+    The transport needs a request(method, url, body, headers, timeout)
+    method returning a response with status, getheader(), read() and
+    close(), like the transport backends or a cassette. It is used
+    for every session until it is replaced again; None goes back to
+    the backend of each session.
+    """
+
+    global _TRANSPORT
+
+    previous, _TRANSPORT = _TRANSPORT, transport
+
+    return previous
+
+
+def configure_scheduler(max_concurrent=None, weights=None, reserved=None):
+    """ Changes the request slots and how they are shared
+
+    :type max_concurrent: int
+    :param max_concurrent: Requests in flight at once, 0 for no limit
+    :type weights: dict
+    :param weights: Weight per priority class
+    :type reserved: int
+    :param reserved: Slots kept for interactive requests
+    """
+
+    _SCHEDULER.configure(max_concurrent, weights, reserved)
+
+
+def scheduler_stats():
+    """ Slots in use, and requests waiting and granted per priority
+
+    :rtype: dict
+    """
+
+    return _SCHEDULER.stats()
+
+
+def configure_circuit_breaker(failure_rate=None, min_requests=None,
+                              window=None, reset_timeout=None, probes=None):
+    """ Changes when circuits open and how they recover
+
+    Every circuit is closed again once the settings are changed.
+
+    :type failure_rate: float
+    :param failure_rate: Share of failed requests that opens a circuit,
+    0 to disable the breaker
+    :type min_requests: int
+    :param min_requests: Requests in the window before a circuit opens
+    :type window: int
+    :param window: Recent requests the failure rate is taken over
+    :type reset_timeout: float
+    :param reset_timeout: Seconds a circuit stays open before probing
+    :type probes: int
+    :param probes: Probe requests that must succeed to close a circuit
+    """
+
+    _BREAKER.configure(failure_rate, min_requests, window, reset_timeout,
+                       probes)
+
+
+def circuit_stats():
+    """ State, failure rate and request count per endpoint family
+
+    :rtype: dict
+    """
+
+    return _BREAKER.stats()
+
+
+def configure_rate_limit(rate=None, burst=None):
+    """ Changes the requests per second budget of the current session
+
+    Unless the session has a rate limit of its own, this is the budget
+    shared by every session in the process.
+
+    :type rate: float
+    :param rate: Requests per second, 0 to disable the limit
+    :type burst: int
+    :param burst: Requests that may be sent at once before limiting
+    """
+
+    limiter = current_session().limiter
+
+    if rate is None:
+        rate = limiter.rate
+    if burst is None:
+        burst = limiter.burst
+
+    limiter.configure(rate, burst)
+
+
+def configure_cache(size=None, ttl=None):
+    """ Changes the size of the response cache or its lifetimes
+
+    :type size: int
+    :param size: Most responses kept, 0 disables the cache
+    :type ttl: dict
+    :param ttl: Seconds to cache responses for, per endpoint family
+    such as 'checks' or 'contacts'. Merged with the current settings
+    """
+
+    cache = current_session().cache
+
+    if size is not None:
+        cache.maxsize = size
+    if ttl is not None:
+        cache.ttl.update(ttl)
+
+    cache.clear()
+
+
+def clear_cache():
+    """ Drops every response cached by the current session
+    """
+
+    current_session().cache.clear()
+
+
+def cache_stats():
+    """ Number of cached responses, cache hits and misses
+
+    :rtype: dict
+    """
+
+    return current_session().cache.stats()
+
+
+def coalesce_stats():
+    """ Number of GETs sent and of GETs that shared an in-flight one
+
+    :return: executed, coalesced and in_flight counts
+    :rtype: dict
+    """
 
+    return current_session().flights.stats()
 
-def post(url, data_dictionary):
+
+def last_transfer():
+    """ Byte counts of the last response read by the calling thread
+
+    :return: Transfer with encoding, wire_bytes and raw_bytes, or None
+    :rtype: _compression.Transfer
+    """
+
+    return current_session().transfers.last()
+
+
+def transfer_stats():
+    """ Totals of wire and decoded bytes for every response so far
+
+    :return: Number of responses, wire_bytes and raw_bytes
+    :rtype: dict
+    """
+
+    return current_session().transfers.as_dict()
+
+
+@contextlib.contextmanager
+def _slot():
+    """ Holds a request slot, waiting no longer than the deadline allows
+    """
+
+    if not _SCHEDULER.acquire(timeout=deadline.remaining()):
+        raise deadline.DeadlineExceeded(
+            "Operation deadline exceeded waiting for a request slot")
+
+    try:
+        yield
+    finally:
+        _SCHEDULER.release()
+
+
+def _read(response, event=None):
+    """ Reads and decodes the whole body of a response
+    """
+
+    transfer = _compression.Transfer()
+    body = b''.join(_compression.iter_body(response, transfer))
+    current_session().transfers.add(transfer)
+
+    if event is not None:
+        event.bytes_in += transfer.wire_bytes
+
+    return body
+
+
+def _send(method, url, body=None, headers=None, retry=None, event=None):
+    """ Sends the request with the session's backend, retrying when
+    it is allowed
+
+    Returns the response with its body still unread. Responses that
+    are retried have their body read and dropped.
+
+    :type retry: bool
+    :param retry: Whether to retry failed requests. Defaults to True
+    for idempotent methods and False for POST
+    :type event: instrumentation.RequestEvent
+    :param event: Event that records the status, bytes and retries
+    """
+
+    headers = dict(headers or {})
+    headers['Accept-Encoding'] = _compression.ACCEPT_ENCODING
+
+    if retry is None:
+        retry = method in IDEMPOTENT_METHODS
+
+    max_retries = config.MAX_RETRIES if retry else 0
+    attempt = 0
+    family = _cache.canonical(url)[1]
+    session = current_session()
+    transport = _TRANSPORT or session.backend
+
+    while True:
+        # Checked before taking from the rate limit, so failing fast
+        # does not use up the request budget
+        probe = _BREAKER.before(family)
+
+        try:
+            waited = session.limiter.acquire(deadline.remaining())
+        except BaseException:
+            _BREAKER.after(family, None, probe)
+            raise
+
+        if not waited:
+            _BREAKER.after(family, None, probe)
+            raise deadline.DeadlineExceeded(
+                "Operation deadline exceeded waiting for the rate limit")
+
+        if event is not None:
+            event.retries = attempt
+            event.bytes_out += len(body or b'')
+
+        try:
+            # Inside the try, so a deadline running out here still hands
+            # a half-open probe back to the breaker
+            timeout = (deadline.clamp(config.CONNECT_TIMEOUT),
+                       deadline.clamp(config.READ_TIMEOUT))
+            response = transport.request(method, url, body, headers, timeout)
+        except OSError:
+            # A timeout cut short by the deadline is not worth retrying,
+            # and says nothing about the API
+            try:
+                deadline.check()
+            except deadline.DeadlineExceeded:
+                _BREAKER.after(family, None, probe)
+                raise
+
+            _BREAKER.after(family, True, probe)
+
+            if attempt >= max_retries:
+                raise
+            server_delay = None
+        except BaseException:
+            _BREAKER.after(family, None, probe)
+            raise
+        else:
+            _BREAKER.after(family, response.status >= 500, probe)
+
+            if event is not None:
+                event.status = response.status
+
+            if (response.status not in _rate_limit.RETRY_STATUSES
+                    or attempt >= max_retries):
+                return response
+
+            server_delay = _rate_limit.retry_after(
+                response.getheader('Retry-After'))
+
+            with response:
+                _read(response, event)
+
+        deadline.sleep(_rate_limit.backoff(
+            attempt, config.BACKOFF_BASE, config.BACKOFF_MAX, server_delay))
+        attempt += 1
+
+
+def _request(method, url, data_dictionary=None, retry=None, cache=True):
+    """ Sends the request and decodes the JSON response
+
+    Error responses from NodePing carry a JSON body as well, which is
+    returned the same way as a successful response once retries have
+    run out.
+
+    :type cache: bool
+    :param cache: Whether a GET may be answered from the cache. The
+    response is cached either way
+    """
+
+    return _request_status(method, url, data_dictionary, retry, cache)[1]
+
+
+def _request_status(method, url, data_dictionary=None, retry=None,
+                    cache=True):
+    """ Sends the request like _request and returns the HTTP status
+    with the decoded JSON response, for callers that tell errors apart
+    by status
+
+    :return: (status, response)
+    :rtype: tuple
+    """
+
+    session = current_session()
+    event = instrumentation.RequestEvent(method, url)
+
+    try:
+        json_bytes = _fetch(session, method, url, data_dictionary, retry,
+                            cache, event)
+    except BaseException as err:
+        event.finish(err)
+        session.record(event)
+        raise
+
+    event.finish()
+    session.record(event)
+
+    # Every caller decodes its own copy so no two share mutable data
+    return event.status, _codec.loads(json_bytes)
+
+
+def _fetch(session, method, url, data_dictionary, retry, cache, event):
+    """ Returns the raw response body from the cache, a request that
+    is already in flight, or a new request
+    """
+
+    if method != 'GET':
+        try:
+            return _send_request(method, url, data_dictionary, retry, event)[1]
+        finally:
+            session.cache.invalidate(url)
+
+    key = session.cache.key(url)
+    cached = session.cache.get(key) if cache else None
+
+    if cached is not None:
+        event.cached = True
+        event.status = 200
+        return cached
+
+    token, _family, canonical_url = _cache.canonical(url)
+    flight_key = (_cache.fingerprint(token), canonical_url)
+    leader = []
+
+    def send():
+        leader.append(True)
+        return _send_request(method, url, data_dictionary, retry, event)
+
+    status, json_bytes = session.flights.do(flight_key, send)
+
+    if not leader:
+        event.coalesced = True
+        event.status = status
+    elif status < 300:
+        session.cache.put(key, json_bytes)
+
+    return json_bytes
+
+
+def _send_request(method, url, data_dictionary, retry, event=None):
+    """ Sends the request and returns the status and raw body
+    """
+
+    headers = {}
+    body = None
+
+    if data_dictionary is not None:
+        body = _codec.dumps(data_dictionary)
+        headers['Content-Type'] = 'application/json; charset=utf-8'
+        headers['Content-Length'] = str(len(body))
+
+    with _slot():
+        with _send(method, url, body, headers, retry, event) as response:
+            return response.status, _read(response, event)
+
+
+def _stream(url, cache=True):
+    """ Yields the decoded body of a GET request as it arrives
+
+    Bodies small enough for the cache are kept while streaming and
+    cached once complete; a cached body is yielded in one piece. With
+    cache False nothing is kept, so memory stays flat however large
+    the body.
+
+    :raises APIError: if NodePing answers with an error status
+    """
+
+    session = current_session()
+    event = instrumentation.RequestEvent('GET', url)
+    key = session.cache.key(url)
+    cached = session.cache.get(key) if cache else None
+
+    if cached is not None:
+        event.cached = True
+        event.status = 200
+        event.finish()
+        session.record(event)
+        yield cached
+        return
+
+    transfer = _compression.Transfer()
+    kept = [] if cache and key is not None else None
+    response = None
+    failure = None
+
+    try:
+        # The slot covers sending the request. It is given back before
+        # the body is handed to the caller, whose loop may make requests
+        with _slot():
+            response = _send('GET', url, event=event)
+
+        if response.status >= 400:
+            error = _codec.loads(_read(response, event))
+            raise APIError(response.status, error)
+
+        for chunk in _compression.iter_body(response, transfer):
+            deadline.check()
+
+            if kept is not None:
+                kept.append(chunk)
+
+                if transfer.raw_bytes > session.cache.max_body:
+                    kept = None
+
+            yield chunk
+
+        if kept is not None:
+            session.cache.put(key, b''.join(kept))
+    except BaseException as err:
+        failure = err
+        raise
+    finally:
+        if response is not None:
+            response.close()
+
+        if transfer.wire_bytes:
+            session.transfers.add(transfer)
+
+        event.bytes_in += transfer.wire_bytes
+        event.finish(failure)
+        session.record(event)
+
+
+def post(url, data_dictionary, retry=False):
     """ Queries the NodePing API via POST and creates a check
 
     Accepts a URL and data and POSTs the results to NodePing
@@ -21,24 +739,14 @@ def post(url, data_dictionary):
     :param url: The URL that will have data that is POSTed to NodePing
     :type data_dictionary: string
     :param data_dictionary: Dictionary of data that is sent to NodePing
+    :type retry: bool
+    :param retry: Retry throttled or failed requests. Off by default
+    since a retried POST may create the same object twice
     :return: Data that was returned from NodePing after POST
     :rtype: dict
     """
 
-    json_data = json.dumps(data_dictionary).encode('utf-8')
-
-    req = Request(url)
-    req.add_header('Content-Type', 'application/json; charset=utf-8')
-    req.add_header('Content-Length', len(json_data))
-
-    try:
-        data = urlopen(req, json_data)
-    except httperror as err:
-        data = err
-
-    json_bytes = data.read()
-
-    return json.loads(json_bytes.decode('utf-8'))
+    return _request('POST', url, data_dictionary, retry)
 
 
 def put(url, data_dictionary=None):
@@ -56,30 +764,10 @@ def put(url, data_dictionary=None):
     :rtype: dict
     """
 
-    if data_dictionary:
-        json_data = json.dumps(data_dictionary).encode('utf-8')
+    return _request('PUT', url, data_dictionary or None)
 
-    req = Request(url)
-    req.get_method = lambda: 'PUT'
-
-    if data_dictionary:
-        req.add_header('Content-Type', 'application/json; charset=utf-8')
-        req.add_header('Content-Length', len(json_data))
-
-    try:
-        if data_dictionary:
-            data = urlopen(req, json_data)
-        else:
-            data = urlopen(req)
-    except httperror as err:
-        data = err
 
-    json_bytes = data.read()
-
-    return json.loads(json_bytes.decode('utf-8'))
-
-
-def get(url):
+def get(url, cache=True):
     """ Queries the NodePing API via GET and returns its results
 
     Accepts a URL to the NodePing API to query and retrieves
@@ -88,20 +776,13 @@ def get(url):
 
     :type url: string
     :param url: The URL that will be used for GET request
+    :type cache: bool
+    :param cache: Set to False to skip the cache and query NodePing
     :return: Data that was returned from NodePing from GET request
     :rtype: dict
     """
 
-    req = Request(url)
-
-    try:
-        data = urlopen(req)
-    except httperror as err:
-        data = err
-
-    json_bytes = data.read()
-
-    return json.loads(json_bytes.decode('utf-8'))
+    return _request('GET', url, cache=cache)
 
 
 def delete(url):
@@ -117,14 +798,41 @@ def delete(url):
     :rtype: dict
     """
 
-    req = Request(url)
-    req.get_method = lambda: 'DELETE'
+    return _request('DELETE', url)
 
-    try:
-        data = urlopen(req)
-    except httperror as err:
-        data = err
 
-    json_bytes = data.read()
+def iter_object(url, cache=True):
+    """ Queries the NodePing API via GET and streams the object members
+
+    Instead of loading the whole response, yields each (key, value)
+    pair of the top level JSON object as soon as it has been read,
+    such as (check_id, check) for the checks endpoint.
+
+    :type url: string
+    :param url: The URL that will be used for GET request
+    :type cache: bool
+    :param cache: Set to False to skip the cache, query NodePing and
+    not keep the body for the cache
+    :return: Generator of (key, value) tuples
+    :raises APIError: if NodePing answers with an error status
+    """
+
+    return _json_stream.iter_object(_stream(url, cache))
+
+
+def iter_array(url, cache=True):
+    """ Queries the NodePing API via GET and streams the array elements
+
+    Yields each element of the top level JSON array as soon as it has
+    been read, such as the records of the results endpoint.
+
+    :type url: string
+    :param url: The URL that will be used for GET request
+    :type cache: bool
+    :param cache: Set to False to skip the cache, query NodePing and
+    not keep the body for the cache
+    :return: Generator of array elements
+    :raises APIError: if NodePing answers with an error status
+    """
 
-    return json.loads(json_bytes.decode('utf-8'))
+    return _json_stream.iter_array(_stream(url, cache))
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Process wide request budget and retry backoff for the NodePing API
+
+A single token bucket is shared by every thread and every session in
+the process, unless a session is given a rate limit of its own, so
+that bulk jobs and many clients together stay under the configured
+requests per second. Backoff
+delays use full jitter and honour a Retry-After header when NodePing
+sends one.
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# Responses that are worth retrying: throttled or a server side failure
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+
+class TokenBucket:
+    """ Thread safe token bucket
+
+    :type rate: float
+    :param rate: Tokens added per second. None or 0 disables the limit
+    :type burst: int
+    :param burst: Most tokens the bucket can hold at once
+    """
+
+    def __init__(self, rate, burst):
+        self._lock = threading.Lock()
+        self.configure(rate, burst)
+
+    def configure(self, rate, burst):
+        """ Changes the rate and burst size and refills the bucket
+        """
+
+        with self._lock:
+            self.rate = rate
+            self.burst = max(1, burst or 1)
+            self._tokens = float(self.burst)
+            self._updated = time.monotonic()
+
+    def acquire(self, timeout=None):
+        """ Blocks until a token is available and takes it
+
+        :type timeout: float
+        :param timeout: Most seconds to wait, None to wait as needed
+        :return: False if no token would be available in time
+        :rtype: bool
+        """
+
+        end = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            with self._lock:
+                if not self.rate:
+                    return True
+
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst,
+                    self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+
+                wait = (1 - self._tokens) / self.rate
+
+            if end is not None and now + wait > end:
+                return False
+
+            time.sleep(wait)
+
+
+def retry_after(value):
+    """ Parses a Retry-After header into seconds
+
+    The header is either a number of seconds or an HTTP date.
+
+    :type value: string
+    :param value: Value of the Retry-After header
+    :return: Seconds to wait, or None if the header is missing or invalid
+    :rtype: float
+    """
+
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    return max(0.0, date.timestamp() - time.time())
+
+
+def backoff(attempt, base, cap, server_delay=None):
+    """ Seconds to wait before retry number attempt (starting at 0)
+
+    Uses exponential backoff with full jitter. A delay requested by
+    the server through Retry-After is never shortened.
+    """
+
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+
+    if server_delay is not None:
+        delay = max(delay, server_delay)
+
+    return delay
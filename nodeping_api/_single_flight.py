@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Coalesce identical requests that are in flight at the same time
+
+While a call for a key is running, other callers asking for the same
+key wait for it and get its result instead of making their own call.
+
+Only results are shared. If the call raises, the error stays with the
+caller that made it, whose deadline, cancellation or request slot may
+have nothing to do with the others; each waiting caller then tries
+again in its own context, one of them making the next call.
+"""
+
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """ Thread safe single-flight group
+
+    executed counts the calls that ran, coalesced the callers that
+    waited on another caller's call instead.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key, func):
+        """ Runs func for key, or waits for the call already running
+
+        :param key: Hashable key identifying the call
+        :param func: Function without arguments to run
+        :return: What func returned, for every caller of the same key
+        :raises: What func raised, for the caller whose call raised it
+        """
+
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+
+                if call is None:
+                    call = _Call()
+                    self._calls[key] = call
+                    self.executed += 1
+                    break
+
+                self.coalesced += 1
+
+            call.done.wait()
+
+            if call.error is None:
+                return call.result
+
+        try:
+            call.result = func()
+        except BaseException as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+            call.done.set()
+
+        return call.result
+
+    def stats(self):
+        with self._lock:
+            return {"executed": self.executed,
+                    "coalesced": self.coalesced,
+                    "in_flight": len(self._calls)}
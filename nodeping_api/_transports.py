@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Transport backends that send requests to the NodePing API
+
+A transport has request(method, url, body, headers, timeout), where
+timeout is a (connect, read) pair of seconds, which returns a
+response with status, getheader(), read(amt) and close() (and works
+as a context manager), and close() to release its connections. The
+backend used by _query_nodeping_api is picked with config.TRANSPORT:
+
+urllib  -- a new urllib.request connection for every request
+pooled  -- keep-alive http.client connections reused across requests
+http2   -- one HTTP/2 connection per host that multiplexes concurrent
+           requests. Needs httpx with HTTP/2 support installed
+           (pip install 'httpx[http2]')
+"""
+
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+from ._connection_pool import ConnectionPool
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+class _Response:
+    """ Adapts a backend specific response to the transport interface
+    """
+
+    def __init__(self, status, reason, headers, read, close):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self._read = read
+        self._close = close
+
+    def getheader(self, name, default=None):
+        return self.headers.get(name, default)
+
+    def read(self, amt=None):
+        return self._read(amt)
+
+    def close(self):
+        self._close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class UrllibTransport:
+    """ Opens a new connection with urllib.request for every request
+    """
+
+    name = "urllib"
+
+    def request(self, method, url, body=None, headers=None, timeout=None):
+        req = Request(url, data=body, headers=headers or {}, method=method)
+        # urllib has a single timeout for connecting and each read
+        connect_timeout, read_timeout = timeout or (None, None)
+        socket_timeout = max(connect_timeout or 0, read_timeout or 0) or None
+
+        try:
+            response = urlopen(req, timeout=socket_timeout)
+        except HTTPError as err:
+            response = err
+
+        return _Response(response.status, response.reason, response.headers,
+                         response.read, response.close)
+
+    def close(self):
+        pass
+
+
+class PooledTransport(ConnectionPool):
+    """ Reuses keep-alive http.client connections, see ConnectionPool
+    """
+
+    name = "pooled"
+
+    def close(self):
+        self.clear()
+
+
+class HTTP2Transport:
+    """ Multiplexes concurrent requests over one HTTP/2 connection
+
+    Uses httpx, which negotiates HTTP/2 through TLS ALPN and falls
+    back to HTTP/1.1 for servers that do not offer it. The client is
+    thread safe, so every thread shares the same connection.
+
+    :type max_connections: int
+    :param max_connections: Connections kept per host
+    :type idle_timeout: float
+    :param idle_timeout: Seconds an idle connection is kept open
+    """
+
+    name = "http2"
+
+    def __init__(self, max_connections=10, idle_timeout=30):
+        if httpx is None:
+            raise RuntimeError(
+                "The http2 transport needs httpx: pip install 'httpx[http2]'")
+
+        limits = httpx.Limits(max_keepalive_connections=max_connections,
+                              keepalive_expiry=idle_timeout)
+        self._client = httpx.Client(http2=True, limits=limits, timeout=None)
+
+    def request(self, method, url, body=None, headers=None, timeout=None):
+        connect_timeout, read_timeout = timeout or (None, None)
+        request = self._client.build_request(
+            method, url, content=body, headers=headers,
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout))
+        response = self._client.send(request, stream=True)
+        # Raw bytes, the caller takes care of Content-Encoding
+        chunks = response.iter_raw()
+
+        def read(amt=None):
+            if amt is None:
+                return b"".join(chunks)
+
+            return next(chunks, b"")
+
+        return _Response(response.status_code, response.reason_phrase,
+                         response.headers, read, response.close)
+
+    def close(self):
+        self._client.close()
+
+
+BACKENDS = {
+    UrllibTransport.name: UrllibTransport,
+    PooledTransport.name: PooledTransport,
+    HTTP2Transport.name: HTTP2Transport,
+}
+
+
+def create(name, pool_size, idle_timeout):
+    """ Creates the transport backend with the given name
+
+    :type name: string
+    :param name: "urllib", "pooled" or "http2"
+    :type pool_size: int
+    :param pool_size: Connections kept per host
+    :type idle_timeout: float
+    :param idle_timeout: Seconds an idle connection may be reused for
+    """
+
+    try:
+        backend = BACKENDS[name]
+    except KeyError:
+        raise ValueError("Unknown transport {0!r}, expected one of {1}".format(
+            name, ", ".join(sorted(BACKENDS))))
+
+    if backend is UrllibTransport:
+        return backend()
+
+    return backend(pool_size, idle_timeout)
@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Checks of an account and all of its subaccounts at once
+
+An AccountTree lists the subaccounts of the token's account with
+accounts.get_subaccounts, and reads the check catalog of the account
+and of every subaccount concurrently on a bounded pool of workers. The
+checks are merged into one dict, each tagged with the subaccount it is
+on in its customerid attribute (None for the account of the token):
+
+    tree = account_tree.AccountTree(token)
+    push_checks = tree.where(type="PUSH")
+    failing = [check for check in push_checks.values() if check.state == 0]
+    tree.update(failing, {"enabled": "inactive"})
+
+Updates and deletes are sent for each check with its own customerid,
+all at once, see bulk.map_requests. A subaccount whose checks could
+not be read is left out of the results and listed in errors.
+"""
+
+from . import _utils, accounts, bulk, catalog, config, scheduler
+
+API_URL = "{0}checks".format(config.API_URL)
+
+
+class AccountTree:
+    """ Check catalogs of an account and its subaccounts
+
+    :type token: string
+    :param token: NodePing API token of the parent account
+    :type store: store.CheckStore
+    :param store: Store backing the catalog of every account
+    :type workers: int
+    :param workers: Accounts read, or requests sent, at once. Defaults
+    to config.BULK_WORKERS
+    """
+
+    def __init__(self, token, store=None, workers=None):
+        self.token = token
+        self.store = store
+        self.workers = workers
+        self.subaccounts = None
+        # Customer ID to error for accounts that could not be read
+        self.errors = {}
+
+    def __repr__(self):
+        return "AccountTree(subaccounts={0})".format(
+            "?" if self.subaccounts is None else len(self.subaccounts))
+
+    def customerids(self):
+        """ None for the account of the token, then every subaccount ID
+
+        The subaccounts are listed on the first call only.
+
+        :rtype: list
+        :raises _query_nodeping_api.APIError: if NodePing answers with an
+        error
+        """
+
+        if self.subaccounts is None:
+            self.subaccounts = accounts.get_subaccounts(self.token)
+
+        return [None] + list(self.subaccounts)
+
+    def catalogs(self):
+        """ The shared catalog of every account in the tree
+
+        :rtype: list
+        """
+
+        return [catalog.shared(self.token, customerid, store=self.store)
+                for customerid in self.customerids()]
+
+    def _each(self, func, progress=None):
+        """ Calls func(catalog) for every account concurrently
+
+        :return: What func returned for the accounts it did not fail on
+        """
+
+        outcomes = bulk.map_calls(func, self.catalogs(), self.workers, progress)
+        self.errors = {item.spec.customerid: item.error
+                       for item in outcomes if not item.ok}
+
+        return [item.response for item in outcomes if item.ok]
+
+    def refresh(self, progress=None):
+        """ Syncs the checks of every account
+
+        :type progress: function
+        :param progress: Called as progress(done, total, item) after
+        each account, see bulk.map_calls
+        :return: The tree; errors holds the accounts that failed
+        """
+
+        self._each(lambda checks: checks.refresh(), progress)
+
+        return self
+
+    def where(self, **criteria):
+        """ Returns the checks of every account matching the criteria
+
+        :param criteria: Indexed field names and the value, or list or
+        tuple of values, to match, see catalog.CheckCatalog.ids
+        :return: Check ID to Check, the account's checks first and then
+        each subaccount's
+        :rtype: dict
+        """
+
+        merged = {}
+
+        for checks in self._each(lambda checks: checks.where(**criteria)):
+            for check_id, check in checks.items():
+                merged.setdefault(check_id, check)
+
+        return merged
+
+    def all(self):
+        """ Returns every check of every account, see where()
+        """
+
+        return self.where()
+
+    def _url(self, check):
+        url = "{0}/{1}".format(API_URL, check.id)
+
+        return _utils.create_url(self.token, url, check.customerid)
+
+    def _send(self, specs, progress):
+        with scheduler.priority(scheduler.BULK):
+            return bulk.map_requests(specs, self.workers, progress)
+
+    def update(self, checks, fields, progress=None):
+        """ Updates checks on any account of the tree
+
+        :type checks: list
+        :param checks: Check objects, such as from where()
+        :type fields: dict
+        :param fields: Fields in each check that will be updated
+        :type progress: function
+        :param progress: Called as progress(done, total, item) after
+        each check
+        :return: bulk.ItemResult for each check, keyed by check ID, in
+        order
+        :rtype: list
+        """
+
+        specs = []
+
+        for check in checks:
+            send_fields = fields.copy()
+            send_fields.update({"type": check.type})
+            specs.append(bulk.RequestSpec("PUT", self._url(check), send_fields,
+                                          key=check.id))
+
+        return self._send(specs, progress)
+
+    def delete(self, checks, progress=None):
+        """ Deletes checks on any account of the tree
+
+        :type checks: list
+        :param checks: Check objects, such as from where()
+        :type progress: function
+        :param progress: Called as progress(done, total, item) after
+        each check
+        :return: bulk.ItemResult for each check, keyed by check ID, in
+        order
+        :rtype: list
+        """
+
+        specs = [bulk.RequestSpec("DELETE", self._url(check), key=check.id)
+                 for check in checks]
+
+        return self._send(specs, progress)
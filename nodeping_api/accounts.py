@@ -33,6 +33,27 @@ def get_account(token, customerid=None):
     return _query_nodeping_api.get(url)
 
 
+def get_subaccounts(token):
+    """ Get the subaccounts of the account
+
+    Lists the accounts returned by get_account without the parent
+    account itself.
+
+    :param token: The NodePing token for the parent account
+    :type token: str
+    :return: Subaccount ID to its info
+    :rtype: dict
+    :raises _query_nodeping_api.APIError: if NodePing answers with an
+    error, such as for an invalid token
+    """
+
+    url = _utils.create_url(token, API_URL, None)
+
+    return {customerid: account for customerid, account
+            in _query_nodeping_api.iter_object(url)
+            if isinstance(account, dict) and account.get("type") != "parent"}
+
+
 def create_subaccount(token,
                       name,
                       contactname,
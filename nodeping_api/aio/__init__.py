@@ -0,0 +1,9 @@
+""" Asyncio versions of the nodeping_api functions
+
+The modules here mirror the blocking modules of the same name and
+return coroutines instead. The number of requests in flight at once
+is capped by nodeping_api.config.AIO_MAX_CONCURRENCY, which can be
+changed with _query_nodeping_api.set_concurrency().
+"""
+
+name = "nodeping_api.aio"
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Async verbs for querying the NodePing API
+
+Requests go through the same pooled transport as the blocking verbs
+and run on a dedicated worker pool, so they never block the event
+loop. A semaphore per event loop caps how many are in flight at once.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from .. import _query_nodeping_api, config
+
+_LIMIT = config.AIO_MAX_CONCURRENCY
+_EXECUTOR = None
+_LOCK = threading.Lock()
+_SEMAPHORES = weakref.WeakKeyDictionary()
+
+
+def set_concurrency(limit):
+    """ Changes how many requests may be in flight at the same time
+
+    Takes effect for requests started after the call; requests that
+    are already running are left to finish.
+
+    :type limit: int
+    :param limit: Maximum number of concurrent requests
+    """
+
+    global _LIMIT, _EXECUTOR
+
+    with _LOCK:
+        _LIMIT = limit
+        executor, _EXECUTOR = _EXECUTOR, None
+        _SEMAPHORES.clear()
+
+    if executor is not None:
+        executor.shutdown(wait=False)
+
+
+def _executor():
+    global _EXECUTOR
+
+    with _LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(
+                max_workers=_LIMIT, thread_name_prefix="nodeping-aio")
+
+        return _EXECUTOR
+
+
+def _semaphore():
+    loop = asyncio.get_running_loop()
+
+    with _LOCK:
+        semaphore = _SEMAPHORES.get(loop)
+
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(_LIMIT)
+            _SEMAPHORES[loop] = semaphore
+
+    return semaphore
+
+
+async def run(func, *args, **kwargs):
+    """ Runs a blocking nodeping_api function without blocking the loop
+
+    The caller's context variables are carried over to the worker
+    that makes the request.
+
+    :param func: Blocking function to call
+    :return: Whatever func returns
+    """
+
+    call = functools.partial(func, *args, **kwargs)
+
+    async with _semaphore():
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+
+        return await loop.run_in_executor(_executor(), context.run, call)
+
+
+def asyncify(func):
+    """ Returns a coroutine function that calls func through run()
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run(func, *args, **kwargs)
+
+    return wrapper
+
+
+post = asyncify(_query_nodeping_api.post)
+put = asyncify(_query_nodeping_api.put)
+get = asyncify(_query_nodeping_api.get)
+delete = asyncify(_query_nodeping_api.delete)
@@ -0,0 +1,16 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Async version of nodeping_api.contacts
+"""
+
+from .. import contacts
+from ._query_nodeping_api import asyncify
+
+get_all = asyncify(contacts.get_all)
+get_one = asyncify(contacts.get_one)
+get_by_type = asyncify(contacts.get_by_type)
+create_contact = asyncify(contacts.create_contact)
+update_contact = asyncify(contacts.update_contact)
+delete_contact = asyncify(contacts.delete_contact)
+reset_password = asyncify(contacts.reset_password)
@@ -0,0 +1,10 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Async version of nodeping_api.delete_checks
+"""
+
+from .. import delete_checks
+from ._query_nodeping_api import asyncify
+
+remove = asyncify(delete_checks.remove)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Async version of nodeping_api.get_checks
+"""
+
+import itertools
+from .. import get_checks
+from ._query_nodeping_api import asyncify, run
+
+# Checks iter_checks() reads on a worker at a time
+_BATCH = 100
+
+
+def _take(iterator, count):
+    return list(itertools.islice(iterator, count))
+
+
+class GetChecks(get_checks.GetChecks):
+    """ GetChecks whose query methods return coroutines
+    """
+
+    all_checks = asyncify(get_checks.GetChecks.all_checks)
+    passing_checks = asyncify(get_checks.GetChecks.passing_checks)
+    failing_checks = asyncify(get_checks.GetChecks.failing_checks)
+    get_by_id = asyncify(get_checks.GetChecks.get_by_id)
+    disabled_checks = asyncify(get_checks.GetChecks.disabled_checks)
+    last_result = asyncify(get_checks.GetChecks.last_result)
+    last_results = asyncify(get_checks.GetChecks.last_results)
+
+    async def iter_checks(self, predicate=None):
+        """ Streams the checks for the account one at a time
+
+        Same as nodeping_api.get_checks.GetChecks.iter_checks, as an
+        async generator. The checks are read on a worker, _BATCH at a
+        time, and the predicate is called there too.
+
+        :type predicate: function
+        :param predicate: Optional filter called with each check
+        :return: Async generator of (check_id, check) tuples
+        """
+
+        checks = super().iter_checks(predicate)
+
+        try:
+            while True:
+                batch = await run(_take, checks, _BATCH)
+
+                if not batch:
+                    return
+
+                for item in batch:
+                    yield item
+        finally:
+            checks.close()
+
+    async def catalog(self):
+        """ Indexed checks of the account, shared with other callers
+
+        Same as nodeping_api.get_checks.GetChecks.catalog, except the
+        checks are downloaded on a worker first if they are stale. The
+        catalog's own lookups block while it downloads the checks again
+        once it expires or a check was changed.
+
+        :rtype: catalog.CheckCatalog
+        """
+
+        checks = super().catalog()
+        # Any lookup downloads the checks when they are stale
+        await run(len, checks)
+
+        return checks
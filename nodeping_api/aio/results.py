@@ -0,0 +1,12 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Async version of nodeping_api.results
+"""
+
+from .. import results
+from ._query_nodeping_api import asyncify
+
+get_results = asyncify(results.get_results)
+get_uptime = asyncify(results.get_uptime)
+get_current = asyncify(results.get_current)
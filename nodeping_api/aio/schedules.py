@@ -0,0 +1,13 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Async version of nodeping_api.schedules
+"""
+
+from .. import schedules
+from ._query_nodeping_api import asyncify
+
+get_schedule = asyncify(schedules.get_schedule)
+create_schedule = asyncify(schedules.create_schedule)
+update_schedule = asyncify(schedules.update_schedule)
+delete_schedule = asyncify(schedules.delete_schedule)
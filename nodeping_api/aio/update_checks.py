@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Async version of nodeping_api.update_checks
+"""
+
+import asyncio
+from .. import circuit_breaker, deadline, scheduler, update_checks
+from ._query_nodeping_api import asyncify
+
+update = asyncify(update_checks.update)
+
+
+async def update_many(token, checkids, fields, customerid=None):
+    """ Updates a field(s) in multiple existing NodePing checks
+
+    Same as nodeping_api.update_checks.update_many, except the checks
+    are updated concurrently, up to the configured concurrency limit,
+    as bulk priority requests.
+
+    :type token: string
+    :param token: Your NodePing API token
+    :type checkids: dict
+    :param checkids: CheckIDs with their check type to update
+    :type fields: dict
+    :param fields: Fields in check that will be updated
+    :type customerid: string
+    :param customerid: subaccount ID
+    :rtype: deadline.PartialResult
+    :return: Return information from NodePing for each updated check, in
+    order. Checks NodePing refused to update, or whose request failed,
+    are listed with the error in its failed attribute. Checks not
+    updated before an operation deadline ran out, or that failed fast
+    because the circuit for checks was open, are listed in its
+    unfinished attribute
+    """
+
+    with scheduler.priority(scheduler.BULK):
+        updates = [update(token, checkid, checktype, fields.copy(), customerid)
+                   for checkid, checktype in checkids.items()]
+
+        responses = await asyncio.gather(*updates, return_exceptions=True)
+
+    updated_checks = deadline.PartialResult()
+    unfinished = []
+    error = None
+
+    for checkid, response in zip(checkids, responses):
+        if isinstance(response, (deadline.DeadlineExceeded,
+                                 circuit_breaker.CircuitOpenError)):
+            unfinished.append(checkid)
+            error = response
+        elif isinstance(response, Exception):
+            updated_checks.failed[checkid] = response
+        elif isinstance(response, BaseException):
+            raise response
+        elif isinstance(response, dict) and "error" in response:
+            updated_checks.failed[checkid] = response["error"]
+        else:
+            updated_checks.append(response)
+
+    if unfinished:
+        updated_checks.stop(unfinished, error)
+
+    return updated_checks
@@ -0,0 +1,236 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Run many NodePing API requests at once, results in input order
+
+map_requests() sends a list of RequestSpec on a bounded pool of
+worker threads, so bulk operations take about as long as the slowest
+few requests instead of the sum of every round trip:
+
+    specs = [bulk.RequestSpec('DELETE', url, key=checkid) for ...]
+
+    for item in bulk.map_requests(specs, progress=print_progress):
+        if not item.ok:
+            print(item.key, item.error)
+
+The requests still go through the rate limit, request slots, circuit
+breakers and cache of nodeping_api. The caller's priority, deadline
+and session are carried over to the workers.
+
+map_calls() does the same for any function that makes requests, such
+as syncing the checks of many subaccounts, and imap_calls() for items
+read one at a time from a stream of any length.
+"""
+
+import contextvars
+import functools
+from concurrent.futures import (FIRST_COMPLETED, ThreadPoolExecutor,
+                                as_completed, wait)
+from . import _query_nodeping_api, config
+
+
+class RequestSpec:
+    """ One request for map_requests()
+
+    :type method: string
+    :param method: 'GET', 'POST', 'PUT' or 'DELETE'
+    :type url: string
+    :param url: Full URL including the token
+    :type data: dict
+    :param data: Body sent as JSON, if any
+    :param key: What the request is for, such as a check ID. Defaults
+    to the URL
+    :type retry: bool
+    :param retry: Whether to retry failed requests, by default the
+    same as the verbs of _query_nodeping_api
+    """
+
+    __slots__ = ("method", "url", "data", "key", "retry")
+
+    def __init__(self, method, url, data=None, key=None, retry=None):
+        self.method = method.upper()
+        self.url = url
+        self.data = data
+        self.key = url if key is None else key
+        self.retry = retry
+
+    def __repr__(self):
+        return "RequestSpec({0} {1!r})".format(self.method, self.key)
+
+
+class ItemResult:
+    """ Outcome of one request
+
+    A request fails if it raised, or if NodePing answered with an error
+    status or an "error" in the body. For an error answer, error is an
+    APIError and response still holds the body; otherwise response is
+    None if error is set.
+
+    For map_calls(), spec is the item the function was called with
+    and response what it returned.
+    """
+
+    __slots__ = ("spec", "response", "error", "status")
+
+    def __init__(self, spec, response=None, error=None, status=None):
+        self.spec = spec
+        self.response = response
+        self.error = error
+        self.status = status
+
+    @property
+    def key(self):
+        return getattr(self.spec, "key", self.spec)
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        if self.error is not None:
+            return "ItemResult({0!r} error={1!r})".format(self.key, self.error)
+
+        return "ItemResult({0!r} ok)".format(self.key)
+
+
+def _run(spec):
+    if spec.method == 'POST' and spec.retry is None:
+        retry = False
+    else:
+        retry = spec.retry
+
+    try:
+        status, response = _query_nodeping_api._request_status(
+            spec.method, spec.url, spec.data, retry)
+    except Exception as err:
+        return ItemResult(spec, error=err)
+
+    error = None
+
+    if (status or 0) >= 400 or (isinstance(response, dict)
+                                and "error" in response):
+        error = _query_nodeping_api.APIError(status, response)
+
+    return ItemResult(spec, response, error, status)
+
+
+def _call(func, item):
+    try:
+        return ItemResult(item, func(item))
+    except Exception as err:
+        return ItemResult(item, error=err)
+
+
+def _map(run, items, workers, progress):
+    """ Runs run(item) for every item on the worker pool
+    """
+
+    items = list(items)
+    outcomes = [None] * len(items)
+
+    if not items:
+        return outcomes
+
+    workers = max(1, min(workers or config.BULK_WORKERS, len(items)))
+
+    with ThreadPoolExecutor(max_workers=workers,
+                            thread_name_prefix="nodeping-bulk") as executor:
+        # Each item runs in a copy of the caller's context
+        futures = {executor.submit(contextvars.copy_context().run, run, item):
+                   index for index, item in enumerate(items)}
+
+        for done, future in enumerate(as_completed(futures), 1):
+            item = outcomes[futures[future]] = future.result()
+
+            if progress is not None:
+                progress(done, len(items), item)
+
+    return outcomes
+
+
+def map_calls(func, items, workers=None, progress=None):
+    """ Calls func(item) for every item concurrently
+
+    Works like map_requests() for functions that make their own
+    requests. An exception raised for one item is kept in its
+    ItemResult and does not stop the others.
+
+    :type func: function
+    :param func: Called with each item on a worker thread
+    :type items: list
+    :param items: Items to call func with
+    :type workers: int
+    :param workers: Calls running at once, defaults to
+    config.BULK_WORKERS
+    :type progress: function
+    :param progress: Called on the calling thread as
+    progress(done, total, item) after each call finishes
+    :return: ItemResult for every item, in the same order
+    :rtype: list
+    """
+
+    return _map(functools.partial(_call, func), items, workers, progress)
+
+
+def imap_calls(func, items, workers=None, window=None):
+    """ Calls func(item) for every item of an iterable concurrently
+
+    Unlike map_calls(), items are read only as workers free up, at
+    most window of them ahead of the results, so memory stays the same
+    however many items there are.
+
+    :type func: function
+    :param func: Called with each item on a worker thread
+    :param items: Iterable of items, read lazily
+    :type workers: int
+    :param workers: Calls running at once, defaults to
+    config.BULK_WORKERS
+    :type window: int
+    :param window: Items submitted and not yet yielded, defaults to
+    four per worker
+    :return: Generator of ItemResult, in the order the calls finish
+    """
+
+    workers = max(1, workers or config.BULK_WORKERS)
+    window = max(workers, window or 4 * workers)
+    run = functools.partial(_call, func)
+
+    with ThreadPoolExecutor(max_workers=workers,
+                            thread_name_prefix="nodeping-bulk") as executor:
+        pending = set()
+
+        for item in items:
+            pending.add(executor.submit(contextvars.copy_context().run, run,
+                                        item))
+
+            if len(pending) >= window:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    yield future.result()
+
+        for future in as_completed(pending):
+            yield future.result()
+
+
+def map_requests(specs, workers=None, progress=None):
+    """ Sends the requests concurrently and returns their outcomes
+
+    An error in one request does not stop the others; it is kept in
+    the ItemResult of that request. Once an operation deadline runs
+    out or a circuit opens, the remaining requests fail fast with
+    that error.
+
+    :type specs: list
+    :param specs: RequestSpec for every request
+    :type workers: int
+    :param workers: Requests sent at once, defaults to
+    config.BULK_WORKERS
+    :type progress: function
+    :param progress: Called on the calling thread as
+    progress(done, total, item) after each request finishes
+    :return: ItemResult for every spec, in the same order
+    :rtype: list
+    """
+
+    return _map(_run, specs, workers, progress)
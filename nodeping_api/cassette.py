@@ -0,0 +1,309 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Record and replay NodePing API traffic
+
+While recording, every request made through nodeping_api is sent to
+NodePing as usual and the request/response pair is kept, with the
+token scrubbed from the URL. The pairs are saved as gzip compressed
+JSON lines. While replaying, requests are answered from the file and
+nothing is sent over the network, either with the recorded latency
+or with none at all, so benchmarks and tests run offline with
+repeatable numbers:
+
+    with cassette.record('checks.jsonl.gz'):
+        manage_checks.list_checks(token)
+
+    with cassette.replay('checks.jsonl.gz', realtime=False):
+        get_checks.GetChecks(token).all_checks()
+"""
+
+import gzip
+import io
+import json
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from . import _compression, _query_nodeping_api
+
+SCRUBBED_TOKEN = "TOKEN"
+
+# Response headers worth keeping for replay
+KEPT_HEADERS = ("Content-Type", "Retry-After")
+
+
+class CassetteMiss(LookupError):
+    """ A replayed request has no recorded response
+    """
+
+
+def scrub(url):
+    """ Replaces the token in a URL so recordings hold no credentials
+    """
+
+    parts = urlsplit(url)
+    query = [(key, SCRUBBED_TOKEN if key == "token" else value)
+             for key, value in parse_qsl(parts.query, keep_blank_values=True)]
+
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def _canonical(body):
+    """ A JSON request body in one form, whichever codec encoded it
+
+    Live requests are encoded with nodeping_api._codec, which may escape
+    non-ASCII text or not depending on the codec installed.
+    """
+
+    if body is None:
+        return None
+
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return body
+
+    return json.dumps(data, ensure_ascii=False, sort_keys=True,
+                      separators=(",", ":"))
+
+
+class _Headers(dict):
+    def get(self, name, default=None):
+        for key, value in self.items():
+            if key.lower() == name.lower():
+                return value
+
+        return default
+
+
+class ReplayedResponse:
+    """ Response served from a cassette, shaped like PooledResponse
+    """
+
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.reason = ""
+        self.headers = _Headers(headers)
+        self._body = io.BytesIO(body)
+
+    def getheader(self, name, default=None):
+        return self.headers.get(name, default)
+
+    def read(self, amt=None):
+        return self._body.read(amt)
+
+    def close(self):
+        self._body.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _RecordingResponse:
+    """ Passes a live response through and records it once closed
+    """
+
+    def __init__(self, cassette, entry, response, started):
+        self._cassette = cassette
+        self._entry = entry
+        self._response = response
+        self._started = started
+        self._chunks = []
+        self.status = response.status
+        self.reason = response.reason
+        self.headers = response.headers
+
+    def getheader(self, name, default=None):
+        return self._response.getheader(name, default)
+
+    def read(self, amt=None):
+        data = self._response.read(amt)
+        self._chunks.append(data)
+
+        return data
+
+    def close(self):
+        if self._entry is None:
+            return
+
+        entry, self._entry = self._entry, None
+
+        try:
+            # Record the whole body even if the caller stopped reading
+            self._chunks.append(self._response.read())
+        except OSError:
+            # A truncated body would replay as a different response
+            return
+        finally:
+            self._response.close()
+
+        body = b"".join(self._chunks)
+        decompressor = _compression.decoder(self.getheader("Content-Encoding"))
+
+        if decompressor is not None:
+            body = decompressor.decompress(body) + decompressor.flush()
+
+        entry["r"] = body.decode("utf-8")
+        entry["t"] = round(time.monotonic() - self._started, 6)
+        self._cassette._add(entry)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class Cassette:
+    """ A set of recorded request/response pairs
+
+    Used as a context manager, a cassette replaces the transport of
+    nodeping_api for the duration of the block.
+
+    :type path: string
+    :param path: File the pairs are loaded from and saved to. May be
+    None for a cassette built in memory with add()
+    :type mode: string
+    :param mode: "record" or "replay"
+    :type realtime: bool
+    :param realtime: When replaying, wait the recorded latency before
+    answering each request
+    """
+
+    def __init__(self, path=None, mode="replay", realtime=False):
+        if mode not in ("record", "replay"):
+            raise ValueError("mode must be 'record' or 'replay'")
+
+        self.path = path
+        self.mode = mode
+        self.realtime = realtime
+        self.entries = []
+        self._replay = {}
+        self._lock = threading.Lock()
+        self._previous = None
+
+        if mode == "replay" and path is not None:
+            self.load(path)
+
+    @staticmethod
+    def _key(method, url, body):
+        return method, scrub(url), _canonical(body)
+
+    def _add(self, entry):
+        key = (entry["m"], entry["u"], _canonical(entry["b"]))
+
+        with self._lock:
+            self.entries.append(entry)
+            self._replay.setdefault(key, [[], 0])[0].append(entry)
+
+    def add(self, method, url, response, status=200, latency=0.0,
+            data_dictionary=None):
+        """ Adds a response to the cassette without recording it live
+
+        :param response: Decoded response body to return
+        :param data_dictionary: Request body the response is for
+        """
+
+        body = None
+
+        if data_dictionary is not None:
+            body = json.dumps(data_dictionary, separators=(",", ":"))
+
+        self._add({"m": method, "u": scrub(url), "b": body, "s": status,
+                   "h": {"Content-Type": "application/json"},
+                   "r": json.dumps(response, separators=(",", ":")),
+                   "t": latency})
+
+    def load(self, path):
+        """ Reads the pairs saved in a cassette file
+        """
+
+        with gzip.open(path, "rt", encoding="utf-8") as handle:
+            for line in handle:
+                if line.strip():
+                    self._add(json.loads(line))
+
+    def save(self, path=None):
+        """ Writes the pairs as gzip compressed JSON lines
+        """
+
+        with self._lock:
+            entries = list(self.entries)
+
+        with gzip.open(path or self.path, "wt", encoding="utf-8") as handle:
+            for entry in entries:
+                handle.write(json.dumps(entry, separators=(",", ":")))
+                handle.write("\n")
+
+    def request(self, method, url, body=None, headers=None, timeout=None):
+        """ Transport interface used by _query_nodeping_api
+        """
+
+        if isinstance(body, bytes):
+            body = body.decode("utf-8")
+
+        if self.mode == "record":
+            entry = {"m": method, "u": scrub(url), "b": body}
+            started = time.monotonic()
+            transport = self._previous or _query_nodeping_api.backend()
+            response = transport.request(
+                method, url, body.encode("utf-8") if body else None, headers,
+                timeout)
+            entry["s"] = response.status
+            entry["h"] = {name: response.getheader(name) for name in KEPT_HEADERS
+                          if response.getheader(name) is not None}
+
+            return _RecordingResponse(self, entry, response, started)
+
+        key = self._key(method, url, body)
+
+        with self._lock:
+            recorded = self._replay.get(key)
+
+            if recorded is None:
+                raise CassetteMiss("No recorded response for {0} {1}".format(
+                    method, key[1]))
+
+            # Repeated requests get the recorded responses in order and
+            # start over once they run out
+            entries, index = recorded
+            entry = entries[index % len(entries)]
+            recorded[1] = index + 1
+
+        if self.realtime and entry.get("t"):
+            time.sleep(entry["t"])
+
+        return ReplayedResponse(entry["s"], entry.get("h", {}),
+                                entry["r"].encode("utf-8"))
+
+    def __enter__(self):
+        self._previous = _query_nodeping_api.set_transport(self)
+
+        return self
+
+    def __exit__(self, *exc_info):
+        _query_nodeping_api.set_transport(self._previous)
+        self._previous = None
+
+        if self.mode == "record" and self.path is not None:
+            self.save()
+
+
+def record(path):
+    """ Cassette that records all API traffic to path while in use
+    """
+
+    return Cassette(path, mode="record")
+
+
+def replay(path, realtime=False):
+    """ Cassette that answers all API requests from path while in use
+
+    :type realtime: bool
+    :param realtime: Wait the recorded latency before each response
+    """
+
+    return Cassette(path, mode="replay", realtime=realtime)
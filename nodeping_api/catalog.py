@@ -0,0 +1,442 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" In-memory catalog of the checks on an account
+
+A CheckCatalog downloads the checks once and indexes them by type,
+state, enable flag, label, checktoken and interval, so filtering the
+checks again does not download the account again. Checks are held as
+compact check.Check objects:
+
+    checks = catalog.shared(token)
+    failing_push = checks.where(type="PUSH", state=0)
+    by_token = checks.first(checktoken=checktoken)
+
+Criteria are combined with AND, and a list or tuple of values matches
+any of them. ids() returns sets of check IDs that can be combined
+further with & and |. search() finds checks by label, ID or checktoken
+with a search.SearchIndex kept up to date with the checks.
+
+The catalog is synced again when refresh() is called, when it is
+older than its TTL (config.CATALOG_TTL), or after a check was created,
+changed or deleted through nodeping_api. Syncing only updates the
+indexes for the checks that were added, changed or removed, see
+nodeping_api.sync.
+
+With a store (nodeping_api.store), the catalog opens from the checks
+saved by an earlier run without waiting for NodePing, syncs them in
+the background, and saves what changed. Once a check was changed
+through nodeping_api the next lookup waits for a sync again.
+"""
+
+import contextvars
+import operator
+import threading
+import time
+from . import _cache, _single_flight, config, instrumentation, search, sync
+
+# Check fields that are indexed, with how to read each from a Check
+INDEXES = {name: operator.attrgetter(name) for name in (
+    "type", "state", "enable", "label", "checktoken", "interval")}
+
+# Mutations of these endpoint families can change the checks
+_CHANGES_CHECKS = ("checks", "accounts")
+
+
+class CheckCatalog:
+    """ Checks of one account or subaccount with secondary indexes
+
+    :type token: string
+    :param token: NodePing API token
+    :type customerid: string
+    :param customerid: Optional subaccount ID
+    :type ttl: float
+    :param ttl: Seconds before the checks are synced again, defaults
+    to config.CATALOG_TTL. 0 keeps them until refresh() is called
+    :type snapshot: sync.Snapshot
+    :param snapshot: Checks to start from, such as a snapshot saved
+    by an earlier run. The first lookup still syncs it
+    :type store: store.CheckStore
+    :param store: Store the checks are loaded from and saved to. The
+    stored checks are used while they are synced in the background
+    """
+
+    def __init__(self, token, customerid=None, ttl=None, snapshot=None,
+                 store=None):
+        self.token = token
+        self.customerid = customerid
+        self.ttl = config.CATALOG_TTL if ttl is None else ttl
+        self.store = store
+        self.loaded_at = None
+        self.last_sync = None
+        self.revalidate_error = None
+
+        if snapshot is None and store is not None:
+            snapshot = store.load(token, customerid)
+
+        self.snapshot = snapshot or sync.Snapshot()
+        self._checks = {}
+        self._indexes = {name: {} for name in INDEXES}
+        # Indexed values of each check, to drop them when it changes
+        self._indexed = {}
+        # Position of each check in the order it was first seen, so
+        # where() can order a few matches without going over every check
+        self._order = {}
+        self._next_position = 0
+        # Built on the first search()
+        self._search = None
+        self._index(self.snapshot.checks, (), self.snapshot.checks)
+        # Bumped by invalidate(); a download only counts as fresh if
+        # nothing changed while it was running
+        self._generation = 0
+        self._loaded_generation = None
+        self._lock = threading.RLock()
+        self._revalidating = None
+        # Downloads waited on by lookups, by generation, so lookups
+        # racing a stale catalog make one download between them
+        self._refreshing = _single_flight.SingleFlight()
+
+        if self.snapshot.synced_at is not None:
+            # Usable until a check is changed, though not fresh
+            self._loaded_generation = self._generation
+
+    def __repr__(self):
+        return "CheckCatalog(customerid={0!r}, checks={1})".format(
+            self.customerid, len(self._checks))
+
+    def _index(self, checks, dropped, added):
+        """ Updates the indexes for checks that changed
+
+        :param checks: Every check, after the change
+        :param dropped: IDs of checks whose old values are removed
+        :param added: IDs of checks whose values are added
+        """
+
+        indexes = self._indexes
+
+        if self._search is not None:
+            for check_id in dropped:
+                self._search.discard(check_id)
+
+        for check_id in dropped:
+            if check_id not in checks:
+                self._order.pop(check_id, None)
+
+            for name, value in self._indexed.pop(check_id, ()):
+                ids = indexes[name].get(value)
+
+                if ids is not None:
+                    ids.discard(check_id)
+
+                    if not ids:
+                        del indexes[name][value]
+
+        for check_id in added:
+            checks[check_id].customerid = self.customerid
+
+            if check_id not in self._order:
+                self._order[check_id] = self._next_position
+                self._next_position += 1
+            indexed = []
+
+            for name, read in INDEXES.items():
+                value = read(checks[check_id])
+
+                try:
+                    indexes[name].setdefault(value, set()).add(check_id)
+                except TypeError:
+                    # Unhashable values, such as a list, are not indexed
+                    continue
+
+                indexed.append((name, value))
+
+            self._indexed[check_id] = indexed
+
+            if self._search is not None:
+                self._search.add(checks[check_id])
+
+        self._checks = checks
+
+    def refresh(self):
+        """ Syncs the checks and updates the indexes for what changed
+
+        :return: The catalog; last_sync holds what changed
+        """
+
+        generation = self._generation
+        checks = sync.fetch(self.token, self.customerid)
+
+        with self._lock:
+            result = self.snapshot.apply(checks)
+            self._index(self.snapshot.checks, result.changed + result.removed,
+                        result.added + result.changed)
+            self.last_sync = result
+            self._loaded_generation = generation
+            self.loaded_at = time.monotonic()
+
+            if self.store is not None:
+                self.store.save(self.token, self.customerid, self.snapshot,
+                                result)
+
+        return self
+
+    def _revalidate(self):
+        try:
+            self.refresh()
+        except Exception as err:
+            # The stored checks stay in use; the next lookup tries again
+            self.revalidate_error = err
+        else:
+            self.revalidate_error = None
+
+    def revalidate(self):
+        """ Syncs the checks on a background thread
+
+        Lookups keep answering from the current checks meanwhile. Only
+        one sync runs at a time.
+
+        :return: The thread doing the sync
+        :rtype: threading.Thread
+        """
+
+        with self._lock:
+            thread = self._revalidating
+
+            if thread is not None and thread.is_alive():
+                return thread
+
+            context = contextvars.copy_context()
+            thread = threading.Thread(target=context.run,
+                                      args=(self._revalidate,),
+                                      name="nodeping-catalog", daemon=True)
+            self._revalidating = thread
+
+        thread.start()
+
+        return thread
+
+    def invalidate(self):
+        """ Makes the next lookup download the checks again
+        """
+
+        self._generation += 1
+
+    @property
+    def fresh(self):
+        if self._loaded_generation != self._generation or self.loaded_at is None:
+            return False
+
+        return not self.ttl or time.monotonic() - self.loaded_at < self.ttl
+
+    def _current(self):
+        """ Syncs the checks first if they cannot be used as they are
+
+        Called without holding the lock, so other lookups are not held
+        up by the download.
+        """
+
+        with self._lock:
+            if self.fresh:
+                return self._checks, self._indexes
+
+            generation = self._generation
+            # Checks from the store, or synced before, may be used
+            # while they are synced again; not once a check changed
+            usable = (self.store is not None
+                      and self.snapshot.synced_at is not None
+                      and self._loaded_generation == generation)
+
+        if usable:
+            self.revalidate()
+        else:
+            self._refreshing.do(generation, self.refresh)
+
+        return self._checks, self._indexes
+
+    def get(self, check_id, default=None):
+        """ Returns the Check with the given ID
+        """
+
+        return self._current()[0].get(check_id, default)
+
+    def all(self):
+        """ Returns every check as a dict of check ID to Check
+        """
+
+        return dict(self._current()[0])
+
+    def values(self, field):
+        """ Returns the distinct values of an indexed field
+        """
+
+        indexes = self._current()[1]
+
+        with self._lock:
+            return set(indexes[field])
+
+    @staticmethod
+    def _match(checks, indexes, criteria):
+        matched = None
+
+        for field, wanted in criteria.items():
+            if field not in indexes:
+                raise ValueError("{0!r} is not indexed, expected one of {1}".format(
+                    field, ", ".join(INDEXES)))
+
+            if not isinstance(wanted, (list, tuple, set, frozenset)):
+                wanted = (wanted,)
+
+            found = set()
+
+            for value in wanted:
+                found |= indexes[field].get(value, set())
+
+            matched = found if matched is None else matched & found
+
+            if not matched:
+                break
+
+        return set(checks) if matched is None else matched
+
+    def ids(self, **criteria):
+        """ Returns the IDs of the checks matching every criterion
+
+        :param criteria: Indexed field names and the value, or list or
+        tuple of values, to match
+        :rtype: set
+        """
+
+        checks, indexes = self._current()
+
+        with self._lock:
+            return self._match(checks, indexes, criteria)
+
+    def where(self, **criteria):
+        """ Returns the checks matching every criterion, see ids()
+
+        :return: Check ID to Check, in the order NodePing returned them
+        :rtype: dict
+        """
+
+        checks, indexes = self._current()
+
+        with self._lock:
+            if not criteria:
+                return dict(checks)
+
+            matched = sorted(self._match(checks, indexes, criteria),
+                             key=self._order.__getitem__)
+
+        return {check_id: checks[check_id] for check_id in matched}
+
+    def first(self, **criteria):
+        """ Returns one check matching the criteria, or None
+        """
+
+        checks, indexes = self._current()
+
+        with self._lock:
+            matched = self._match(checks, indexes, criteria)
+
+        if not matched:
+            return None
+
+        return checks[next(iter(matched))]
+
+    def search(self, text, limit=20, fuzzy=True, **criteria):
+        """ Returns the checks best matching the text
+
+        :type text: string
+        :param text: Label, ID or checktoken, or the start of one, or a
+        label with typos, see search.SearchIndex.search
+        :type limit: int
+        :param limit: Most checks to return, None for every match
+        :type fuzzy: bool
+        :param fuzzy: Whether to add labels like the text, for typos
+        :param criteria: Only return checks matching these, see ids()
+        :return: Check objects, best match first
+        :rtype: list
+        """
+
+        checks, indexes = self._current()
+
+        with self._lock:
+            if self._search is None:
+                self._search = search.SearchIndex(checks.values())
+
+            if not criteria:
+                ranked = self._search.search(text, limit,
+                                             fuzzy=fuzzy)
+            else:
+                matched = self._match(checks, indexes, criteria)
+                wanted = limit
+
+                # Ask for more matches until enough meet the criteria,
+                # rather than ranking every match of the text
+                while True:
+                    found = self._search.search(text, wanted,
+                                               fuzzy=fuzzy)
+                    ranked = [check_id for check_id in found
+                              if check_id in matched][:limit]
+
+                    if (limit is None or len(ranked) >= limit
+                            or len(found) < wanted):
+                        break
+
+                    wanted *= 4
+
+        return [checks[check_id] for check_id in ranked]
+
+    def __len__(self):
+        return len(self._current()[0])
+
+    def __iter__(self):
+        return iter(self._current()[0])
+
+    def __contains__(self, check_id):
+        return check_id in self._current()[0]
+
+
+_SHARED = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def _invalidate_on_change(event):
+    """ Instrumentation hook that marks the shared catalogs stale
+    after a check was changed through nodeping_api
+    """
+
+    if event.kind != "request" or event.method == "GET":
+        return
+
+    if event.endpoint.split("/", 1)[0] in _CHANGES_CHECKS:
+        for catalog in tuple(_SHARED.values()):
+            catalog.invalidate()
+
+
+def shared(token, customerid=None, store=None):
+    """ Returns the catalog for an account shared by every caller
+
+    :type token: string
+    :param token: NodePing API token
+    :type customerid: string
+    :param customerid: Optional subaccount ID
+    :type store: store.CheckStore
+    :param store: Store to back the catalog with, used when the
+    catalog is first created
+    :rtype: CheckCatalog
+    """
+
+    key = (_cache.fingerprint(token), customerid)
+
+    with _SHARED_LOCK:
+        catalog = _SHARED.get(key)
+
+        if catalog is None:
+            if not _SHARED:
+                instrumentation.add_hook(_invalidate_on_change)
+
+            catalog = _SHARED[key] = CheckCatalog(token, customerid,
+                                                  store=store)
+
+    return catalog
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Compact model of a NodePing check
+
+A Check keeps the fields that are filtered and listed on every pass
+(ID, type, label, state, enable, interval, checktoken and modified) as
+attributes, and the rest of the check as its encoded JSON. The nested
+parameters, fields and notifications are only decoded when they are
+read, so holding tens of thousands of checks costs a fraction of the
+memory of the decoded dicts:
+
+    check = Check.from_dict(check_id, contents)
+    if check.type == "PUSH" and check.state == 0:
+        print(check.label, check.fields)
+
+The catalog (nodeping_api.catalog), snapshots (nodeping_api.sync) and
+the store (nodeping_api.store) hold their checks as Check objects.
+"""
+
+import sys
+from . import _codec
+
+
+def _intern(value):
+    """ Shares one copy of values repeated across checks, such as
+    "PUSH" or "active"
+    """
+
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Check:
+    """ One check with its frequently used fields as attributes
+
+    Fields missing from the check are None. The full check is decoded
+    again on each read of data, parameters or fields; keep the result
+    when it is needed more than once. customerid is the subaccount the
+    check was listed for, None for the account of the token.
+
+    :type check_id: string
+    :param check_id: ID of the check
+    :type raw: bytes
+    :param raw: The check encoded as JSON
+    """
+
+    __slots__ = ("id", "type", "label", "state", "enable", "interval",
+                 "checktoken", "modified", "customerid", "_raw")
+
+    def __init__(self, check_id, raw, check_type=None, label=None, state=None,
+                 enable=None, interval=None, checktoken=None, modified=None,
+                 customerid=None):
+        self.id = check_id
+        self.type = _intern(check_type)
+        self.label = label
+        self.state = state
+        self.enable = _intern(enable)
+        self.interval = interval
+        self.checktoken = checktoken
+        self.modified = modified
+        self.customerid = customerid
+        self._raw = raw
+
+    @classmethod
+    def from_dict(cls, check_id, check):
+        """ Creates a Check from a decoded check, such as the values of
+        the checks endpoint
+        """
+
+        parameters = check.get("parameters")
+
+        if isinstance(parameters, dict):
+            checktoken = parameters.get("checktoken")
+        else:
+            checktoken = None
+
+        return cls(check_id, _codec.dumps(check), check.get("type"),
+                   check.get("label"), check.get("state"), check.get("enable"),
+                   check.get("interval"), checktoken, check.get("modified"))
+
+    @classmethod
+    def from_json(cls, check_id, raw):
+        """ Creates a Check from a check encoded as JSON
+        """
+
+        check = cls.from_dict(check_id, _codec.loads(raw))
+        check._raw = raw if isinstance(raw, bytes) else raw.encode("utf-8")
+
+        return check
+
+    def __repr__(self):
+        return "Check({0!r}, type={1!r}, label={2!r})".format(
+            self.id, self.type, self.label)
+
+    @property
+    def raw(self):
+        """ The check encoded as JSON, as UTF-8 bytes
+        """
+
+        return self._raw
+
+    @property
+    def data(self):
+        """ The whole check as a dict, decoded on each read
+        """
+
+        return _codec.loads(self._raw)
+
+    @property
+    def parameters(self):
+        """ The parameters of the check, {} if it has none
+        """
+
+        return self.data.get("parameters") or {}
+
+    @property
+    def fields(self):
+        """ The fields of a PUSH check, {} if it has none
+        """
+
+        return self.parameters.get("fields") or {}
+
+    @property
+    def active(self):
+        return self.enable == "active"
@@ -0,0 +1,288 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Circuit breaker for NodePing API outages
+
+Requests are tracked per endpoint family (checks, results, contacts,
+accounts, ...). Once too many of the recent requests to a family
+failed with a connection error, timeout or 5xx response, its circuit
+opens and further requests to that family fail at once with
+CircuitOpenError instead of waiting for a full error each. After
+config.CIRCUIT_RESET_TIMEOUT seconds the circuit is half-open and a
+few probe requests are let through: if they succeed it closes again,
+if one fails it opens for another round.
+
+Cached responses are still served while a circuit is open. Every
+change of state is passed to the instrumentation hooks as a
+CircuitEvent, and composite operations such as update_many stop and
+return what finished when a circuit opens:
+
+    def on_circuit(event):
+        if event.kind == "circuit":
+            print(event.family, event.previous, "->", event.state)
+
+    instrumentation.add_hook(on_circuit)
+"""
+
+import threading
+import time
+from collections import deque
+from . import instrumentation
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitOpenError(ConnectionError):
+    """ The circuit of an endpoint family is open, nothing was sent
+
+    A ConnectionError, so code that already handles network failures
+    handles it too.
+    """
+
+    def __init__(self, family, retry_in):
+        super().__init__(
+            "NodePing API circuit for {0!r} is open, retry in {1:.1f}s".format(
+                family, retry_in))
+        self.family = family
+        self.retry_in = retry_in
+
+
+class CircuitEvent:
+    """ A circuit changed state, passed to the instrumentation hooks
+
+    failure_rate is the share of failed requests in the window at the
+    time of the change.
+    """
+
+    kind = "circuit"
+
+    __slots__ = ("family", "previous", "state", "failure_rate")
+
+    def __init__(self, family, previous, state, failure_rate):
+        self.family = family
+        self.previous = previous
+        self.state = state
+        self.failure_rate = failure_rate
+
+    def __repr__(self):
+        return "CircuitEvent({0} {1} -> {2} failure_rate={3:.2f})".format(
+            self.family, self.previous, self.state, self.failure_rate)
+
+
+class _Circuit:
+    __slots__ = ("state", "outcomes", "failures", "opened_at", "probes",
+                 "probe_successes")
+
+    def __init__(self, window):
+        self.state = CLOSED
+        self.outcomes = deque(maxlen=window)
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probes = 0
+        self.probe_successes = 0
+
+    def failure_rate(self):
+        if not self.outcomes:
+            return 0.0
+
+        return self.failures / len(self.outcomes)
+
+    def add(self, failed):
+        if len(self.outcomes) == self.outcomes.maxlen:
+            self.failures -= self.outcomes[0]
+
+        self.outcomes.append(failed)
+        self.failures += failed
+
+    def reset(self):
+        self.outcomes.clear()
+        self.failures = 0
+        self.probes = 0
+        self.probe_successes = 0
+
+
+class CircuitBreaker:
+    """ Thread safe circuit breakers, one per endpoint family
+
+    :type failure_rate: float
+    :param failure_rate: Share of failed requests in the window, from
+    0 to 1, that opens the circuit. None or 0 disables the breaker
+    :type min_requests: int
+    :param min_requests: Requests in the window before it can open
+    :type window: int
+    :param window: Most recent requests the failure rate is taken over
+    :type reset_timeout: float
+    :param reset_timeout: Seconds a circuit stays open before probing
+    :type probes: int
+    :param probes: Probe requests let through while half-open, all of
+    which have to succeed to close the circuit
+    """
+
+    def __init__(self, failure_rate, min_requests, window, reset_timeout,
+                 probes=1):
+        self._lock = threading.Lock()
+        self._circuits = {}
+        self.configure(failure_rate, min_requests, window, reset_timeout,
+                       probes)
+
+    def configure(self, failure_rate=None, min_requests=None, window=None,
+                  reset_timeout=None, probes=None):
+        """ Changes the settings and closes every circuit
+        """
+
+        with self._lock:
+            if failure_rate is not None:
+                self.failure_rate = failure_rate
+            if min_requests is not None:
+                self.min_requests = max(1, min_requests)
+            if window is not None:
+                self.window = max(1, window)
+            if reset_timeout is not None:
+                self.reset_timeout = reset_timeout
+            if probes is not None:
+                self.probes = max(1, probes)
+
+            self._circuits = {}
+
+    def _circuit(self, family):
+        circuit = self._circuits.get(family)
+
+        if circuit is None:
+            circuit = self._circuits[family] = _Circuit(self.window)
+
+        return circuit
+
+    def _change(self, family, circuit, state, now):
+        """ Moves a circuit to a new state and returns the event for it
+        """
+
+        event = CircuitEvent(family, circuit.state, state,
+                             circuit.failure_rate())
+        circuit.state = state
+
+        if state == OPEN:
+            circuit.opened_at = now
+            circuit.probes = 0
+            circuit.probe_successes = 0
+        elif state == CLOSED:
+            circuit.reset()
+
+        return event
+
+    def before(self, family):
+        """ Lets a request to the family through or fails it fast
+
+        :return: Whether the request is a half-open probe, which is
+        passed on to after()
+        :rtype: bool
+        :raises CircuitOpenError: if the circuit is open
+        """
+
+        if not self.failure_rate:
+            return False
+
+        event = None
+
+        with self._lock:
+            circuit = self._circuit(family)
+            now = time.monotonic()
+
+            if circuit.state == OPEN:
+                retry_in = circuit.opened_at + self.reset_timeout - now
+
+                if retry_in > 0:
+                    raise CircuitOpenError(family, retry_in)
+
+                event = self._change(family, circuit, HALF_OPEN, now)
+
+            probe = circuit.state == HALF_OPEN
+
+            if probe:
+                if circuit.probes + circuit.probe_successes >= self.probes:
+                    raise CircuitOpenError(family, 0.0)
+
+                circuit.probes += 1
+
+        if event is not None:
+            instrumentation.emit(event)
+
+        return probe
+
+    def after(self, family, failed, probe=False):
+        """ Records how a request let through by before() went
+
+        :type failed: bool
+        :param failed: True for a failure, False for a success and None
+        when the request ended for another reason, such as a deadline,
+        that says nothing about the API
+        :type probe: bool
+        :param probe: What before() returned for the request
+        """
+
+        if not self.failure_rate:
+            return
+
+        event = None
+
+        with self._lock:
+            circuit = self._circuit(family)
+            now = time.monotonic()
+
+            if probe:
+                # A probe from before the circuit last changed state
+                # says nothing about the current round
+                if circuit.state != HALF_OPEN or not circuit.probes:
+                    return
+
+                circuit.probes -= 1
+
+                if failed:
+                    event = self._change(family, circuit, OPEN, now)
+                elif failed is not None:
+                    circuit.probe_successes += 1
+
+                    if circuit.probe_successes >= self.probes:
+                        event = self._change(family, circuit, CLOSED, now)
+            elif circuit.state == CLOSED and failed is not None:
+                circuit.add(failed)
+
+                if (failed and len(circuit.outcomes) >= self.min_requests
+                        and circuit.failure_rate() >= self.failure_rate):
+                    event = self._change(family, circuit, OPEN, now)
+
+        if event is not None:
+            instrumentation.emit(event)
+
+    def _state(self, circuit, now):
+        if circuit.state == OPEN and now >= circuit.opened_at + self.reset_timeout:
+            return HALF_OPEN
+
+        return circuit.state
+
+    def state(self, family):
+        """ Returns CLOSED, OPEN or HALF_OPEN for an endpoint family
+        """
+
+        with self._lock:
+            circuit = self._circuits.get(family)
+
+            if circuit is None:
+                return CLOSED
+
+            return self._state(circuit, time.monotonic())
+
+    def stats(self):
+        """ State and failure rate of every family seen so far
+
+        :rtype: dict
+        """
+
+        now = time.monotonic()
+
+        with self._lock:
+            return {family: {"state": self._state(circuit, now),
+                             "failure_rate": circuit.failure_rate(),
+                             "requests": len(circuit.outcomes)}
+                    for family, circuit in self._circuits.items()}
@@ -0,0 +1,285 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" A NodePing API client that keeps its token and session
+
+NodePingClient holds the API token and optional subaccount ID, and a
+Session with its own connection pool, response cache and request
+counters. Its methods call the module level functions of nodeping_api
+with that session active, so the token and customerid are not passed
+around. Clients share the process wide rate limit, request slots and
+circuit breakers, unless given a rate_limit of their own:
+
+    client = NodePingClient(token)
+    failing = client.failing_checks()
+    client.update_check(checkid, "PUSH", {"enabled": "inactive"})
+    print(client.stats())
+
+The module level functions keep working as before and share the
+default session.
+"""
+
+from . import (_query_nodeping_api, accounts, contacts, create_check,
+               delete_checks, export, get_checks, results, schedules,
+               update_checks, watch)
+
+
+class NodePingClient:
+    """ NodePing API client for one account or subaccount
+
+    :type token: string
+    :param token: NodePing API token
+    :type customerid: string
+    :param customerid: Optional subaccount ID the calls are made for
+    :type session: _query_nodeping_api.Session
+    :param session: Session to use, by default a new one. The other
+    keyword arguments are passed on to a new Session
+    """
+
+    def __init__(self, token, customerid=None, session=None, **settings):
+        self.token = token
+        self.customerid = customerid
+        self.session = session or _query_nodeping_api.Session(**settings)
+
+    def __repr__(self):
+        return "NodePingClient(customerid={0!r})".format(self.customerid)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _call(self, func, *args, **kwargs):
+        """ Calls func with the session active
+        """
+
+        with _query_nodeping_api.activate(self.session):
+            return func(*args, **kwargs)
+
+    def _iterate(self, iterator):
+        """ Yields from a streaming iterator with the session active
+        """
+
+        while True:
+            with _query_nodeping_api.activate(self.session):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+
+            yield item
+
+    def _checks(self, checkid=None):
+        return get_checks.GetChecks(self.token, checkid, self.customerid)
+
+    def subaccount(self, customerid):
+        """ Client for a subaccount that shares this client's session
+        """
+
+        return NodePingClient(self.token, customerid, self.session)
+
+    def stats(self):
+        """ Requests, errors, retries, bytes and cache counters
+
+        :rtype: dict
+        """
+
+        return self.session.stats()
+
+    def clear_cache(self):
+        self.session.cache.clear()
+
+    def close(self):
+        """ Closes the connections kept open by the session
+        """
+
+        self.session.close()
+
+    # Checks
+
+    def get_checks(self):
+        """ All checks on the account, see GetChecks.all_checks
+        """
+
+        return self._call(self._checks().all_checks)
+
+    def iter_checks(self, predicate=None):
+        """ Streams (check_id, check) pairs, see GetChecks.iter_checks
+        """
+
+        return self._iterate(self._checks().iter_checks(predicate))
+
+    def get_check(self, checkid):
+        return self._call(self._checks(checkid).get_by_id)
+
+    def passing_checks(self):
+        return self._call(self._checks().passing_checks)
+
+    def failing_checks(self):
+        return self._call(self._checks().failing_checks)
+
+    def disabled_checks(self):
+        return self._call(self._checks().disabled_checks)
+
+    def last_result(self, checkid):
+        return self._call(self._checks(checkid).last_result)
+
+    def last_results(self, checkids=None, workers=None, progress=None):
+        """ Last result of many checks at once, see GetChecks.last_results
+        """
+
+        return self._call(self._checks().last_results, checkids, workers,
+                          progress)
+
+    def create_check(self, check_type, **parameters):
+        """ Creates a check with the create_check function for its type
+
+        :type check_type: string
+        :param check_type: Check type such as 'PUSH' or 'HTTP'
+        :param parameters: Arguments of the create_check function
+        """
+
+        create = getattr(create_check, "{0}_check".format(check_type.lower()))
+
+        return self._call(create, self.token, customerid=self.customerid,
+                          **parameters)
+
+    def update_check(self, checkid, checktype, fields):
+        return self._call(update_checks.update, self.token, checkid,
+                          checktype, fields, self.customerid)
+
+    def update_checks(self, checkids, fields):
+        """ Updates many checks, see update_checks.update_many
+        """
+
+        return self._call(update_checks.update_many, self.token, checkids,
+                          fields, self.customerid)
+
+    def delete_check(self, checkid):
+        return self._call(delete_checks.remove, self.token, checkid,
+                          self.customerid)
+
+    def export_checks(self, path, progress=None):
+        """ Writes every check to a JSON lines file, see
+        export.export_checks
+        """
+
+        return self._call(export.export_checks, self.token, path,
+                          self.customerid, progress)
+
+    def import_checks(self, path, journal=None, workers=None, progress=None):
+        """ Creates the checks of an exported file, see
+        export.import_checks
+        """
+
+        return self._call(export.import_checks, self.token, path,
+                          self.customerid, journal, workers, progress)
+
+    # Results
+
+    def get_results(self, checkid, **parameters):
+        """ Results for a check, see results.get_results
+        """
+
+        return self._call(results.get_results, self.token, checkid,
+                          self.customerid, **parameters)
+
+    def iter_results(self, checkid, **parameters):
+        """ Streams results for a check, see results.iter_results
+        """
+
+        return self._iterate(results.iter_results(
+            self.token, checkid, self.customerid, **parameters))
+
+    def get_uptime(self, checkid, **parameters):
+        return self._call(results.get_uptime, self.token, checkid,
+                          self.customerid, **parameters)
+
+    def get_current(self):
+        """ Current events for the account, see results.get_current
+        """
+
+        return self._call(results.get_current, self.token, self.customerid)
+
+    def watch(self, stop=None, on_error=None, **settings):
+        """ Yields check state changes until stopped, see
+        watch.Watcher.events. The other keyword arguments are passed on
+        to the Watcher
+        """
+
+        watcher = watch.Watcher(self.token, self.customerid, **settings)
+
+        return self._iterate(watcher.events(stop, on_error))
+
+    # Contacts
+
+    def get_contacts(self):
+        return self._call(contacts.get_all, self.token, self.customerid)
+
+    def get_contact(self, contact_id):
+        return self._call(contacts.get_one, self.token, contact_id,
+                          self.customerid)
+
+    def get_contacts_by_type(self, contacttype):
+        return self._call(contacts.get_by_type, self.token, contacttype,
+                          self.customerid)
+
+    def create_contact(self, **parameters):
+        return self._call(contacts.create_contact, self.token,
+                          self.customerid, **parameters)
+
+    def update_contact(self, contact_id, **parameters):
+        return self._call(contacts.update_contact, self.token, contact_id,
+                          self.customerid, **parameters)
+
+    def delete_contact(self, contact_id):
+        return self._call(contacts.delete_contact, self.token, contact_id,
+                          self.customerid)
+
+    def reset_password(self, contact_id):
+        return self._call(contacts.reset_password, self.token, contact_id,
+                          self.customerid)
+
+    # Schedules
+
+    def get_schedule(self, schedule=None):
+        return self._call(schedules.get_schedule, self.token, schedule,
+                          self.customerid)
+
+    def create_schedule(self, data, schedule_name):
+        return self._call(schedules.create_schedule, self.token, data,
+                          schedule_name, self.customerid)
+
+    def update_schedule(self, data, schedule_name):
+        return self._call(schedules.update_schedule, self.token, data,
+                          schedule_name, self.customerid)
+
+    def delete_schedule(self, schedule):
+        return self._call(schedules.delete_schedule, self.token, schedule,
+                          self.customerid)
+
+    # Accounts
+
+    def get_account(self):
+        return self._call(accounts.get_account, self.token, self.customerid)
+
+    def create_subaccount(self, name, contactname, email, timezone, location,
+                          emailme=False):
+        return self._call(accounts.create_subaccount, self.token, name,
+                          contactname, email, timezone, location, emailme)
+
+    def update_account(self, **parameters):
+        return self._call(accounts.update_account, self.token,
+                          self.customerid, **parameters)
+
+    def delete_account(self, customerid=None):
+        """ Deletes a subaccount, by default the client's own
+        """
+
+        return self._call(accounts.delete_account, self.token,
+                          customerid or self.customerid)
+
+    def disable_notifications(self, accountsupressall=False):
+        return self._call(accounts.disable_notifications, self.token,
+                          self.customerid, accountsupressall)
@@ -1 +1,87 @@
 API_URL = 'https://api.nodeping.com/api/1/'
+
+# Backend requests are sent through: 'pooled' (keep-alive connections),
+# 'urllib' (a new connection per request) or 'http2' (needs httpx[http2])
+TRANSPORT = 'pooled'
+
+# Seconds to wait for a connection to the API and for each read from
+# it before giving up on a request (None waits forever)
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 60
+
+# Idle keep-alive connections kept open per host and the number of
+# seconds an idle connection may still be reused for
+POOL_SIZE = 10
+POOL_IDLE_TIMEOUT = 30
+
+# Requests the asyncio API (nodeping_api.aio) runs at the same time
+AIO_MAX_CONCURRENCY = 20
+
+# Requests per second allowed for the whole process (None to disable)
+# and how many requests may be sent in a burst
+RATE_LIMIT = 10
+RATE_LIMIT_BURST = 10
+
+# Retries for throttled (429) and 5xx responses, with exponential
+# backoff starting at BACKOFF_BASE seconds and capped at BACKOFF_MAX
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30
+
+# Seconds GET responses are cached for, per endpoint family. Families
+# that are not listed, or set to 0, are never cached. CACHE_SIZE is
+# the most responses kept in memory at once
+CACHE_SIZE = 256
+CACHE_TTL = {
+    'checks': 30,
+    'contacts': 300,
+    'contactgroups': 300,
+    'schedules': 300,
+    'accounts': 60,
+    'info': 3600,
+}
+
+# Requests in flight at once across the process (None for no limit).
+# While requests wait for a slot, each priority class gets a share of
+# the slots that freed up in proportion to its weight, and
+# INTERACTIVE_RESERVED slots are kept for interactive requests only
+MAX_CONCURRENT_REQUESTS = 8
+PRIORITY_WEIGHTS = {
+    'interactive': 8,
+    'normal': 4,
+    'bulk': 1,
+}
+INTERACTIVE_RESERVED = 1
+
+# Worker threads nodeping_api.bulk.map_requests sends requests from.
+# They still share the MAX_CONCURRENT_REQUESTS slots and the rate limit
+BULK_WORKERS = 8
+
+# Circuit breaker per endpoint family (checks, results, contacts, ...).
+# A circuit opens once CIRCUIT_FAILURE_RATE of the last CIRCUIT_WINDOW
+# requests failed (at least CIRCUIT_MIN_REQUESTS of them; None disables
+# the breaker), fails requests fast for CIRCUIT_RESET_TIMEOUT seconds,
+# then lets CIRCUIT_PROBES probe requests through to decide whether to
+# close again
+CIRCUIT_FAILURE_RATE = 0.5
+CIRCUIT_MIN_REQUESTS = 10
+CIRCUIT_WINDOW = 20
+CIRCUIT_RESET_TIMEOUT = 30
+CIRCUIT_PROBES = 1
+
+# Seconds the check catalog (nodeping_api.catalog) is used before the
+# checks are downloaded again. Changes made through nodeping_api
+# always make it download them again
+CATALOG_TTL = 30
+
+# SQLite database the check snapshots of nodeping_api.store are kept in
+STORE_PATH = '~/.cache/nodeping_api/checks.sqlite3'
+
+# Polling of nodeping_api.watch. results/current is polled every
+# WATCH_MIN_INTERVAL seconds after a change, backing off to
+# WATCH_MAX_INTERVAL while nothing changes; the check list is synced
+# every WATCH_CATALOG_INTERVAL seconds to find disabled and deleted
+# checks
+WATCH_MIN_INTERVAL = 15
+WATCH_MAX_INTERVAL = 120
+WATCH_CATALOG_INTERVAL = 300
@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Operation deadlines and cancellation for NodePing API calls
+
+Every request gets a connect and a read timeout (config.CONNECT_TIMEOUT
+and config.READ_TIMEOUT). On top of that, a deadline can be set for a
+whole operation made of many requests:
+
+    with deadline.deadline(30):
+        results = update_checks.update_many(token, checkids, fields)
+
+    if not results.complete:
+        print(results.report())
+
+Inside the block no request is allowed to run past the deadline; its
+timeouts, retries and waits for a rate limit or a request slot are cut
+short, and once the time is up (or the deadline is cancelled) new
+requests fail at once with DeadlineExceeded. Composite operations
+catch it and return what finished as a PartialResult.
+
+Deadlines nest (the earliest one wins) and follow the context of the
+thread or asyncio task that set them.
+"""
+
+import contextlib
+import contextvars
+import time
+
+_CURRENT = contextvars.ContextVar("nodeping_api_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """ The operation deadline passed or the operation was cancelled
+    """
+
+
+class Deadline:
+    """ Point in time after which no more requests are started
+
+    :type seconds: float
+    :param seconds: Seconds from now until the deadline. None means
+    no time limit, which is still useful for cancel()
+    """
+
+    def __init__(self, seconds=None, parent=None):
+        self.expires = None if seconds is None else time.monotonic() + seconds
+        self.parent = parent
+        self.cancelled = False
+
+        if parent is not None and parent.expires is not None:
+            if self.expires is None or parent.expires < self.expires:
+                self.expires = parent.expires
+
+    def cancel(self):
+        """ Makes every later request under this deadline fail
+        """
+
+        self.cancelled = True
+
+    def is_cancelled(self):
+        deadline = self
+
+        while deadline is not None:
+            if deadline.cancelled:
+                return True
+            deadline = deadline.parent
+
+        return False
+
+    def remaining(self):
+        """ Seconds left, None if there is no time limit
+        """
+
+        if self.expires is None:
+            return None
+
+        return max(0.0, self.expires - time.monotonic())
+
+    def check(self):
+        """ Raises DeadlineExceeded if the deadline passed or was cancelled
+        """
+
+        if self.is_cancelled():
+            raise DeadlineExceeded("Operation was cancelled")
+
+        if self.expires is not None and time.monotonic() >= self.expires:
+            raise DeadlineExceeded("Operation deadline exceeded")
+
+
+@contextlib.contextmanager
+def deadline(seconds=None):
+    """ Sets a deadline for every API request made in the block
+
+    :type seconds: float
+    :param seconds: Time budget for the whole block
+    :return: The Deadline, which can also be cancelled
+    :rtype: Deadline
+    """
+
+    current = Deadline(seconds, _CURRENT.get())
+    token = _CURRENT.set(current)
+
+    try:
+        yield current
+    finally:
+        _CURRENT.reset(token)
+
+
+def current():
+    """ Returns the Deadline of the current context, or None
+    """
+
+    return _CURRENT.get()
+
+
+def check():
+    """ Raises DeadlineExceeded if the current deadline has passed
+    """
+
+    current_deadline = _CURRENT.get()
+
+    if current_deadline is not None:
+        current_deadline.check()
+
+
+def remaining():
+    """ Seconds left until the current deadline, None for no deadline
+
+    :raises DeadlineExceeded: if the deadline already passed
+    """
+
+    current_deadline = _CURRENT.get()
+
+    if current_deadline is None:
+        return None
+
+    current_deadline.check()
+
+    return current_deadline.remaining()
+
+
+def clamp(timeout):
+    """ Shortens a timeout so it ends no later than the current deadline
+    """
+
+    left = remaining()
+
+    if left is None:
+        return timeout
+    if timeout is None:
+        return left
+
+    return min(timeout, left)
+
+
+def sleep(seconds):
+    """ Sleeps, unless that would run past the current deadline
+
+    :raises DeadlineExceeded: if the deadline comes first
+    """
+
+    left = remaining()
+
+    if left is not None and seconds >= left:
+        raise DeadlineExceeded("Operation deadline exceeded")
+
+    time.sleep(seconds)
+
+
+class PartialResult(list):
+    """ Results of a composite operation, in order, as far as it got
+
+    A list of the results that finished. unfinished holds the items
+    (such as check IDs) that were not done when the operation stopped,
+    and error why it stopped. failed maps the items NodePing refused,
+    such as a missing check, to their error.
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.unfinished = []
+        self.error = None
+        self.failed = {}
+
+    @property
+    def complete(self):
+        return not self.unfinished and not self.failed
+
+    def stop(self, unfinished, error):
+        """ Records what was left undone and why
+        """
+
+        self.unfinished = list(unfinished)
+        self.error = error
+
+    def report(self):
+        """ One line summary of what finished and what did not
+        """
+
+        if self.complete:
+            return "All {0} finished".format(len(self))
+
+        report = "{0} finished".format(len(self))
+
+        if self.failed:
+            report += ", {0} failed: {1}".format(
+                len(self.failed), ", ".join(str(item) for item in self.failed))
+
+        if self.unfinished:
+            report += ", {0} not finished ({1}): {2}".format(
+                len(self.unfinished), self.error,
+                ", ".join(str(item) for item in self.unfinished))
+
+        return report
@@ -3,10 +3,10 @@
 
 
 """
-Delete a NodePing check on an account or subaccount.
+Delete one or many NodePing checks on an account or subaccount.
 """
 
-from . import _utils, _query_nodeping_api, config
+from . import _utils, _query_nodeping_api, bulk, config, scheduler
 
 API_URL = "{0}checks".format(config.API_URL)
 
@@ -28,3 +28,35 @@ def remove(token, checkid, customerid=None):
     url = _utils.create_url(token, url, customerid)
 
     return _query_nodeping_api.delete(url)
+
+
+def remove_many(token, checkids, customerid=None, progress=None):
+    """ Deletes many checks at once
+
+    The checks are deleted concurrently as bulk priority requests, see
+    bulk.map_requests. A failure to delete one check does not stop the
+    others.
+
+    :type token: string
+    :param token: API token from NodePing
+    :type checkids: list
+    :param checkids: IDs of checks that will be deleted
+    :type customerid: string
+    :param customerid: subaccount ID if the checks are on a subaccount
+    :type progress: function
+    :param progress: Called as progress(done, total, item) after each
+    check
+    :rtype: list
+    :return: bulk.ItemResult for each check, in order, with the
+    response from NodePing or the error
+    """
+
+    specs = []
+
+    for checkid in checkids:
+        url = "{0}/{1}".format(API_URL, checkid)
+        url = _utils.create_url(token, url, customerid)
+        specs.append(bulk.RequestSpec("DELETE", url, key=checkid))
+
+    with scheduler.priority(scheduler.BULK):
+        return bulk.map_requests(specs, progress=progress)
@@ -0,0 +1,284 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Export checks to a JSON lines file and import them again
+
+export_checks() writes every check of an account as one JSON object
+per line while the check list is still being read from NodePing, and
+import_checks() reads such a file one line at a time and creates the
+checks again with create_check, a few at a time. Neither holds more
+than a handful of checks in memory, however large the account:
+
+    export.export_checks(token, 'checks.jsonl.gz')
+    result = export.import_checks(new_token, 'checks.jsonl.gz')
+    print(result.report())
+
+Files ending in .gz are gzip compressed.
+
+An import keeps a journal (the file name plus .journal) with a line
+for each check it created, holding the ID of the exported check and
+the ID and checktoken of the new one. Running the same import again
+skips the checks in the journal, so an interrupted import continues
+where it stopped, and checks that failed are tried again.
+
+Contacts in notifications and dependencies (dep) keep the IDs they
+had on the exported account. Parameters create_check has no argument
+for cannot be set on the new check; they are listed for each check in
+the import result and the journal.
+"""
+
+import gzip
+import inspect
+import json
+import os
+from . import (_codec, _query_nodeping_api, _utils, bulk, config, create_check,
+               scheduler)
+
+API_URL = "{0}checks".format(config.API_URL)
+
+# Check fields passed on to create_check besides the parameters
+_CHECK_FIELDS = ("label", "interval", "public", "runlocations", "homeloc",
+                 "dep", "notifications")
+
+
+def _open(path, mode, compressed=None):
+    if compressed is None:
+        compressed = path.endswith(".gz")
+
+    if compressed:
+        return gzip.open(path, mode)
+
+    return open(path, mode)
+
+
+def export_checks(token, path, customerid=None, progress=None):
+    """ Writes every check of the account to a JSON lines file
+
+    The file is written next to its destination and renamed into
+    place, so a failed export leaves an earlier file as it was.
+
+    :type token: string
+    :param token: NodePing API token
+    :type path: string
+    :param path: File to write, gzip compressed if it ends in .gz
+    :type customerid: string
+    :param customerid: Optional subaccount ID
+    :type progress: function
+    :param progress: Called as progress(count, check_id) after each
+    check is written
+    :return: Number of checks written
+    :rtype: int
+    :raises _query_nodeping_api.APIError: if NodePing answers with an
+    error
+    """
+
+    url = _utils.create_url(token, API_URL, customerid)
+    temp_path = "{0}.tmp".format(path)
+    count = 0
+
+    try:
+        with _open(temp_path, "wb", path.endswith(".gz")) as handle:
+            for check_id, check in _query_nodeping_api.iter_object(url, cache=False):
+                check.setdefault("_id", check_id)
+                handle.write(_codec.dumps(check) + b"\n")
+                count += 1
+
+                if progress is not None:
+                    progress(count, check_id)
+    except BaseException:
+        # _open() itself may have failed before creating the file
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    os.replace(temp_path, path)
+
+    return count
+
+
+def read_checks(path):
+    """ Yields the checks of an exported file, one line at a time
+    """
+
+    with _open(path, "rb") as handle:
+        for line in handle:
+            if line.strip():
+                yield _codec.loads(line)
+
+
+def _create_function(check):
+    name = "{0}_check".format(str(check.get("type", "")).lower())
+    create_function = getattr(create_check, name, None)
+
+    if create_function is None:
+        raise ValueError("Unable to create checks of type {0!r}".format(
+            check.get("type")))
+
+    return create_function
+
+
+def _arguments(check):
+    """ Arguments of create_check for an exported check
+    """
+
+    arguments = dict(check.get("parameters") or {})
+    # The new check gets a checktoken of its own
+    arguments.pop("checktoken", None)
+
+    for field in _CHECK_FIELDS:
+        if field in check:
+            arguments[field] = check[field]
+
+    arguments["enabled"] = check.get("enable") == "active"
+
+    return arguments
+
+
+def create(token, check, customerid=None):
+    """ Creates a check from its exported definition
+
+    :type check: dict
+    :param check: A check as returned by NodePing, such as a line of
+    an exported file
+    :return: Response from NodePing
+    :rtype: dict
+    :raises ValueError: if create_check has no function for the type
+    of the check
+    """
+
+    create_function = _create_function(check)
+
+    return create_function(token, customerid=customerid, **_arguments(check))
+
+
+def unsupported(check):
+    """ Parameters of an exported check that create() cannot set
+
+    The create_check functions leave out arguments they do not name,
+    so these are not set on the new check.
+
+    :type check: dict
+    :param check: A check as returned by NodePing
+    :return: Names of the parameters, sorted
+    :rtype: list
+    :raises ValueError: if create_check has no function for the type
+    of the check
+    """
+
+    accepted = inspect.signature(_create_function(check)).parameters
+
+    return sorted(name for name in _arguments(check) if name not in accepted)
+
+
+class ImportResult:
+    """ Checks created, skipped as already imported, and failed
+    """
+
+    def __init__(self):
+        self.created = 0
+        self.skipped = 0
+        # (exported check ID, error) of each check that failed
+        self.failed = []
+        # Exported check ID to the parameters of it that were not set
+        # on the created check, see unsupported()
+        self.dropped = {}
+
+    def counts(self):
+        return {"created": self.created, "skipped": self.skipped,
+                "failed": len(self.failed), "dropped": len(self.dropped)}
+
+    def report(self):
+        report = "{created} created, {skipped} already imported, " \
+                 "{failed} failed".format(**self.counts())
+
+        if self.dropped:
+            report += ", {0} created without some parameters".format(
+                len(self.dropped))
+
+        return report
+
+    def __repr__(self):
+        return "ImportResult({0})".format(self.report())
+
+
+def _journaled(journal):
+    """ IDs of the exported checks a journal lists as created
+    """
+
+    if not os.path.exists(journal):
+        return set()
+
+    with open(journal, encoding="utf-8") as handle:
+        return {json.loads(line)["source"] for line in handle if line.strip()}
+
+
+def import_checks(token, path, customerid=None, journal=None, workers=None,
+                  progress=None):
+    """ Creates the checks of an exported file
+
+    The file is read one check at a time, and the checks are created
+    concurrently as bulk priority requests, see bulk.imap_calls. A
+    failure to create one check does not stop the others.
+
+    :type token: string
+    :param token: NodePing API token of the account to create them on
+    :type path: string
+    :param path: File written by export_checks
+    :type customerid: string
+    :param customerid: Optional subaccount ID to create them on
+    :type journal: string
+    :param journal: File recording the checks created, defaults to
+    path plus .journal. Checks already in it are skipped
+    :type workers: int
+    :param workers: Checks created at once, defaults to
+    config.BULK_WORKERS
+    :type progress: function
+    :param progress: Called as progress(result, item) after each check
+    with the ImportResult so far and the bulk.ItemResult of the check
+    :rtype: ImportResult
+    :return: What was imported. Its dropped attribute lists, for each
+    created check, the exported parameters it was created without
+    """
+
+    journal = journal or "{0}.journal".format(path)
+    imported = _journaled(journal)
+    result = ImportResult()
+
+    def pending():
+        for check in read_checks(path):
+            if check.get("_id") in imported:
+                result.skipped += 1
+            else:
+                yield check
+
+    def create_one(check):
+        return create(token, check, customerid)
+
+    with open(journal, "a", encoding="utf-8") as log, \
+            scheduler.priority(scheduler.BULK):
+        for item in bulk.imap_calls(create_one, pending(), workers):
+            source = item.spec.get("_id")
+            response = item.response
+
+            if isinstance(response, dict) and "error" in response:
+                result.failed.append((source, response["error"]))
+            elif not item.ok:
+                result.failed.append((source, item.error))
+            else:
+                result.created += 1
+                parameters = response.get("parameters") or {}
+                entry = {"source": source, "_id": response.get("_id"),
+                         "checktoken": parameters.get("checktoken")}
+                dropped = unsupported(item.spec)
+
+                if dropped:
+                    result.dropped[source] = entry["dropped"] = dropped
+
+                log.write(json.dumps(entry) + "\n")
+                # Written at once, so an interrupted import knows
+                log.flush()
+
+            if progress is not None:
+                progress(result, item)
+
+    return result
@@ -4,13 +4,57 @@
 """ Get checks that were created on your NodePing account.
 
 Allows you go get all checks, get passing, failing, by its ID,
-disabled checks, and last results for a check.
+disabled checks, and last results for a check or many checks.
 """
 
-from . import _query_nodeping_api, _utils, config
+from . import _query_nodeping_api, _utils, bulk, catalog, config, scheduler
 
 API_URL = "{0}checks".format(config.API_URL)
 
+# Above this many checks, last_results() reads the last results of
+# every check in one listing rather than one request per check
+LIST_LAST_RESULTS_AFTER = 20
+
+
+class LastResult:
+    """ Row of the table returned by GetChecks.last_results
+
+    timestamp is when the check last ran, in milliseconds since the
+    epoch, success whether it passed and runtime how long it took in
+    milliseconds. All three are None if the check has no result yet,
+    or if the request failed, in which case error is set.
+    """
+
+    __slots__ = ("check_id", "timestamp", "success", "runtime", "error")
+
+    def __init__(self, check_id, timestamp=None, success=None, runtime=None,
+                 error=None):
+        self.check_id = check_id
+        self.timestamp = timestamp
+        self.success = success
+        self.runtime = runtime
+        self.error = error
+
+    @classmethod
+    def from_response(cls, check_id, response):
+        """ Reads the row from a check fetched with lastresult=true
+        """
+
+        if not isinstance(response, dict) or "error" in response:
+            error = response.get("error") if isinstance(response, dict) else response
+            return cls(check_id, error=error)
+
+        result = response.get("lastresult") or {}
+
+        return cls(check_id, result.get("t"), result.get("su"), result.get("rt"))
+
+    def as_tuple(self):
+        return self.check_id, self.timestamp, self.success, self.runtime
+
+    def __repr__(self):
+        return "LastResult({0!r}, timestamp={1}, success={2}, runtime={3})".format(
+            *self.as_tuple())
+
 
 class GetChecks:
     def __init__(self, token, checkid=None, customerid=None):
@@ -41,56 +85,62 @@ class GetChecks:
 
         return _query_nodeping_api.get(url)
 
-    def passing_checks(self):
-        """ Gets all checks that are passing for the account
+    def iter_checks(self, predicate=None):
+        """ Streams the checks for the account one at a time
 
-        Makes a request to NodePing with the supplied API key.
-        Collects all checks for the account and removes all checks
-        with a state of 0 which means the check is failing.
-        """
+        Yields (check_id, check) pairs as they are read from NodePing
+        instead of loading all checks at once. When a predicate is
+        given, only checks for which it returns True are yielded, so
+        memory stays flat even for very large accounts.
 
-        passing_checks = {}
+        :type predicate: function
+        :param predicate: Optional filter called with each check
+        :return: Generator of (check_id, check) tuples
+        """
 
         url = _utils.create_url(self.token, API_URL, self.customerid)
 
-        all_checks_dictionary = _query_nodeping_api.get(url)
+        for check_id, contents in _query_nodeping_api.iter_object(url):
+            if predicate is None or predicate(contents):
+                yield check_id, contents
 
-        for check_id, contents in all_checks_dictionary.items():
-            try:
-                state = contents['state']
-            except KeyError:
-                state = 0
+    def catalog(self):
+        """ Indexed checks of the account, shared with other callers
 
-            if state == 1:
-                passing_checks.update({check_id: contents})
+        The checks are only downloaded again once the catalog expires
+        or a check was changed, see nodeping_api.catalog
 
-        return passing_checks
+        :rtype: catalog.CheckCatalog
+        """
 
-    def failing_checks(self):
-        """ Gets all checks for the account that are failing
+        return self._catalog()
 
-        Makes a request to NodePing with the supplied API key.
-        Queries NodePing for current failing checks.
+    def _catalog(self):
+        # For the methods here; the async GetChecks runs them on a
+        # worker, and its catalog() is a coroutine
+        return catalog.shared(self.token, self.customerid)
 
-        *NOTE* this will also include disabled checks
-        """
+    def passing_checks(self):
+        """ Gets all checks that are passing for the account
 
-        failing_checks = {}
+        Looks up the checks with a state of 1 in the account's check
+        catalog. Checks with a state of 0 are failing.
+        """
 
-        url = _utils.create_url(self.token, API_URL, self.customerid)
+        return {check_id: check.data
+                for check_id, check in self._catalog().where(state=1).items()}
 
-        all_checks_dictionary = _query_nodeping_api.get(url)
+    def failing_checks(self):
+        """ Gets all checks for the account that are failing
 
-        for check_id, contents in all_checks_dictionary.items():
-            try:
-                state = contents['state']
-            except KeyError:
-                state = 2
+        Looks up the checks with a state of 0 in the account's check
+        catalog.
 
-            if state == 0:
-                failing_checks.update({check_id: contents})
+        *NOTE* this will also include disabled checks
+        """
 
-        return failing_checks
+        return {check_id: check.data
+                for check_id, check in self._catalog().where(state=0).items()}
 
     def get_by_id(self):
         """ Collects the check based on its ID
@@ -98,12 +148,16 @@ class GetChecks:
         Expects a valid check ID and API token. Collects all
         checks from NodePing and looks for the check with the
         specified ID. Returns the contents for that check
+
+        Someone is usually waiting on a single check, so the request
+        goes ahead of queued bulk requests.
         """
 
         url = "{0}/{1}".format(API_URL, self.checkid)
         url = _utils.create_url(self.token, url, self.customerid)
 
-        return _query_nodeping_api.get(url)
+        with scheduler.priority(scheduler.INTERACTIVE):
+            return _query_nodeping_api.get(url)
 
     def disabled_checks(self):
         """ Gets all checks for the account that are disabled
@@ -135,3 +189,99 @@ class GetChecks:
         url = _utils.create_url(self.token, url, self.customerid)
 
         return _query_nodeping_api.get(url)
+
+    def last_results(self, checkids=None, workers=None, progress=None):
+        """ Gets the last result of many checks at once
+
+        Every PUSH check, or more than LIST_LAST_RESULTS_AFTER checks,
+        are read from one streamed listing of the checks with their
+        last results, so the time does not grow with the rate limit
+        times the number of checks. Fewer checks are requested one by
+        one, concurrently as bulk priority requests over the pooled
+        connections, see bulk.map_requests.
+
+        :type checkids: list
+        :param checkids: Checks to get the last result of. Defaults to
+        every PUSH check on the account
+        :type workers: int
+        :param workers: Requests sent at once, see bulk.map_requests
+        :type progress: function
+        :param progress: Called as progress(done, total, item) after
+        each check
+        :return: LastResult for each check, in order
+        :rtype: list
+        :raises _query_nodeping_api.APIError: if no checkids are given
+        and the checks cannot be listed
+        """
+
+        if checkids is None or len(checkids) > LIST_LAST_RESULTS_AFTER:
+            return self._listed_last_results(checkids, progress)
+
+        specs = []
+
+        for checkid in checkids:
+            url = "{0}/{1}?lastresult=true".format(API_URL, checkid)
+            url = _utils.create_url(self.token, url, self.customerid)
+            specs.append(bulk.RequestSpec("GET", url, key=checkid))
+
+        with scheduler.priority(scheduler.BULK):
+            outcomes = bulk.map_requests(specs, workers, progress)
+
+        return [LastResult(item.key, error=item.error) if item.response is None
+                else LastResult.from_response(item.key, item.response)
+                for item in outcomes]
+
+    def _listed_last_results(self, checkids, progress):
+        """ last_results() from one listing of every check
+
+        :param checkids: Checks to keep, None for every PUSH check. The
+        total passed to progress is then the number of PUSH checks in
+        the account's catalog
+        """
+
+        url = "{0}?lastresult=true".format(API_URL)
+        url = _utils.create_url(self.token, url, self.customerid)
+        wanted = None if checkids is None else set(checkids)
+        rows = {}
+
+        if progress is None:
+            total = None
+        elif wanted is None:
+            total = len(self._catalog().ids(type="PUSH"))
+        else:
+            total = len(wanted)
+
+        listing = _query_nodeping_api.iter_object(url, cache=False)
+
+        with scheduler.priority(scheduler.BULK):
+            while True:
+                try:
+                    check_id, check = next(listing)
+                except StopIteration:
+                    break
+                except Exception as err:
+                    # Without the listing there is nothing to list every
+                    # PUSH check from
+                    if checkids is None:
+                        raise
+
+                    return [LastResult(check_id, error=err)
+                            for check_id in checkids]
+
+                if wanted is None:
+                    if not isinstance(check, dict) or \
+                            check.get("type") != "PUSH":
+                        continue
+                elif check_id not in wanted:
+                    continue
+
+                rows[check_id] = LastResult.from_response(check_id, check)
+
+                if progress is not None:
+                    progress(len(rows), total, bulk.ItemResult(check_id, check))
+
+        if checkids is None:
+            return list(rows.values())
+
+        return [rows.get(check_id) or LastResult(check_id, error="Check not found")
+                for check_id in checkids]
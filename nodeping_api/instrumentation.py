@@ -0,0 +1,346 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Hooks around every NodePing API request and Prometheus export
+
+Register a hook with add_hook() and it is called with an event after
+every request made through nodeping_api. Request events carry the
+endpoint with the token removed, method, status, latency, bytes sent
+and received, and the number of retries. Hooks also get a
+circuit_breaker.CircuitEvent (kind "circuit") whenever the circuit of
+an endpoint family opens or closes; check event.kind to tell them
+apart.
+
+MetricsCollector is a hook that aggregates the events into counters
+and latency histograms, and writes them in the Prometheus text format
+so node_exporter's textfile collector can scrape bulk jobs:
+
+    collector = instrumentation.enable_metrics()
+    ...
+    collector.write_textfile('/var/lib/node_exporter/nodeping_api.prom')
+"""
+
+import bisect
+import os
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+from ._cache import canonical
+
+_HOOKS = []
+_HOOKS_LOCK = threading.Lock()
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def add_hook(hook):
+    """ Registers a function that is called with every event
+
+    Hooks run on the thread that made the request, so they should be
+    quick. Exceptions raised by a hook are ignored.
+
+    :param hook: Function that accepts one event
+    """
+
+    with _HOOKS_LOCK:
+        if hook not in _HOOKS:
+            _HOOKS.append(hook)
+
+
+def remove_hook(hook):
+    """ Unregisters a hook added with add_hook()
+    """
+
+    with _HOOKS_LOCK:
+        if hook in _HOOKS:
+            _HOOKS.remove(hook)
+
+
+def emit(event):
+    """ Passes an event to every registered hook
+    """
+
+    for hook in tuple(_HOOKS):
+        try:
+            hook(event)
+        except Exception:
+            pass
+
+
+def endpoint(url):
+    """ Low cardinality name for the endpoint of a URL
+
+    The token and query are dropped and path segments that are IDs
+    are replaced by ':id', e.g. 'checks/:id' or 'results/current'.
+    """
+
+    path = urlsplit(url).path
+    marker = path.find("/api/1/")
+
+    if marker != -1:
+        path = path[marker + 7:]
+
+    segments = [segment if segment.isalpha() and segment.islower() else ":id"
+                for segment in path.strip("/").split("/") if segment]
+
+    return "/".join(segments)
+
+
+class RequestEvent:
+    """ What happened during one API request
+
+    status is None when no response was received, and error holds
+    the exception in that case. cached is True when the response came
+    from the response cache, coalesced when it was shared with another
+    caller's identical request.
+    """
+
+    kind = "request"
+
+    __slots__ = ("method", "url", "endpoint", "status", "latency",
+                 "bytes_out", "bytes_in", "retries", "cached", "coalesced",
+                 "error", "_started")
+
+    def __init__(self, method, url):
+        self.method = method
+        self.url = canonical(url)[2]
+        self.endpoint = endpoint(url)
+        self.status = None
+        self.latency = None
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.retries = 0
+        self.cached = False
+        self.coalesced = False
+        self.error = None
+        self._started = time.monotonic()
+
+    def finish(self, error=None):
+        """ Records the latency and hands the event to the hooks
+        """
+
+        self.latency = time.monotonic() - self._started
+
+        if error is not None:
+            self.error = error
+
+        if _HOOKS:
+            emit(self)
+
+    def __repr__(self):
+        return ("RequestEvent({0} {1} status={2} latency={3:.3f}s "
+                "retries={4})".format(self.method, self.endpoint, self.status,
+                                      self.latency or 0, self.retries))
+
+
+class Histogram:
+    """ Cumulative histogram with fixed bucket bounds
+    """
+
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * len(self.bounds)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.bounds, value)
+
+        if index < len(self.counts):
+            self.counts[index] += 1
+
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """ Yields (upper bound, count of values <= bound), ending in +Inf
+        """
+
+        total = 0
+
+        for bound, count in zip(self.bounds, self.counts):
+            total += count
+            yield bound, total
+
+        yield float("inf"), self.count
+
+
+def _labels(**labels):
+    return ",".join('{0}="{1}"'.format(key, str(value).replace('"', '\\"'))
+                    for key, value in labels.items())
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsCollector:
+    """ Hook that aggregates request events for Prometheus
+
+    Counts requests by method, endpoint and status, and keeps latency
+    histograms and byte and retry counters by method and endpoint, and
+    the circuit breaker state by endpoint family.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS, prefix="nodeping_api"):
+        self.buckets = tuple(buckets)
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = {}
+            self.latency = {}
+            self.bytes_in = {}
+            self.bytes_out = {}
+            self.retries = {}
+            self.circuits = {}
+            self.circuit_changes = {}
+
+    def __call__(self, event):
+        if event.kind == "circuit":
+            with self._lock:
+                self.circuits[event.family] = event.state
+                change_key = (event.family, event.state)
+                self.circuit_changes[change_key] = (
+                    self.circuit_changes.get(change_key, 0) + 1)
+            return
+
+        if event.kind != "request":
+            return
+
+        key = (event.method, event.endpoint)
+        status = "error" if event.status is None else str(event.status)
+        source = "cache" if event.cached else (
+            "coalesced" if event.coalesced else "network")
+
+        with self._lock:
+            request_key = key + (status, source)
+            self.requests[request_key] = self.requests.get(request_key, 0) + 1
+
+            histogram = self.latency.get(key)
+
+            if histogram is None:
+                histogram = self.latency[key] = Histogram(self.buckets)
+
+            histogram.observe(event.latency)
+            self.bytes_in[key] = self.bytes_in.get(key, 0) + event.bytes_in
+            self.bytes_out[key] = self.bytes_out.get(key, 0) + event.bytes_out
+            self.retries[key] = self.retries.get(key, 0) + event.retries
+
+    def render(self):
+        """ Returns the metrics in the Prometheus text exposition format
+        """
+
+        prefix = self.prefix
+        lines = []
+
+        with self._lock:
+            lines.append("# HELP {0}_requests_total NodePing API requests.".format(prefix))
+            lines.append("# TYPE {0}_requests_total counter".format(prefix))
+
+            for (method, name, status, source), count in sorted(self.requests.items()):
+                lines.append("{0}_requests_total{{{1}}} {2}".format(
+                    prefix, _labels(method=method, endpoint=name,
+                                    status=status, source=source), count))
+
+            lines.append("# HELP {0}_request_duration_seconds NodePing API "
+                         "request latency.".format(prefix))
+            lines.append("# TYPE {0}_request_duration_seconds histogram".format(prefix))
+
+            for (method, name), histogram in sorted(self.latency.items()):
+                for bound, count in histogram.cumulative():
+                    lines.append("{0}_request_duration_seconds_bucket{{{1}}} {2}".format(
+                        prefix, _labels(method=method, endpoint=name,
+                                        le=_number(bound)), count))
+
+                labels = _labels(method=method, endpoint=name)
+                lines.append("{0}_request_duration_seconds_sum{{{1}}} {2}".format(
+                    prefix, labels, _number(histogram.sum)))
+                lines.append("{0}_request_duration_seconds_count{{{1}}} {2}".format(
+                    prefix, labels, histogram.count))
+
+            for metric, values, text in (
+                    ("response_bytes_total", self.bytes_in,
+                     "Bytes received from the NodePing API."),
+                    ("request_bytes_total", self.bytes_out,
+                     "Bytes sent to the NodePing API."),
+                    ("retries_total", self.retries,
+                     "Retried NodePing API requests.")):
+                lines.append("# HELP {0}_{1} {2}".format(prefix, metric, text))
+                lines.append("# TYPE {0}_{1} counter".format(prefix, metric))
+
+                for (method, name), value in sorted(values.items()):
+                    lines.append("{0}_{1}{{{2}}} {3}".format(
+                        prefix, metric, _labels(method=method, endpoint=name), value))
+
+            if self.circuits:
+                lines.append("# HELP {0}_circuit_open Whether the circuit of an "
+                             "endpoint family is open (1) or closed (0), 0.5 "
+                             "while half-open.".format(prefix))
+                lines.append("# TYPE {0}_circuit_open gauge".format(prefix))
+
+                for family, state in sorted(self.circuits.items()):
+                    value = {"open": 1, "half-open": 0.5}.get(state, 0)
+                    lines.append("{0}_circuit_open{{{1}}} {2}".format(
+                        prefix, _labels(family=family), value))
+
+                lines.append("# HELP {0}_circuit_changes_total Circuit state "
+                             "changes.".format(prefix))
+                lines.append("# TYPE {0}_circuit_changes_total counter".format(prefix))
+
+                for (family, state), count in sorted(self.circuit_changes.items()):
+                    lines.append("{0}_circuit_changes_total{{{1}}} {2}".format(
+                        prefix, _labels(family=family, state=state), count))
+
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        """ Atomically writes the metrics to a .prom file
+
+        The file is written next to its destination and renamed into
+        place so node_exporter never reads a partial file.
+
+        :type path: string
+        :param path: Destination, e.g. a file in node_exporter's
+        --collector.textfile.directory
+        """
+
+        directory = os.path.dirname(os.path.abspath(path))
+        handle, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+
+        try:
+            with os.fdopen(handle, "w") as temp_file:
+                temp_file.write(self.render())
+
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+
+_METRICS = None
+
+
+def enable_metrics():
+    """ Registers the shared MetricsCollector and returns it
+    """
+
+    global _METRICS
+
+    with _HOOKS_LOCK:
+        if _METRICS is None:
+            _METRICS = MetricsCollector()
+
+    add_hook(_METRICS)
+
+    return _METRICS
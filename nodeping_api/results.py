@@ -59,8 +59,47 @@ def get_results(token,
     :rtype: dict
     """
 
+    url = _results_url(locals())
+
+    return _query_nodeping_api.get(url)
+
+
+def iter_results(token,
+                 check_id,
+                 customerid=None,
+                 span=None,
+                 limit=300,
+                 start=None,
+                 end=None,
+                 clean=True,
+                 predicate=None):
+    """ Streams results for a certain check ID one record at a time
+
+    Takes the same arguments as get_results, but yields each result
+    record as it is read from NodePing instead of loading them all.
+    When a predicate is given, only records for which it returns True
+    are yielded. Requires clean output, which is a list of records.
+
+    :param predicate: Optional filter called with each result record
+    :type predicate: function
+    :return: Generator of result records
+    """
+
     parameters = locals()
-    url = "{0}/{1}?token={2}".format(API_URL, check_id, token)
+    parameters.pop("predicate")
+    url = _results_url(parameters)
+
+    for record in _query_nodeping_api.iter_array(url):
+        if predicate is None or predicate(record):
+            yield record
+
+
+def _results_url(parameters):
+    """ Builds the results URL from the arguments of get_results
+    """
+
+    url = "{0}/{1}?token={2}".format(
+        API_URL, parameters["check_id"], parameters["token"])
 
     for key, value in parameters.items():
         if key in ("token", "check_id"):
@@ -68,7 +107,7 @@ def get_results(token,
         elif value:
             url = "{0}&{1}={2}".format(url, key, value)
 
-    return _query_nodeping_api.get(url)
+    return url
 
 
 def get_uptime(token,
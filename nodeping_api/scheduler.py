@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Priority classes for NodePing API requests
+
+Every request made through nodeping_api takes one of a limited
+number of request slots (config.MAX_CONCURRENT_REQUESTS) for as long
+as it is in flight. When the slots are all taken, waiting requests
+are queued by priority class and served by weighted fair queuing, so
+bulk work keeps using the spare capacity without starving, and a
+request made while a user waits on a prompt goes ahead of queued bulk
+requests. A few slots can be reserved for interactive requests only,
+so they never wait behind a full set of slow bulk requests.
+
+The priority of a request is taken from the context it is made in:
+
+    with scheduler.priority(scheduler.BULK):
+        update_checks.update_many(token, checkids, fields)
+"""
+
+import contextlib
+import contextvars
+import threading
+import time
+from collections import deque
+
+INTERACTIVE = "interactive"
+NORMAL = "normal"
+BULK = "bulk"
+
+PRIORITIES = (INTERACTIVE, NORMAL, BULK)
+
+_CURRENT = contextvars.ContextVar("nodeping_api_priority", default=NORMAL)
+
+
+@contextlib.contextmanager
+def priority(name):
+    """ Makes requests in the block use the given priority class
+
+    Works per thread and per asyncio task, and is carried over to
+    the workers of nodeping_api.aio.
+
+    :type name: string
+    :param name: INTERACTIVE, NORMAL or BULK
+    """
+
+    if name not in PRIORITIES:
+        raise ValueError("Unknown priority {0!r}, expected one of {1}".format(
+            name, ", ".join(PRIORITIES)))
+
+    token = _CURRENT.set(name)
+
+    try:
+        yield
+    finally:
+        _CURRENT.reset(token)
+
+
+def current_priority():
+    """ Returns the priority class of the current context
+    """
+
+    return _CURRENT.get()
+
+
+class RequestScheduler:
+    """ Hands out request slots by weighted fair queuing
+
+    :type max_concurrent: int
+    :param max_concurrent: Requests in flight at once. None or 0 for
+    no limit
+    :type weights: dict
+    :param weights: Share of the slots each priority class gets while
+    several are waiting
+    :type reserved: int
+    :param reserved: Slots only interactive requests may use
+    """
+
+    def __init__(self, max_concurrent, weights, reserved=0):
+        self._cond = threading.Condition()
+        self._queues = {name: deque() for name in PRIORITIES}
+        self._vtime = dict.fromkeys(PRIORITIES, 0.0)
+        self.active = 0
+        self.granted = dict.fromkeys(PRIORITIES, 0)
+        self.queued = dict.fromkeys(PRIORITIES, 0)
+        self.configure(max_concurrent, weights, reserved)
+
+    def configure(self, max_concurrent=None, weights=None, reserved=None):
+        """ Changes the limits; waiting requests are re-dispatched
+        """
+
+        with self._cond:
+            if max_concurrent is not None:
+                self.max_concurrent = max_concurrent
+            if weights is not None:
+                self.weights = {name: float(weights.get(name, 1))
+                                for name in PRIORITIES}
+            if reserved is not None:
+                self.reserved = reserved
+
+            self._dispatch()
+
+    def _has_room(self, name):
+        if not self.max_concurrent:
+            return True
+
+        limit = self.max_concurrent
+
+        if name != INTERACTIVE:
+            limit = max(1, limit - self.reserved)
+
+        return self.active < limit
+
+    def _grant(self, name):
+        self.active += 1
+        self.granted[name] += 1
+        self._vtime[name] += 1.0 / self.weights[name]
+
+    def _dispatch(self):
+        """ Grants slots to queued requests while there is room
+        """
+
+        granted = False
+
+        while True:
+            ready = [name for name in PRIORITIES
+                     if self._queues[name] and self._has_room(name)]
+
+            if not ready:
+                break
+
+            # Lowest virtual time first; ties go to the higher priority
+            name = min(ready, key=lambda key: (self._vtime[key],
+                                               PRIORITIES.index(key)))
+            self._queues[name].popleft()[0] = True
+            self._grant(name)
+            granted = True
+
+        if granted:
+            self._cond.notify_all()
+
+    def acquire(self, name=None, timeout=None):
+        """ Blocks until a slot is free for the priority class
+
+        :type name: string
+        :param name: Priority class, defaults to the current context's
+        :type timeout: float
+        :param timeout: Most seconds to wait, None to wait as needed
+        :return: False if no slot was free in time
+        :rtype: bool
+        """
+
+        name = name or current_priority()
+        end = None if timeout is None else time.monotonic() + timeout
+
+        with self._cond:
+            waiting = any(self._queues.values())
+
+            if not waiting and self._has_room(name):
+                self._grant(name)
+                return True
+
+            # A class that was idle starts from the current virtual time
+            # instead of spending credit it built up while idle
+            backlogged = [self._vtime[key] for key in PRIORITIES
+                          if self._queues[key]]
+
+            if not self._queues[name] and backlogged:
+                self._vtime[name] = max(self._vtime[name], min(backlogged))
+
+            waiter = [False]
+            self._queues[name].append(waiter)
+            self.queued[name] += 1
+            self._dispatch()
+
+            while not waiter[0]:
+                if end is None:
+                    self._cond.wait()
+                    continue
+
+                left = end - time.monotonic()
+
+                if left <= 0:
+                    # Waiters are compared by identity, another one
+                    # waiting in the same class is equal to this one
+                    queue = self._queues[name]
+
+                    for index, queued in enumerate(queue):
+                        if queued is waiter:
+                            del queue[index]
+                            return False
+
+                    return True
+
+                self._cond.wait(left)
+
+            return True
+
+    def release(self):
+        """ Frees a slot taken with acquire()
+        """
+
+        with self._cond:
+            self.active -= 1
+            self._dispatch()
+
+    def stats(self):
+        with self._cond:
+            return {"active": self.active,
+                    "waiting": {name: len(queue)
+                                for name, queue in self._queues.items()},
+                    "granted": dict(self.granted),
+                    "queued": dict(self.queued)}
@@ -0,0 +1,294 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Search checks by label, ID and checktoken
+
+A SearchIndex answers lookups on large accounts without going over
+every check. It matches three ways, case insensitively:
+
+    exact   the whole label, ID or checktoken
+    prefix  the start of the label, of a word in the label, of the
+            ID or of the checktoken
+    fuzzy   labels holding most of the trigrams (three character
+            pieces) of the text, for typos and partial names
+
+search() combines them, exact matches first:
+
+    index = search.SearchIndex(checks.values())
+    for check_id in index.search("web01"):
+        print(checks[check_id].label)
+
+The catalog keeps an index of its checks up to date, see
+catalog.CheckCatalog.search.
+"""
+
+import bisect
+import collections
+import re
+
+_WORDS = re.compile(r"[\w]+")
+
+
+def _normalize(text):
+    return (text or "").strip().casefold()
+
+
+def _grams(text):
+    """ The distinct trigrams of a normalized text, padded so short
+    texts and word starts count
+    """
+
+    padded = "  {0} ".format(text)
+
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """ Exact, prefix and trigram index over check labels, IDs and
+    checktokens
+
+    The trigram index is built on the first fuzzy lookup.
+
+    :type checks: iterable
+    :param checks: check.Check objects to index
+    """
+
+    def __init__(self, checks=()):
+        # Normalized label, ID or checktoken to the IDs of its checks
+        self._exact = {}
+        # Sorted (term, check ID) of labels, label words, IDs and
+        # checktokens
+        self._terms = []
+        # Check ID to its normalized label, exact keys and terms
+        self._indexed = {}
+        # Trigram to the IDs of the labels with it, and the trigrams
+        # of each label
+        self._postings = None
+        self._grams = None
+
+        for check in checks:
+            self._add(check, self._terms.append)
+
+        self._terms.sort()
+
+    def __len__(self):
+        return len(self._indexed)
+
+    def __contains__(self, check_id):
+        return check_id in self._indexed
+
+    def _add(self, check, add_term):
+        check_id = check.id
+        label = _normalize(check.label)
+        exact = tuple(key for key in (label, _normalize(check_id),
+                                      _normalize(check.checktoken)) if key)
+        terms = set(exact)
+
+        if label:
+            terms.update(_WORDS.findall(label))
+
+        for key in exact:
+            ids = self._exact.get(key)
+
+            if ids is None:
+                self._exact[key] = [check_id]
+            elif check_id not in ids:
+                ids.append(check_id)
+
+        for term in terms:
+            add_term((term, check_id))
+
+        self._indexed[check_id] = (label, exact, tuple(terms))
+
+        if self._postings is not None and label:
+            self._add_grams(check_id, label)
+
+    def _add_grams(self, check_id, label):
+        grams = self._grams[check_id] = _grams(label)
+        postings = self._postings
+
+        for gram in grams:
+            ids = postings.get(gram)
+
+            if ids is None:
+                postings[gram] = {check_id}
+            else:
+                ids.add(check_id)
+
+    def add(self, check):
+        """ Indexes a check, replacing what was indexed for its ID
+        """
+
+        self.discard(check.id)
+        self._add(check, lambda term: bisect.insort(self._terms, term))
+
+    def discard(self, check_id):
+        """ Removes a check from the index if it is in it
+        """
+
+        indexed = self._indexed.pop(check_id, None)
+
+        if indexed is None:
+            return
+
+        _label, exact, terms = indexed
+
+        for key in exact:
+            ids = self._exact[key]
+
+            if check_id in ids:
+                ids.remove(check_id)
+
+            if not ids:
+                del self._exact[key]
+
+        for term in terms:
+            index = bisect.bisect_left(self._terms, (term, check_id))
+
+            if self._terms[index:index + 1] == [(term, check_id)]:
+                del self._terms[index]
+
+        if self._postings is not None:
+            for gram in self._grams.pop(check_id, ()):
+                ids = self._postings[gram]
+                ids.discard(check_id)
+
+                if not ids:
+                    del self._postings[gram]
+
+    def exact(self, text):
+        """ IDs of the checks whose label, ID or checktoken is the text
+
+        :rtype: list
+        """
+
+        return list(self._exact.get(_normalize(text), ()))
+
+    def prefix(self, text, limit=None):
+        """ IDs of the checks with a label, label word, ID or checktoken
+        starting with the text
+
+        :type limit: int
+        :param limit: Most IDs to return
+        :return: Check IDs, ordered by the matching term
+        :rtype: list
+        """
+
+        text = _normalize(text)
+        found = {}
+
+        if not text:
+            return []
+
+        index = bisect.bisect_left(self._terms, (text,))
+
+        while index < len(self._terms) and (limit is None or len(found) < limit):
+            term, check_id = self._terms[index]
+
+            if not term.startswith(text):
+                break
+
+            found.setdefault(check_id, None)
+            index += 1
+
+        return list(found)
+
+    def fuzzy(self, text, limit=10, threshold=0.4):
+        """ IDs of the checks whose labels are most like the text
+
+        Labels are scored by the share of the text's trigrams they
+        hold, shorter labels first on a tie. Only labels sharing one of
+        the text's rarer trigrams are scored; a trigram found in more
+        than a fiftieth of the labels, such as one of a domain every
+        label ends with, does not find labels by itself. Labels holding
+        the most rare trigrams are scored first, and the rest are
+        skipped once they could no longer make the limit.
+
+        :type limit: int
+        :param limit: Most IDs to return
+        :type threshold: float
+        :param threshold: Lowest score, from 0 to 1, that matches
+        :return: (check ID, score) pairs, best first
+        :rtype: list
+        """
+
+        if self._postings is None:
+            self._postings = {}
+            self._grams = {}
+
+            for check_id, (label, _exact, _terms) in self._indexed.items():
+                if label:
+                    self._add_grams(check_id, label)
+
+        wanted = _grams(_normalize(text))
+        common = max(50, len(self._grams) // 50)
+        # Rare trigrams each candidate holds, and how many common ones
+        # the text has, which bound the score a candidate can reach
+        hits = collections.Counter()
+        skipped = 0
+
+        for gram in wanted:
+            ids = self._postings.get(gram, ())
+
+            if len(ids) <= common:
+                hits.update(ids)
+            else:
+                skipped += 1
+
+        groups = {}
+
+        for check_id, count in hits.items():
+            groups.setdefault(count, []).append(check_id)
+
+        scored = []
+
+        # Candidates with the most rare trigrams first, stopping once
+        # the rest could not beat the matches found
+        for count in sorted(groups, reverse=True):
+            best = (count + skipped) / len(wanted)
+
+            if best < threshold:
+                break
+
+            if limit is not None and len(scored) >= limit:
+                scored.sort()
+
+                if best < -scored[limit - 1][0]:
+                    break
+
+            for check_id in groups[count]:
+                grams = self._grams[check_id]
+                score = len(wanted & grams) / len(wanted)
+
+                if score >= threshold:
+                    scored.append((-score, len(grams), check_id))
+
+        scored.sort()
+
+        return [(check_id, -score) for score, _size, check_id in scored[:limit]]
+
+    def search(self, text, limit=20, threshold=0.4, fuzzy=True):
+        """ IDs of the checks matching the text, best matches first
+
+        Exact matches come first, then prefix matches, then fuzzy label
+        matches.
+
+        :type limit: int
+        :param limit: Most IDs to return, None for every match
+        :type threshold: float
+        :param threshold: Lowest fuzzy score that matches, see fuzzy()
+        :type fuzzy: bool
+        :param fuzzy: Whether to add fuzzy matches
+        :rtype: list
+        """
+
+        found = dict.fromkeys(self.exact(text))
+
+        if limit is None or len(found) < limit:
+            found.update(dict.fromkeys(self.prefix(text, limit)))
+
+        if fuzzy and (limit is None or len(found) < limit):
+            found.update((check_id, None) for check_id, _score
+                         in self.fuzzy(text, limit, threshold))
+
+        return list(found)[:limit]
@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" On-disk store of check snapshots, backed by SQLite
+
+The checks of every account and subaccount synced on this machine are
+kept in one SQLite database (config.STORE_PATH by default). The type,
+state, label, checktoken, enable and interval of each check are
+indexed columns, the rest of the check is kept as JSON. Accounts are
+stored by a fingerprint of their token, never the token itself.
+Stored checks are loaded as check.Check objects from the columns,
+without decoding the JSON.
+
+A catalog backed by a store opens from the stored checks at once and
+syncs them with NodePing in the background:
+
+    checks = catalog.shared(token, store=store.CheckStore())
+    push_checks = checks.where(type="PUSH")
+"""
+
+import contextlib
+import operator
+import os
+import sqlite3
+import threading
+from . import _cache, config, sync
+from .check import Check
+
+# Columns that can be queried; each is the Check attribute of that name
+COLUMNS = ("type", "state", "label", "checktoken", "enable", "interval")
+
+_read_columns = operator.attrgetter(*COLUMNS)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checks (
+    account TEXT NOT NULL,
+    customerid TEXT NOT NULL,
+    check_id TEXT NOT NULL,
+    type TEXT,
+    state INTEGER,
+    label TEXT,
+    checktoken TEXT,
+    enable TEXT,
+    interval INTEGER,
+    modified INTEGER,
+    data TEXT NOT NULL,
+    PRIMARY KEY (account, customerid, check_id)
+);
+CREATE INDEX IF NOT EXISTS checks_type ON checks (account, customerid, type);
+CREATE INDEX IF NOT EXISTS checks_state ON checks (account, customerid, state);
+CREATE INDEX IF NOT EXISTS checks_label ON checks (account, customerid, label);
+CREATE INDEX IF NOT EXISTS checks_checktoken
+    ON checks (account, customerid, checktoken);
+CREATE INDEX IF NOT EXISTS checks_enable ON checks (account, customerid, enable);
+CREATE TABLE IF NOT EXISTS syncs (
+    account TEXT NOT NULL,
+    customerid TEXT NOT NULL,
+    synced_at REAL,
+    PRIMARY KEY (account, customerid)
+);
+"""
+
+_UPSERT = """
+INSERT INTO checks (account, customerid, check_id, type, state, label,
+                    checktoken, enable, interval, modified, data)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (account, customerid, check_id) DO UPDATE SET
+    type = excluded.type, state = excluded.state, label = excluded.label,
+    checktoken = excluded.checktoken, enable = excluded.enable,
+    interval = excluded.interval, modified = excluded.modified,
+    data = excluded.data
+"""
+
+_SELECT = """
+SELECT check_id, data, type, label, state, enable, interval, checktoken,
+       modified
+FROM checks WHERE {0} ORDER BY rowid
+"""
+
+
+def _scalar(value):
+    """ Column value for a check field; other JSON types are not indexed
+    """
+
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+
+    return None
+
+
+class CheckStore:
+    """ SQLite database of check snapshots per account and subaccount
+
+    Safe to use from several threads; each call opens its own
+    connection.
+
+    :type path: string
+    :param path: Database file, defaults to config.STORE_PATH. Missing
+    directories are created readable by the owner only, and so is the
+    file, as it holds check tokens and passwords
+    """
+
+    def __init__(self, path=None):
+        self.path = os.path.expanduser(path or config.STORE_PATH)
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        # Before SQLite creates it with the umask's mode
+        os.close(os.open(self.path, os.O_WRONLY | os.O_CREAT, 0o600))
+        os.chmod(self.path, 0o600)
+        self._lock = threading.Lock()
+
+        with self._connect() as db:
+            db.executescript(_SCHEMA)
+            columns = [row[1] for row in db.execute("PRAGMA table_info(checks)")]
+
+            # Databases written before modified was stored
+            if "modified" not in columns:
+                db.execute("ALTER TABLE checks ADD COLUMN modified INTEGER")
+
+    def __repr__(self):
+        return "CheckStore({0!r})".format(self.path)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """ Connection that commits at the end of the block and closes
+        """
+
+        db = sqlite3.connect(self.path, timeout=30)
+
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    @staticmethod
+    def _key(token, customerid):
+        return _cache.fingerprint(token), customerid or ""
+
+    @staticmethod
+    def _row(key, check):
+        return key + (check.id,) + tuple(
+            _scalar(value) for value in _read_columns(check)) + (
+                _scalar(check.modified), check.raw.decode("utf-8"))
+
+    @staticmethod
+    def _checks(rows):
+        return ((row[0], Check(row[0], row[1].encode("utf-8"), *row[2:]))
+                for row in rows)
+
+    def load(self, token, customerid=None):
+        """ Returns the stored snapshot of an account
+
+        :rtype: sync.Snapshot
+        :return: The checks as of the last save, or an empty snapshot
+        with synced_at None if the account was never stored
+        """
+
+        key = self._key(token, customerid)
+
+        with self._connect() as db:
+            synced = db.execute(
+                "SELECT synced_at FROM syncs WHERE account = ? AND customerid = ?",
+                key).fetchone()
+            rows = db.execute(_SELECT.format(
+                "account = ? AND customerid = ?"), key).fetchall()
+
+        if synced is None:
+            return sync.Snapshot()
+
+        return sync.Snapshot(self._checks(rows), synced[0])
+
+    def save(self, token, customerid, snapshot, result=None):
+        """ Stores a snapshot of an account
+
+        :type snapshot: sync.Snapshot
+        :param snapshot: Checks to store
+        :type result: sync.SyncResult
+        :param result: What the last sync of the snapshot changed. When
+        given only those checks are written, otherwise the stored
+        checks of the account are replaced
+        """
+
+        key = self._key(token, customerid)
+        checks = snapshot.checks
+
+        if result is None:
+            written = list(checks)
+        else:
+            written = result.added + result.changed
+
+        rows = [self._row(key, checks[check_id]) for check_id in written]
+
+        with self._lock, self._connect() as db:
+            if result is None:
+                db.execute("DELETE FROM checks WHERE account = ? "
+                           "AND customerid = ?", key)
+            else:
+                db.executemany(
+                    "DELETE FROM checks WHERE account = ? AND customerid = ? "
+                    "AND check_id = ?",
+                    [key + (check_id,) for check_id in result.removed])
+
+            db.executemany(_UPSERT, rows)
+            db.execute("INSERT OR REPLACE INTO syncs (account, customerid, "
+                       "synced_at) VALUES (?, ?, ?)",
+                       key + (snapshot.synced_at,))
+
+    def query(self, token, customerid=None, **criteria):
+        """ Returns stored checks matching every criterion
+
+        :param criteria: Column names and the value, or list or tuple
+        of values, to match
+        :return: Check ID to Check
+        :rtype: dict
+        """
+
+        clauses = ["account = ?", "customerid = ?"]
+        values = list(self._key(token, customerid))
+
+        for column, wanted in criteria.items():
+            if column not in COLUMNS:
+                raise ValueError("{0!r} is not indexed, expected one of {1}".format(
+                    column, ", ".join(COLUMNS)))
+
+            if not isinstance(wanted, (list, tuple, set, frozenset)):
+                wanted = (wanted,)
+
+            wanted = list(wanted)
+            clauses.append("{0} IN ({1})".format(
+                column, ", ".join("?" * len(wanted))))
+            values.extend(wanted)
+
+        with self._connect() as db:
+            rows = db.execute(_SELECT.format(" AND ".join(clauses)),
+                              values).fetchall()
+
+        return dict(self._checks(rows))
+
+    def forget(self, token, customerid=None):
+        """ Removes the stored checks of an account
+        """
+
+        key = self._key(token, customerid)
+
+        with self._lock, self._connect() as db:
+            db.execute("DELETE FROM checks WHERE account = ? AND customerid = ?",
+                       key)
+            db.execute("DELETE FROM syncs WHERE account = ? AND customerid = ?",
+                       key)
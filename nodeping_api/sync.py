@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Keep a local snapshot of the checks on an account in sync
+
+A Snapshot holds the checks of an account as they were at the last
+sync. sync() streams the checks from NodePing and compares each with
+the snapshot by its modified timestamp, so only checks that were
+added or changed are stored again and checks that are gone are
+found and removed:
+
+    snapshot = sync.Snapshot.load('checks.json.gz')
+    result = sync.sync(token, snapshot)
+    print(result.report())
+    snapshot.save('checks.json.gz')
+
+The NodePing API cannot list only the checks changed since a time, so
+the check list is still read in full; it is parsed one check at a
+time and nothing is kept or re-indexed for checks that did not change.
+The snapshot keeps its checks as compact check.Check objects.
+"""
+
+import gzip
+import json
+import os
+import time
+from . import _codec, _query_nodeping_api, _utils, config
+from .check import Check
+
+API_URL = "{0}checks".format(config.API_URL)
+
+
+class SyncResult:
+    """ Check IDs added, changed and removed by a sync
+    """
+
+    def __init__(self):
+        self.added = []
+        self.changed = []
+        self.removed = []
+        self.unchanged = 0
+
+    @property
+    def changes(self):
+        return len(self.added) + len(self.changed) + len(self.removed)
+
+    def counts(self):
+        return {"added": len(self.added), "changed": len(self.changed),
+                "removed": len(self.removed), "unchanged": self.unchanged}
+
+    def report(self):
+        return "{added} added, {changed} changed, {removed} removed, " \
+               "{unchanged} unchanged".format(**self.counts())
+
+    def __repr__(self):
+        return "SyncResult({0})".format(self.report())
+
+
+def _changed(old, new):
+    """ Whether a check differs from the copy in the snapshot
+
+    modified only changes when the check is edited, so the state and
+    enable flag, which change without an edit, are compared as well.
+
+    :type old: Check
+    :type new: dict
+    """
+
+    if old.state != new.get("state") or old.enable != new.get("enable"):
+        return True
+
+    modified = new.get("modified")
+
+    if modified is not None and old.modified is not None:
+        return modified != old.modified
+
+    return old.data != new
+
+
+class Snapshot:
+    """ Checks of an account as of the last sync
+
+    :type checks: dict
+    :param checks: Check ID to Check
+    :type synced_at: float
+    :param synced_at: Unix time of the last sync
+    """
+
+    def __init__(self, checks=None, synced_at=None):
+        self.checks = dict(checks or {})
+        self.synced_at = synced_at
+
+    def __len__(self):
+        return len(self.checks)
+
+    def apply(self, checks):
+        """ Brings the snapshot up to date with the current checks
+
+        :type checks: iterable
+        :param checks: Every current (check_id, check) pair, such as
+        from _query_nodeping_api.iter_object()
+        :rtype: SyncResult
+        """
+
+        result = SyncResult()
+        current = {}
+
+        for check_id, check in checks:
+            old = self.checks.get(check_id)
+
+            if old is None:
+                result.added.append(check_id)
+            elif _changed(old, check):
+                result.changed.append(check_id)
+            else:
+                # Keep the stored copy, the new one is the same
+                current[check_id] = old
+                result.unchanged += 1
+                continue
+
+            current[check_id] = Check.from_dict(check_id, check)
+
+        result.removed = [check_id for check_id in self.checks
+                          if check_id not in current]
+
+        self.checks = current
+        self.synced_at = time.time()
+
+        return result
+
+    def save(self, path):
+        """ Writes the snapshot as gzip compressed JSON
+
+        The file is written next to its destination and renamed into
+        place, so an interrupted save keeps the previous snapshot.
+        """
+
+        temp_path = "{0}.tmp".format(path)
+
+        with gzip.open(temp_path, "wb") as handle:
+            # The checks are already encoded, so they are written as is
+            handle.write(b'{"synced_at":' + _codec.dumps(self.synced_at)
+                         + b',"checks":{')
+
+            for index, (check_id, check) in enumerate(self.checks.items()):
+                if index:
+                    handle.write(b",")
+
+                handle.write(_codec.dumps(check_id) + b":" + check.raw)
+
+            handle.write(b"}}")
+
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """ Reads a snapshot saved with save(), or an empty one
+        """
+
+        if not os.path.exists(path):
+            return cls()
+
+        with gzip.open(path, "rt", encoding="utf-8") as handle:
+            data = json.load(handle)
+
+        checks = data.get("checks") or {}
+
+        return cls(((check_id, Check.from_dict(check_id, check))
+                    for check_id, check in checks.items()),
+                   data.get("synced_at"))
+
+
+def fetch(token, customerid=None):
+    """ Reads every check on the account
+
+    :return: (check_id, check) pairs in the order NodePing sent them
+    :rtype: list
+    :raises _query_nodeping_api.APIError: if NodePing answers with an
+    error
+    """
+
+    url = _utils.create_url(token, API_URL, customerid)
+
+    return list(_query_nodeping_api.iter_object(url, cache=False))
+
+
+def sync(token, snapshot, customerid=None):
+    """ Updates a snapshot with the checks on the account
+
+    :type token: string
+    :param token: NodePing API token
+    :type snapshot: Snapshot
+    :param snapshot: Snapshot to update in place
+    :type customerid: string
+    :param customerid: Optional subaccount ID
+    :return: What was added, changed and removed
+    :rtype: SyncResult
+    :raises _query_nodeping_api.APIError: if NodePing answers with an
+    error, in which case the snapshot is left as it was
+    """
+
+    # Read in full first, so a failure part way leaves the snapshot
+    # as it was
+    return snapshot.apply(fetch(token, customerid))
@@ -5,7 +5,8 @@
 Update one or many checks on a NodePing account or subaccount
 """
 
-from . import _query_nodeping_api, _utils, config
+from . import (_query_nodeping_api, _utils, bulk, circuit_breaker, config,
+               deadline, scheduler)
 
 API_URL = "{0}checks".format(config.API_URL)
 
@@ -39,12 +40,12 @@ def update(token, checkid, checktype, fields, customerid=None):
     return _query_nodeping_api.put(url, fields)
 
 
-def update_many(token, checkids, fields, customerid=None):
+def update_many(token, checkids, fields, customerid=None, progress=None):
     """ Updates a field(s) in multiple existing NodePing checks
 
     Accepts a token, a list of checkids, and fields to be updated in a
-    NodePing check. Updates the specified fields for the one check.
-    To update many checks with the same value, use update_many
+    NodePing check. The checks are updated concurrently as bulk
+    priority requests, see bulk.map_requests
 
     :type token: string
     :param token: Your NodePing API token
@@ -54,11 +55,19 @@ def update_many(token, checkids, fields, customerid=None):
     :param fields: Fields in check that will be updated
     :type customerid: string
     :param customerid: subaccount ID
-    :rtype: dict
-    :return: Return information from NodePing query
+    :type progress: function
+    :param progress: Called as progress(done, total, item) after each
+    check, see bulk.map_requests
+    :rtype: deadline.PartialResult
+    :return: Return information from NodePing query for each check
+    updated, in order. Checks NodePing refused to update, or whose
+    request failed, are listed with the error in its failed attribute.
+    If an operation deadline runs out or the circuit for checks opens,
+    the checks that were not updated are listed in its unfinished
+    attribute
     """
 
-    updated_checks = []
+    specs = []
 
     for checkid, checktype in checkids.items():
         url = "{0}/{1}".format(API_URL, checkid)
@@ -67,6 +76,26 @@ def update_many(token, checkids, fields, customerid=None):
         send_fields = fields.copy()
         send_fields.update({"type": checktype.upper()})
 
-        updated_checks.append(_query_nodeping_api.put(url, send_fields))
+        specs.append(bulk.RequestSpec("PUT", url, send_fields, key=checkid))
+
+    with scheduler.priority(scheduler.BULK):
+        outcomes = bulk.map_requests(specs, progress=progress)
+
+    updated_checks = deadline.PartialResult()
+    unfinished = []
+    error = None
+
+    for item in outcomes:
+        if isinstance(item.error, (deadline.DeadlineExceeded,
+                                   circuit_breaker.CircuitOpenError)):
+            unfinished.append(item.key)
+            error = item.error
+        elif item.error is not None:
+            updated_checks.failed[item.key] = item.error
+        else:
+            updated_checks.append(item.response)
+
+    if unfinished:
+        updated_checks.stop(unfinished, error)
 
     return updated_checks
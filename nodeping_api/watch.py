@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Watch an account for checks that fail, recover, are disabled or
+are deleted
+
+A Watcher polls results/current, the small list of current events
+(checks that are down or disabled), and now and then syncs the check
+catalog, and reports only what changed since the last poll:
+
+    watcher = watch.Watcher(token, types=("PUSH",))
+    for event in watcher.events():
+        print(event.to_json())
+
+Each check is reduced to a small state code (active, failing) when it
+is first seen. A poll compares the current events with the previous
+ones as a whole first, and only when they differ, or the catalog sync
+reports checks added, changed or removed (see nodeping_api.sync), are
+the codes of those checks worked out again and compared. A quiet poll
+of a large account costs one small request and one comparison.
+
+The poll interval starts at config.WATCH_MIN_INTERVAL, doubles while
+nothing changes up to config.WATCH_MAX_INTERVAL, and drops back after
+a change. The catalog is synced every config.WATCH_CATALOG_INTERVAL
+seconds.
+
+The first poll records the state of every check and reports nothing.
+"""
+
+import time
+from . import _codec, _query_nodeping_api, _utils, catalog, config
+
+API_URL = "{0}results/current".format(config.API_URL)
+
+# Kinds of events
+FAILURE = "failure"
+RECOVERY = "recovery"
+DISABLED = "disabled"
+DELETED = "deleted"
+
+# Bits of a check's state code
+ACTIVE = 1
+FAILING = 2
+
+
+class WatchEvent:
+    """ A change in the state of a check
+    """
+
+    __slots__ = ("kind", "check_id", "label", "check_type", "customerid",
+                 "timestamp")
+
+    def __init__(self, kind, check, customerid=None, timestamp=None):
+        self.kind = kind
+        self.check_id = check.id
+        self.label = check.label
+        self.check_type = check.type
+        self.customerid = customerid
+        # Milliseconds, as NodePing timestamps are
+        self.timestamp = timestamp or int(time.time() * 1000)
+
+    def __repr__(self):
+        return "WatchEvent({0!r}, {1!r})".format(self.kind, self.check_id)
+
+    def as_dict(self):
+        return {"event": self.kind, "check": self.check_id,
+                "label": self.label, "type": self.check_type,
+                "customerid": self.customerid, "timestamp": self.timestamp}
+
+    def to_json(self):
+        """ The event as one line of JSON
+        """
+
+        return _codec.dumps(self.as_dict()).decode("utf-8")
+
+
+def _code(check, event_type):
+    """ State code of a check from the catalog and its current event
+    """
+
+    code = 0
+
+    if check.active and event_type != "disabled":
+        code |= ACTIVE
+
+    if event_type is not None and event_type != "disabled":
+        code |= FAILING
+
+    return code
+
+
+def _kind(old, new):
+    """ The event for a check whose code changed from old to new
+    """
+
+    if old & ACTIVE and not new & ACTIVE:
+        return DISABLED
+
+    if new & ACTIVE and new & FAILING and not old & FAILING:
+        return FAILURE
+
+    if old & FAILING and not new & FAILING:
+        return RECOVERY
+
+    return None
+
+
+class Watcher:
+    """ Reports changes in the state of the checks of an account
+
+    :type token: string
+    :param token: NodePing API token
+    :type customerid: string
+    :param customerid: Optional subaccount ID
+    :type types: tuple
+    :param types: Check types to watch, such as ("PUSH",). None watches
+    every check
+    :type min_interval: float
+    :param min_interval: Seconds between polls after a change
+    :type max_interval: float
+    :param max_interval: Most seconds between polls
+    :type catalog_interval: float
+    :param catalog_interval: Seconds between syncs of the check catalog
+    """
+
+    def __init__(self, token, customerid=None, types=None, min_interval=None,
+                 max_interval=None, catalog_interval=None):
+        self.token = token
+        self.customerid = customerid
+        self.types = None if types is None else frozenset(types)
+        self.min_interval = (config.WATCH_MIN_INTERVAL if min_interval is None
+                             else min_interval)
+        self.max_interval = max(self.min_interval, (
+            config.WATCH_MAX_INTERVAL if max_interval is None else max_interval))
+        self.catalog_interval = (config.WATCH_CATALOG_INTERVAL
+                                 if catalog_interval is None
+                                 else catalog_interval)
+        self.interval = self.min_interval
+        self.polls = 0
+        self.last_error = None
+        self.catalog = catalog.CheckCatalog(token, customerid, ttl=0)
+        self._synced_at = None
+        # Check ID to the type of its current event
+        self._events = None
+        # Check ID to (state code, Check) of every watched check
+        self._states = {}
+
+    def __repr__(self):
+        return "Watcher(customerid={0!r}, checks={1})".format(
+            self.customerid, len(self._states))
+
+    def _current(self):
+        url = _utils.create_url(self.token, API_URL, self.customerid)
+
+        return {check_id: event.get("type") if isinstance(event, dict) else None
+                for check_id, event
+                in _query_nodeping_api.iter_object(url, cache=False)}
+
+    def _watched(self, check):
+        return self.types is None or check.type in self.types
+
+    def _sync(self, now):
+        """ Syncs the catalog when due, returning the check IDs the sync
+        found added, changed or removed
+        """
+
+        if self._synced_at is not None and \
+                now - self._synced_at < self.catalog_interval:
+            return ()
+
+        self.catalog.refresh()
+        self._synced_at = now
+        result = self.catalog.last_sync
+
+        return result.added + result.changed + result.removed
+
+    def poll(self):
+        """ Polls NodePing once and returns the changes since the last
+        poll
+
+        :return: WatchEvent for each check that failed, recovered, was
+        disabled or was deleted
+        :rtype: list
+        :raises _query_nodeping_api.APIError: if NodePing answers with an
+        error
+        """
+
+        dirty = set(self._sync(time.monotonic()))
+        events = self._current()
+        previous = self._events
+        self._events = events
+        self.polls += 1
+
+        if previous is None:
+            self._states = {check_id: (_code(check, events.get(check_id)), check)
+                            for check_id, check in self.catalog.all().items()
+                            if self._watched(check)}
+
+            return []
+
+        if events != previous:
+            dirty.update(check_id for check_id, _type
+                         in events.items() ^ previous.items())
+
+        changes = []
+        timestamp = int(time.time() * 1000)
+
+        for check_id in dirty:
+            check = self.catalog.get(check_id)
+            old_code, old_check = self._states.get(check_id, (None, None))
+
+            if check is None or not self._watched(check):
+                self._states.pop(check_id, None)
+
+                if check is None and old_check is not None:
+                    changes.append(WatchEvent(DELETED, old_check,
+                                              self.customerid, timestamp))
+                continue
+
+            code = _code(check, events.get(check_id))
+            self._states[check_id] = (code, check)
+
+            if old_code is None:
+                # New checks only report a failure
+                kind = FAILURE if code == ACTIVE | FAILING else None
+            else:
+                kind = _kind(old_code, code)
+
+            if kind is not None:
+                changes.append(WatchEvent(kind, check, self.customerid,
+                                          timestamp))
+
+        return changes
+
+    def events(self, stop=None, on_error=None):
+        """ Polls until stopped and yields every change
+
+        The interval between polls doubles while nothing changes and
+        drops back to min_interval after a change. Errors after the
+        first poll are kept in last_error and retried at max_interval.
+
+        :type stop: threading.Event
+        :param stop: Ends the watch when set
+        :type on_error: function
+        :param on_error: Called with each error after the first poll
+        :return: Generator of WatchEvent
+        """
+
+        while stop is None or not stop.is_set():
+            try:
+                changes = self.poll()
+            except Exception as err:
+                if self.polls == 0:
+                    raise
+
+                self.last_error = err
+                self.interval = self.max_interval
+                changes = None
+
+                if on_error is not None:
+                    on_error(err)
+            else:
+                self.last_error = None
+
+                if changes:
+                    self.interval = self.min_interval
+                else:
+                    self.interval = min(self.interval * 2, self.max_interval)
+
+            yield from changes or ()
+
+            if stop is None:
+                time.sleep(self.interval)
+            else:
+                stop.wait(self.interval)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import json
+import unittest
+from nodeping_api import _query_nodeping_api, bulk, config, update_checks
+from nodeping_api.aio import update_checks as aio_update_checks
+
+URL = "https://api.nodeping.com/api/1/checks/{0}?token=abc"
+
+
+class Response:
+
+    def __init__(self, status, body):
+        self.status = status
+        self.body = json.dumps(body).encode()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def getheader(self, name, default=None):
+        return default
+
+    def read(self, size=-1):
+        body, self.body = self.body, b""
+
+        return body
+
+    def close(self):
+        pass
+
+
+class Transport:
+    """ Answers like NodePing: 404 for a missing check, and an error in
+    the body with a 200 for a refused one; the connection resets for a
+    bad one
+    """
+
+    def request(self, method, url, body, headers, timeout):
+        if "/bad" in url:
+            raise ConnectionResetError("reset by peer")
+        if "/missing" in url:
+            return Response(404, {"error": "Check not found"})
+        if "/refused" in url:
+            return Response(200, {"error": "Not allowed"})
+
+        return Response(200, {"ok": True})
+
+
+class ErrorResponseTest(unittest.TestCase):
+
+    def setUp(self):
+        self.previous = _query_nodeping_api.set_transport(Transport())
+        self.session = _query_nodeping_api.Session(rate_limit=0, cache_size=0)
+
+    def tearDown(self):
+        _query_nodeping_api.set_transport(self.previous)
+
+    def test_error_responses_fail_the_item(self):
+        specs = [bulk.RequestSpec("DELETE", URL.format(check_id), key=check_id)
+                 for check_id in ("present", "missing", "refused")]
+
+        with _query_nodeping_api.activate(self.session):
+            outcomes = bulk.map_requests(specs)
+
+        self.assertEqual([item.ok for item in outcomes], [True, False, False])
+        self.assertEqual([item.status for item in outcomes], [200, 404, 200])
+        self.assertIsInstance(outcomes[1].error, _query_nodeping_api.APIError)
+        self.assertEqual(outcomes[1].response, {"error": "Check not found"})
+
+
+class UpdateManyTest(unittest.TestCase):
+
+    checkids = {"a": "ping", "bad": "ping", "c": "ping"}
+
+    def setUp(self):
+        self.previous = _query_nodeping_api.set_transport(Transport())
+        self.session = _query_nodeping_api.Session(rate_limit=0, cache_size=0)
+        # Closes every circuit, so earlier resets cannot open one
+        _query_nodeping_api.configure_circuit_breaker()
+        self.backoff = config.BACKOFF_BASE
+        config.BACKOFF_BASE = 0.001
+
+    def tearDown(self):
+        config.BACKOFF_BASE = self.backoff
+        _query_nodeping_api.set_transport(self.previous)
+        _query_nodeping_api.configure_circuit_breaker()
+
+    def check(self, result):
+        self.assertEqual(len(result), 2)
+        self.assertEqual(list(result.failed), ["bad"])
+        self.assertIsInstance(result.failed["bad"], ConnectionResetError)
+        self.assertEqual(result.unfinished, [])
+
+    def test_transport_error_fails_only_its_check(self):
+        with _query_nodeping_api.activate(self.session):
+            result = update_checks.update_many("abc", self.checkids,
+                                               {"enabled": False})
+
+        self.check(result)
+
+    def test_async_transport_error_fails_only_its_check(self):
+        with _query_nodeping_api.activate(self.session):
+            result = asyncio.run(aio_update_checks.update_many(
+                "abc", self.checkids, {"enabled": False}))
+
+        self.check(result)
+
+
+if __name__ == "__main__":
+    unittest.main()
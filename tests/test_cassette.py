@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import unittest
+from nodeping_api import _query_nodeping_api, cassette
+
+URL = "https://api.nodeping.com/api/1/checks/201-A?token=abc"
+
+
+class Response:
+    status = 200
+    reason = "OK"
+    headers = {}
+
+    def __init__(self, body):
+        self.body = json.dumps(body).encode()
+
+    def getheader(self, name, default=None):
+        return default
+
+    def read(self, size=None):
+        if size is None or size < 0:
+            size = len(self.body)
+
+        chunk, self.body = self.body[:size], self.body[size:]
+
+        return chunk
+
+    def close(self):
+        pass
+
+
+class Transport:
+    def request(self, method, url, body, headers, timeout):
+        return Response({"label": "web", "type": "PING"})
+
+
+class ReplayTest(unittest.TestCase):
+
+    def test_non_ascii_body_matches_any_encoding(self):
+        recorded = cassette.Cassette()
+        recorded.add("PUT", URL, {"ok": True},
+                     data_dictionary={"label": "café", "type": "PING"})
+
+        # Encoded the way orjson encodes it, without escapes
+        body = '{"type":"PING","label":"café"}'.encode("utf-8")
+
+        with recorded.request("PUT", URL, body) as response:
+            self.assertEqual(json.loads(response.read()), {"ok": True})
+
+
+class RecordTest(unittest.TestCase):
+
+    def setUp(self):
+        self.previous = _query_nodeping_api.set_transport(Transport())
+
+    def tearDown(self):
+        _query_nodeping_api.set_transport(self.previous)
+
+    def test_partly_read_body_is_recorded_whole(self):
+        with cassette.Cassette(mode="record") as recording:
+            with recording.request("GET", URL) as response:
+                response.read(5)
+
+        self.assertEqual(json.loads(recording.entries[0]["r"]),
+                         {"label": "web", "type": "PING"})
+
+
+if __name__ == "__main__":
+    unittest.main()
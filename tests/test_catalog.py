@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import threading
+import time
+import unittest
+from nodeping_api import _query_nodeping_api, catalog
+
+CHECKS = {
+    "201-A": {"_id": "201-A", "type": "PING", "label": "web",
+              "enable": "active", "state": 1, "interval": 1},
+    "201-B": {"_id": "201-B", "type": "PUSH", "label": "cron",
+              "enable": "active", "state": 0, "interval": 5},
+}
+
+
+class Response:
+    status = 200
+
+    def __init__(self, body):
+        self.body = json.dumps(body).encode()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def getheader(self, name, default=None):
+        return default
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = len(self.body)
+
+        chunk, self.body = self.body[:size], self.body[size:]
+
+        return chunk
+
+    def close(self):
+        pass
+
+
+class Transport:
+    """ Answers with CHECKS once released
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def request(self, method, url, body, headers, timeout):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(10)
+
+        return Response(CHECKS)
+
+
+class RefreshTest(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = Transport()
+        self.previous = _query_nodeping_api.set_transport(self.transport)
+        self.session = _query_nodeping_api.Session(rate_limit=0, cache_size=0)
+        self.catalog = catalog.CheckCatalog("abc", ttl=0)
+
+    def tearDown(self):
+        self.transport.release.set()
+        _query_nodeping_api.set_transport(self.previous)
+
+    def lookup(self, results):
+        with _query_nodeping_api.activate(self.session):
+            results.append(self.catalog.where(type="PUSH"))
+
+    def test_lookups_share_one_download_outside_the_lock(self):
+        results = []
+        threads = [threading.Thread(target=self.lookup, args=(results,))
+                   for _ in range(3)]
+        threads[0].start()
+        self.assertTrue(self.transport.started.wait(10))
+
+        # The download runs without holding the catalog's lock
+        self.assertTrue(self.catalog._lock.acquire(timeout=1))
+        self.catalog._lock.release()
+
+        for thread in threads[1:]:
+            thread.start()
+
+        while self.catalog._refreshing.coalesced < 2:
+            time.sleep(0.01)
+
+        self.transport.release.set()
+
+        for thread in threads:
+            thread.join(10)
+
+        self.assertEqual(self.transport.calls, 1)
+        self.assertEqual([list(result) for result in results],
+                         [["201-B"]] * 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
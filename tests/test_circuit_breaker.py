@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import unittest
+from nodeping_api import _query_nodeping_api, circuit_breaker, config, deadline
+
+SETTINGS = ("failure_rate", "min_requests", "window", "reset_timeout",
+            "probes")
+
+URL = "https://api.nodeping.com/api/1/checks?token=abc"
+
+
+class CancellingLimiter:
+    """ Rate limit that lets the request through, but cancels the
+    operation deadline while it waits
+    """
+
+    def __init__(self, current):
+        self.current = current
+
+    def acquire(self, timeout=None):
+        self.current.cancel()
+
+        return True
+
+
+class Response:
+    status = 200
+
+    def __init__(self):
+        self.body = b"{}"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def getheader(self, name, default=None):
+        return default
+
+    def read(self, size=-1):
+        body, self.body = self.body, b""
+
+        return body
+
+    def close(self):
+        pass
+
+
+class Transport:
+    def request(self, method, url, body, headers, timeout):
+        return Response()
+
+
+class HalfOpenProbeTest(unittest.TestCase):
+
+    def setUp(self):
+        breaker = _query_nodeping_api._BREAKER
+        self.config = {name: getattr(config, "CIRCUIT_" + name.upper())
+                       for name in SETTINGS}
+        self.settings = {name: getattr(breaker, name) for name in SETTINGS}
+        self.circuits = breaker._circuits
+        _query_nodeping_api.configure_circuit_breaker(
+            failure_rate=0.5, min_requests=1, window=1, reset_timeout=0,
+            probes=1)
+        family = "checks"
+        # Open the circuit; with no reset timeout the next request
+        # becomes a half-open probe
+        breaker.after(family, True)
+        self.assertEqual(breaker.state(family), circuit_breaker.HALF_OPEN)
+        self.previous = _query_nodeping_api.set_transport(Transport())
+
+    def tearDown(self):
+        _query_nodeping_api.set_transport(self.previous)
+        breaker = _query_nodeping_api._BREAKER
+        breaker.configure(**self.settings)
+        breaker._circuits = self.circuits
+
+        for name, value in self.config.items():
+            setattr(config, "CIRCUIT_" + name.upper(), value)
+
+    def test_deadline_during_rate_limit_returns_probe(self):
+        session = _query_nodeping_api.Session(cache_size=0)
+
+        with _query_nodeping_api.activate(session):
+            with deadline.deadline() as current:
+                session.limiter = CancellingLimiter(current)
+
+                with self.assertRaises(deadline.DeadlineExceeded):
+                    _query_nodeping_api.get(URL, cache=False)
+
+            session.limiter = _query_nodeping_api._rate_limit.TokenBucket(0, 1)
+            # The probe was handed back, so the next request probes
+            # and closes the circuit instead of failing fast
+            self.assertEqual(_query_nodeping_api.get(URL, cache=False), {})
+
+        self.assertEqual(_query_nodeping_api.circuit_stats()["checks"]["state"],
+                         circuit_breaker.CLOSED)
+
+
+if __name__ == "__main__":
+    unittest.main()
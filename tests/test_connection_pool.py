@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import socket
+import threading
+import time
+import unittest
+from nodeping_api._connection_pool import ConnectionPool
+
+OK = (b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n"
+      b"Connection: keep-alive\r\n\r\n{}")
+
+
+class Server:
+    """ Answers the first request on each connection, then either
+    closes the connection or reads the next request and drops the
+    connection without answering
+    """
+
+    def __init__(self, answer_second):
+        self.answer_second = answer_second
+        self.requests = []
+        self.sock = socket.socket()
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen()
+        self.url = "http://127.0.0.1:{0}/checks".format(
+            self.sock.getsockname()[1])
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _read_request(self, conn):
+        data = b""
+
+        while b"\r\n\r\n" not in data:
+            chunk = conn.recv(65536)
+
+            if not chunk:
+                return None
+            data += chunk
+
+        head, _sep, body = data.partition(b"\r\n\r\n")
+        length = 0
+
+        for line in head.split(b"\r\n"):
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":")[1])
+
+        while len(body) < length:
+            body += conn.recv(65536)
+
+        return head.split(b" ")[0]
+
+    def _serve(self):
+        while True:
+            conn, _address = self.sock.accept()
+
+            with conn:
+                self.requests.append(self._read_request(conn))
+                conn.sendall(OK)
+
+                if self.answer_second:
+                    continue
+
+                method = self._read_request(conn)
+
+                if method is not None:
+                    self.requests.append(method)
+
+
+class ReusedConnectionTest(unittest.TestCase):
+
+    def test_post_sent_before_a_drop_is_not_resent(self):
+        server = Server(answer_second=False)
+        pool = ConnectionPool()
+
+        with pool.request("GET", server.url) as response:
+            response.read()
+
+        # The server reads the POST, then drops the connection
+        with self.assertRaises(ConnectionError):
+            pool.request("POST", server.url, b"{}",
+                         {"Content-Length": "2"}).read()
+
+        time.sleep(0.1)
+        self.assertEqual(server.requests.count(b"POST"), 1)
+
+    def test_post_skips_connection_closed_while_idle(self):
+        server = Server(answer_second=True)
+        pool = ConnectionPool()
+
+        with pool.request("GET", server.url) as response:
+            response.read()
+
+        # Give the server time to close the idle connection
+        time.sleep(0.1)
+
+        with pool.request("POST", server.url, b"{}",
+                          {"Content-Length": "2"}) as response:
+            self.assertEqual(response.status, 200)
+            response.read()
+
+        self.assertEqual(server.requests, [b"GET", b"POST"])
+
+
+if __name__ == "__main__":
+    unittest.main()
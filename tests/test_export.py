@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import tempfile
+import unittest
+from nodeping_api import _query_nodeping_api, export
+
+CHECK = {"_id": "201-A", "type": "PING", "label": "web", "enable": "active",
+         "parameters": {"target": "example.com", "threshold": 5,
+                        "checktoken": "secret", "newoption": True}}
+
+
+class Response:
+    status = 200
+
+    def __init__(self, body):
+        self.body = json.dumps(body).encode()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def getheader(self, name, default=None):
+        return default
+
+    def read(self, size=-1):
+        body, self.body = self.body, b""
+
+        return body
+
+    def close(self):
+        pass
+
+
+class Transport:
+    def __init__(self):
+        self.bodies = []
+
+    def request(self, method, url, body, headers, timeout):
+        self.bodies.append(json.loads(body))
+
+        return Response({"_id": "202-A", "parameters": {"checktoken": None}})
+
+
+class ImportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp.name, "checks.jsonl")
+
+        with open(self.path, "w", encoding="utf-8") as handle:
+            handle.write(json.dumps(CHECK) + "\n")
+
+        self.transport = Transport()
+        self.previous = _query_nodeping_api.set_transport(self.transport)
+
+    def tearDown(self):
+        _query_nodeping_api.set_transport(self.previous)
+        self.temp.cleanup()
+
+    def test_parameters_create_check_cannot_set_are_reported(self):
+        result = export.import_checks("abc", self.path)
+
+        self.assertEqual(result.created, 1)
+        self.assertEqual(result.dropped, {"201-A": ["newoption"]})
+        self.assertNotIn("newoption", self.transport.bodies[0])
+        self.assertNotIn("checktoken", self.transport.bodies[0])
+
+        with open(self.path + ".journal", encoding="utf-8") as handle:
+            entry = json.loads(handle.readline())
+
+        self.assertEqual(entry["dropped"], ["newoption"])
+
+
+if __name__ == "__main__":
+    unittest.main()
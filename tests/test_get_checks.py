@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import json
+import unittest
+from nodeping_api import _query_nodeping_api, get_checks
+from nodeping_api.aio import get_checks as aio_get_checks
+
+CHECKS = {"201-{0}".format(number): {
+    "_id": "201-{0}".format(number), "type": "PUSH" if number % 2 else "PING",
+    "label": "check {0}".format(number), "enable": "active", "state": 1,
+    "lastresult": {"t": 1700000000000, "su": True, "rt": 12}}
+    for number in range(30)}
+
+
+class Response:
+    status = 200
+
+    def __init__(self, body):
+        self.body = json.dumps(body).encode()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def getheader(self, name, default=None):
+        return default
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = len(self.body)
+
+        chunk, self.body = self.body[:size], self.body[size:]
+
+        return chunk
+
+    def close(self):
+        pass
+
+
+class Transport:
+    def request(self, method, url, body, headers, timeout):
+        return Response(CHECKS)
+
+
+class GetChecksTest(unittest.TestCase):
+
+    def setUp(self):
+        self.previous = _query_nodeping_api.set_transport(Transport())
+        self.session = _query_nodeping_api.Session(rate_limit=0, cache_size=0)
+        self.activation = _query_nodeping_api.activate(self.session)
+        self.activation.__enter__()
+
+    def tearDown(self):
+        self.activation.__exit__(None, None, None)
+        _query_nodeping_api.set_transport(self.previous)
+
+    def test_listed_last_results_progress_total(self):
+        checks = get_checks.GetChecks("abc", customerid="progress")
+        calls = []
+        results = checks.last_results(
+            progress=lambda done, total, item: calls.append((done, total)))
+
+        self.assertEqual(len(results), 15)
+        self.assertEqual(calls, [(done, 15) for done in range(1, 16)])
+
+    def test_progress_errors_are_raised(self):
+        checks = get_checks.GetChecks("abc")
+
+        def progress(done, total, item):
+            raise KeyError(item.key)
+
+        with self.assertRaises(KeyError):
+            checks.last_results(list(CHECKS), progress=progress)
+
+    def test_async_iter_checks(self):
+        checks = aio_get_checks.GetChecks("abc")
+
+        async def collect():
+            return [check_id async for check_id, check
+                    in checks.iter_checks(lambda check: check["type"] == "PUSH")]
+
+        self.assertEqual(asyncio.run(collect()),
+                         [check_id for check_id, check in CHECKS.items()
+                          if check["type"] == "PUSH"])
+
+    def test_async_catalog_is_loaded(self):
+        checks = aio_get_checks.GetChecks("abc", customerid="async")
+        loaded = asyncio.run(checks.catalog())
+
+        self.assertTrue(loaded.fresh)
+        self.assertEqual(len(asyncio.run(checks.passing_checks())), 30)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,28 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import unittest
+from nodeping_api import _query_nodeping_api
+from nodeping_api.client import NodePingClient
+
+
+class RateLimitTest(unittest.TestCase):
+
+    def test_clients_share_the_process_rate_limit(self):
+        first = NodePingClient("a")
+        second = NodePingClient("b")
+
+        self.assertIs(first.session.limiter, second.session.limiter)
+        self.assertIs(first.session.limiter,
+                      _query_nodeping_api.current_session().limiter)
+
+    def test_explicit_rate_limit_is_per_client(self):
+        shared = NodePingClient("a").session.limiter
+        own = NodePingClient("b", rate_limit=2).session.limiter
+
+        self.assertIsNot(own, shared)
+        self.assertEqual(own.rate, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
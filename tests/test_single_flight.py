@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+import unittest
+from nodeping_api import _query_nodeping_api, deadline
+
+URL = "https://api.nodeping.com/api/1/checks?token=abc"
+
+
+class Response:
+    status = 200
+
+    def __init__(self):
+        self.body = b'{"ok": true}'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def getheader(self, name, default=None):
+        return default
+
+    def read(self, size=-1):
+        body, self.body = self.body, b""
+
+        return body
+
+    def close(self):
+        pass
+
+
+class Transport:
+    """ Holds the first request until another caller coalesced onto it,
+    then runs out the leader's deadline; later requests succeed
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.leader_deadline = None
+        self.calls = 0
+
+    def request(self, method, url, body, headers, timeout):
+        self.calls += 1
+
+        if self.calls == 1:
+            while self.session.flights.stats()["coalesced"] < 1:
+                time.sleep(0.01)
+
+            self.leader_deadline.cancel()
+            raise TimeoutError("timed out")
+
+        return Response()
+
+
+class CoalescedDeadlineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.session = _query_nodeping_api.Session(rate_limit=0, cache_size=0)
+        self.transport = Transport(self.session)
+        self.previous = _query_nodeping_api.set_transport(self.transport)
+
+    def tearDown(self):
+        _query_nodeping_api.set_transport(self.previous)
+
+    def test_leader_deadline_does_not_fail_follower(self):
+        outcomes = {}
+
+        def leader():
+            with _query_nodeping_api.activate(self.session):
+                with deadline.deadline(30) as current:
+                    self.transport.leader_deadline = current
+
+                    try:
+                        _query_nodeping_api.get(URL, cache=False)
+                    except deadline.DeadlineExceeded as err:
+                        outcomes["leader"] = err
+
+        def follower():
+            while not self.session.flights.stats()["in_flight"]:
+                time.sleep(0.01)
+
+            with _query_nodeping_api.activate(self.session):
+                outcomes["follower"] = _query_nodeping_api.get(URL, cache=False)
+
+        threads = [threading.Thread(target=leader),
+                   threading.Thread(target=follower)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join(10)
+
+        self.assertIsInstance(outcomes["leader"], deadline.DeadlineExceeded)
+        self.assertEqual(outcomes["follower"], {"ok": True})
+        self.assertEqual(self.transport.calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import stat
+import tempfile
+import unittest
+from nodeping_api.store import CheckStore
+
+
+class PermissionsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.umask = os.umask(0o022)
+
+    def tearDown(self):
+        os.umask(self.umask)
+        self.temp.cleanup()
+
+    def mode(self, path):
+        return stat.S_IMODE(os.stat(path).st_mode)
+
+    def test_new_store_is_private(self):
+        directory = os.path.join(self.temp.name, "nodeping")
+        store = CheckStore(os.path.join(directory, "checks.db"))
+
+        self.assertEqual(self.mode(directory), 0o700)
+        self.assertEqual(self.mode(store.path), 0o600)
+
+    def test_existing_store_is_made_private(self):
+        path = os.path.join(self.temp.name, "checks.db")
+        CheckStore(path)
+        os.chmod(path, 0o644)
+        CheckStore(path)
+
+        self.assertEqual(self.mode(path), 0o600)
+
+
+if __name__ == "__main__":
+    unittest.main()